@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+按压执行器 - 精确控制按住时长
+
+光标每个会话只定位一次（按压点不变时不再 moveTo）；
+按住时长先 sleep 到目标前 spin 毫秒，再用 time.perf_counter_ns 忙等到目标时刻，
+不受系统调度粒度影响；每次按压记录请求时长与实际时长
+"""
+
+import sys
+import time
+from collections import deque
+
+# Windows 的 sleep 粒度可达 15.6ms，忙等窗口需要更大
+DEFAULT_SPIN_MS = 16.0 if sys.platform == 'win32' else 2.0
+
+
+def precise_hold(duration_ns: int, start_ns: int = None, spin_ns: int = 2_000_000,
+                 clock=time.perf_counter_ns, sleep=time.sleep) -> int:
+    """从 start_ns 起等待 duration_ns 纳秒，返回实际经过的纳秒数
+
+    先粗略 sleep 到目标前 spin_ns，剩余时间忙等
+    """
+    if start_ns is None:
+        start_ns = clock()
+    target = start_ns + duration_ns
+    remaining = target - clock()
+    if remaining > spin_ns:
+        sleep((remaining - spin_ns) / 1e9)
+    while clock() < target:
+        pass
+    return clock() - start_ns
+
+
+class PressActuator:
+    """按压执行器
+
+    mouse_down / mouse_up / move_to 为鼠标操作函数（默认由调用方传入 pyautogui 的封装），
+    records 保存最近 history 次按压的 (请求毫秒, 实际毫秒)
+    """
+
+    def __init__(self, mouse_down, mouse_up, move_to=None, spin_ms: float = DEFAULT_SPIN_MS,
+                 history: int = 200, clock=time.perf_counter_ns, sleep=time.sleep):
+        self.mouse_down = mouse_down
+        self.mouse_up = mouse_up
+        self.move_to = move_to
+        self.spin_ns = int(spin_ms * 1e6)
+        self.clock = clock
+        self.sleep = sleep
+        self.point = None
+        self.records = deque(maxlen=history)
+
+    def reset(self):
+        """新会话开始：下一次按压重新定位光标"""
+        self.point = None
+
+    def set_point(self, x: int, y: int):
+        """定位光标，按压点不变时不重复移动"""
+        if self.point != (x, y):
+            if self.move_to is not None:
+                self.move_to(x, y)
+            self.point = (x, y)
+
+    def press(self, press_time_ms: float) -> tuple:
+        """按住 press_time_ms 毫秒，返回 (请求毫秒, 实际毫秒)
+
+        实际时长从按下调用返回到松开调用发出为止
+        """
+        self.mouse_down()
+        start = self.clock()
+        try:
+            actual_ns = precise_hold(int(press_time_ms * 1e6), start, self.spin_ns, self.clock, self.sleep)
+        finally:
+            self.mouse_up()
+        record = (float(press_time_ms), actual_ns / 1e6)
+        self.records.append(record)
+        return record
+
+    def summary(self) -> dict:
+        """按压误差统计（毫秒）：次数、平均误差、最大绝对误差"""
+        if not self.records:
+            return {"count": 0, "mean_error": 0.0, "max_error": 0.0}
+        errors = [actual - requested for requested, actual in self.records]
+        return {
+            "count": len(errors),
+            "mean_error": sum(errors) / len(errors),
+            "max_error": max(abs(e) for e in errors),
+        }
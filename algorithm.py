@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+"""
+跳一跳核心算法 - 配置与检测/按压时间计算
+从 main.py 中拆出，不依赖 GUI，便于测试脚本和离线工具直接导入
+"""
+
+import math
+import time
+
+import numpy as np
+from PIL import Image
+
+import vision
+
+
+class GameConfig:
+    """游戏配置数据类"""
+    base_screen_width: int = 1920
+    base_screen_height: int = 1080
+    piece_base_height_1_2: int = 20
+    piece_body_width: int = 70
+    head_diameter: int = 135
+    press_coefficient: float = 1.5  # wangshub 经典值，可根据实际情况调整
+    min_press_time: int = 200  # 降低最小按压时间
+    max_press_time: int = 2000
+    piece_template: str = ""
+    # 截取模板时的缩放比例，0 表示与当前画面相同
+    piece_template_scale: float = 0.0
+    # 模板匹配置信度阈值，低于阈值时回退到颜色扫描
+    template_threshold: float = 0.8
+    # 游戏区域 - 预设值覆盖游戏画面 [400, 0, 1000, 1080]
+    game_area: list = [400, 0, 1000, 1080]
+    # 按压区域
+    press_area: list = None
+
+    # 新增：距离限制，防止检测错误
+    max_valid_distance: int = 600  # 最大有效距离
+    min_valid_distance: int = 30   # 最小有效距离
+
+    # 检测引擎: "numpy" 整帧向量化 / "loop" 逐像素循环（wangshub 原版，用于对照）
+    detect_engine: str = "numpy"
+    # 跟踪模式：根据上一次检测结果预测棋子所在窗口，只扫描窗口，失败再全屏扫描
+    track_roi: bool = True
+    # 2K/4K 区域使用金字塔由粗到精检测
+    pyramid: bool = True
+    # 平台检测: "component" 连通域分割，纵坐标实测（没有 OpenCV 时自动退回 edge）/ "edge" wangshub 逐行边缘扫描，纵坐标按投影推算
+    board_detector: str = "component"
+    # 背景模型：每行背景色按会话缓存，代替每行最左侧像素
+    background_model: bool = True
+    # 棋子全屏扫描: "bottomup" 自下而上隔行扫描，确认底座即停止 / "topdown" 逐行自上而下
+    piece_search: str = "bottomup"
+    # 每帧棋子扫描的像素预算与时间预算（毫秒），0 表示不限制；
+    # 像素预算用完判定无棋子，时间预算用完按分析超时处理（立即重新截图，不计入连续未找到棋子）
+    piece_scan_budget: int = 0
+    piece_scan_time_ms: float = 50.0
+    # 每帧分析的截止时间（毫秒），超时放弃本帧、立即重新截图，0 表示不限时
+    detect_deadline_ms: float = 150.0
+    # 截图后端: "auto" 启动时基准测试选最快 / "xshm" / "pyautogui" / "file"（回放 capture_replay）
+    capture_backend: str = "auto"
+    capture_replay: str = ""
+    # 落地稳定检测：跳跃后按帧差能量判断画面稳定，代替固定等待
+    settle_detect: bool = True
+    settle_threshold: float = 1.5
+    settle_samples: int = 4
+    settle_interval_ms: float = 30.0
+    settle_timeout_ms: float = 2500.0
+    # 飞行记录：内存中保留最近的截图和检测结果，游戏结束时导出最近若干跳
+    recorder_enabled: bool = True
+    recorder_max_mb: float = 256.0
+    recorder_dir: str = "recordings"
+    recorder_dump_jumps: int = 30
+    # 跳过之后连续多少帧找不到棋子视为游戏结束（结算画面）
+    game_over_misses: int = 3
+
+
+class DetectionResult:
+    """一帧的检测结果 - 坐标、置信度、检测器和各阶段耗时
+
+    status: "ok" / "no_image" / "no_piece" / "no_board" / "timeout"；
+    detector 形如 "scan+component"，前半为棋子来源，后半为平台检测器；
+    timings 为各阶段耗时（毫秒）。可以像原来的 5 元组一样解包
+    """
+
+    __slots__ = ("piece_x", "piece_y", "board_x", "board_y", "delta_piece_y",
+                 "confidence", "detector", "status", "timings")
+
+    def __init__(self, coords: tuple = (0, 0, 0, 0, 0), confidence: float = 0.0,
+                 detector: str = "", status: str = "", timings: dict = None):
+        self.piece_x, self.piece_y, self.board_x, self.board_y, self.delta_piece_y = coords
+        self.confidence = confidence
+        self.detector = detector
+        self.status = status
+        self.timings = timings if timings is not None else {}
+
+    @property
+    def found(self) -> bool:
+        return self.status == "ok"
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.timings.get("total", 0.0)
+
+    def as_tuple(self) -> tuple:
+        return self.piece_x, self.piece_y, self.board_x, self.board_y, self.delta_piece_y
+
+    def as_dict(self) -> dict:
+        """可写入 JSON 的字典（坐标转为内置数值类型）"""
+        return {
+            "status": self.status,
+            "piece": [float(self.piece_x), float(self.piece_y)],
+            "board": [float(self.board_x), float(self.board_y)],
+            "delta_piece_y": float(self.delta_piece_y),
+            "confidence": float(self.confidence),
+            "detector": self.detector,
+            "timings": {k: float(v) for k, v in self.timings.items()},
+        }
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __repr__(self):
+        stages = ", ".join(f"{k}={v:.1f}ms" for k, v in self.timings.items())
+        return (f"DetectionResult({self.as_tuple()}, status={self.status!r}, "
+                f"detector={self.detector!r}, confidence={self.confidence:.2f}, {stages})")
+
+
+class JumpAlgorithm:
+    """跳跃算法核心类 - v4.0 完整移植wangshub核心算法"""
+
+    def __init__(self, config: GameConfig):
+        self.config = config
+        self.scale = 1.0
+
+        # 上一次的检测位置，用于平滑和验证
+        self.last_piece_x = 0
+        self.last_piece_y = 0
+        self.last_board_x = 0
+        self.last_board_y = 0
+
+        # 最近一帧棋子扫描的像素数，以及是否由跟踪窗口/模板命中
+        self.piece_scan_pixels = 0
+        self.tracked = False
+        # 最近一帧棋子的来源: "template" / "track" / "scan"，以及模板匹配置信度
+        self.piece_source = ""
+        self.piece_confidence = 0.0
+
+        self.template_matcher = vision.PieceTemplateMatcher()
+        self.background = vision.BackgroundModel()
+
+    def calculate_scale(self, img_width: int, img_height: int):
+        base_width = 1920
+        base_height = 1080
+        self.scale = (img_width / base_width + img_height / base_height) / 2
+        return self.scale
+
+    def find_piece_and_board(self, img: Image.Image) -> tuple:
+        """寻找关键坐标 - 完整移植自wangshub/wechat_jump_game
+
+        核心逻辑：
+        1. 识别棋子：根据棋子颜色检测位置
+        2. 识别平台：根据底色和方块色差检测
+        3. 计算对称中心：用于计算delta_piece_y
+        4. 返回：piece_x, piece_y, board_x, board_y, delta_piece_y
+        """
+        return self.detect(img).as_tuple()
+
+    def detect(self, img: Image.Image, deadline: float = 0.0) -> DetectionResult:
+        """检测一帧，返回 DetectionResult
+
+        img 为 PIL 图像或 RGB 数组，数组可以是截图缓冲的跨步视图，检测过程中不拷贝；
+        deadline 为 time.perf_counter() 截止时间，0 表示不限时；
+        超时返回 status="timeout"，调用方应丢弃本帧、重新截图
+        """
+        start = time.perf_counter()
+        if img is None:
+            return DetectionResult(status="no_image")
+
+        if self.config.detect_engine == "loop":
+            if not isinstance(img, Image.Image):
+                # 逐像素对照版需要 PIL 的 load()，截图缓冲视图先转为图像
+                img = Image.fromarray(np.ascontiguousarray(img))
+            coords = self._find_piece_and_board_loop(img)
+            found = bool(coords[0] or coords[1])
+            return DetectionResult(coords, 1.0 if found else 0.0, "loop",
+                                   "ok" if found else "no_piece",
+                                   {"total": (time.perf_counter() - start) * 1000})
+
+        timings = {}
+        stats = {}
+        arr = vision.to_array(img)
+        h, w = arr.shape[:2]
+        self.calculate_scale(w, h)
+
+        lap = time.perf_counter()
+        bg = self.background.update(arr) if self.config.background_model else None
+        lap = self._lap(timings, "background", lap)
+
+        result = None
+        self.tracked = False
+        self.piece_scan_pixels = 0
+        self.piece_confidence = 0.0
+        piece = None
+        if self.config.piece_template:
+            piece = self._match_template(arr)
+            self.piece_source = "template"
+            lap = self._lap(timings, "template", lap)
+        if piece is None and self.config.track_roi:
+            piece = self._track_piece(arr)
+            self.piece_source = "track"
+            lap = self._lap(timings, "track", lap)
+        if piece:
+            result = vision.find_piece_and_board(arr, self.config, piece_hint=piece, bg=bg,
+                                                 deadline=deadline, stats=stats)
+            self.tracked = bool(result[0] or result[1])
+        if not self.tracked and not stats.get("timeout"):
+            self.piece_source = "scan"
+            band_pixels = (w - 2 * int(w / 8)) * (int(h * 2 / 3) - int(h / 3))
+            factor = vision.pyramid_factor(self.scale) if self.config.pyramid else 1
+            self.piece_scan_pixels += band_pixels // (factor * factor)
+            stats = {}
+            if factor > 1:
+                result = vision.find_piece_and_board_pyramid(arr, self.config, factor, bg,
+                                                             deadline=deadline, stats=stats)
+            else:
+                result = vision.find_piece_and_board(arr, self.config, bg=bg,
+                                                     deadline=deadline, stats=stats)
+        timings["piece"] = stats.get("piece_ms", 0.0)
+        timings["board"] = stats.get("board_ms", 0.0)
+
+        if result[0] or result[1]:
+            self.last_piece_x, self.last_piece_y, self.last_board_x, self.last_board_y = result[:4]
+            status = "ok"
+        else:
+            self.reset_tracking()
+            if stats.get("timeout"):
+                status = "timeout"
+            else:
+                status = "no_board" if "board_ms" in stats else "no_piece"
+
+        board_detector = stats.get("board_detector", "")
+        confidence = 0.0
+        if status == "ok":
+            confidence = self._piece_confidence(arr, result) * self._board_confidence(result, board_detector, w, h)
+        timings["total"] = (time.perf_counter() - start) * 1000
+        detector = self.piece_source + ("+" + board_detector if board_detector else "")
+        return DetectionResult(result, confidence, detector, status, timings)
+
+    @staticmethod
+    def _lap(timings: dict, key: str, start: float) -> float:
+        now = time.perf_counter()
+        timings[key] = (now - start) * 1000
+        return now
+
+    def _piece_confidence(self, arr, result: tuple) -> float:
+        """棋子置信度：模板命中时用匹配分数，颜色扫描时看底座最低几行的宽度是否像棋子"""
+        if self.piece_source == "template":
+            return self.piece_confidence
+        piece_y_max = int(result[1]) + self.config.piece_base_height_1_2
+        half_width = int(self.config.piece_body_width * self.scale)
+        x = int(result[0])
+        rows = arr[max(piece_y_max - 2, 0):piece_y_max + 1, max(x - half_width, 0):x + half_width + 1]
+        width = int(vision.piece_mask(rows).sum(axis=1).max(initial=0))
+        return min(1.0, width / max(1.0, self.config.piece_body_width * self.scale / 2))
+
+    def _board_confidence(self, result: tuple, board_detector: str, w: int, h: int) -> float:
+        """平台置信度：连通域测得的中心与对称中心投影越一致越可信；edge 检测的纵坐标本就来自投影"""
+        if board_detector != "component":
+            return 1.0
+        center_x = w / 2 + (24 / 1080) * w
+        center_y = h / 2 + (17 / 1920) * h
+        board_x, board_y = result[2], result[3]
+        slope = 25.5 / 43.5 if result[0] > center_x else -25.5 / 43.5
+        projected = slope * (board_x - center_x) + center_y
+        tolerance = self.config.head_diameter * self.scale
+        return max(0.0, 1.0 - abs(board_y - projected) / tolerance)
+
+    def reset_tracking(self):
+        """清除上一次的检测位置，下一帧强制全屏扫描"""
+        self.last_piece_x = 0
+        self.last_piece_y = 0
+        self.last_board_x = 0
+        self.last_board_y = 0
+
+    def predict_piece_roi(self, w: int, h: int) -> tuple:
+        """根据上一次的棋子/平台位置预测本帧棋子底部所在窗口 (x0, x1, y0, y1)
+
+        棋子落到上一次的平台后，镜头大约回移半个跳跃向量，
+        所以棋子应出现在上一次棋子与平台连线的中点附近；
+        窗口只需覆盖棋子最低行的不确定范围，跳得越远范围越大
+        """
+        if not (self.last_piece_x and self.last_board_x):
+            return None
+
+        dx = self.last_board_x - self.last_piece_x
+        dy = self.last_board_y - self.last_piece_y
+        center_x = self.last_piece_x + dx / 2
+        center_y = self.last_piece_y + dy / 2 + self.config.piece_base_height_1_2
+        margin_x = self.config.piece_body_width * self.scale + abs(dx) / 8
+        margin_y = self.config.head_diameter * self.scale / 4 + abs(dy) / 8
+
+        scan_x_border = int(w / 8)
+        x0 = max(scan_x_border, int(center_x - margin_x))
+        x1 = min(w - scan_x_border, int(center_x + margin_x))
+        y0 = max(0, int(center_y - margin_y))
+        y1 = min(int(h * 2 / 3), int(center_y + margin_y))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, x1, y0, y1
+
+    def _match_template(self, arr) -> tuple:
+        """用棋子模板匹配定位棋子，返回 (piece_x, piece_y_max)，置信度不足返回 None
+
+        开启跟踪时只在预测窗口附近匹配，否则在棋子所在的 1/3 ~ 2/3 屏高区域匹配
+        """
+        if not self.template_matcher.load(self.config.piece_template):
+            return None
+
+        h, w = arr.shape[:2]
+        relative_scale = self.scale / (self.config.piece_template_scale or self.scale)
+        tw, th = self.template_matcher.template_size(relative_scale)
+        roi = self.predict_piece_roi(w, h) if self.config.track_roi else None
+        if roi:
+            x0, x1, y0, y1 = roi
+            window = (max(0, x0 - tw), min(w, x1 + tw), max(0, y0 - th), min(h, y1 + th))
+        else:
+            window = (int(w / 8), w - int(w / 8), max(0, int(h / 3) - th), min(h, int(h * 2 / 3) + th))
+
+        piece_x, piece_y_max, confidence = self.template_matcher.match(arr, relative_scale, window)
+        self.piece_confidence = confidence
+        if confidence < self.config.template_threshold:
+            return None
+        return piece_x, piece_y_max
+
+    def _track_piece(self, arr) -> tuple:
+        """在预测窗口内找棋子，置信度不足时返回 None 交给全屏扫描"""
+        h, w = arr.shape[:2]
+        roi = self.predict_piece_roi(w, h)
+        if roi is None:
+            return None
+
+        x0, x1, y0, y1 = roi
+        self.piece_scan_pixels += (x1 - x0) * (y1 - y0)
+        piece_x, piece_y_max, bottom_count = vision.find_piece_in_window(arr, x0, x1, y0, y1)
+        if not bottom_count:
+            return None
+
+        # 最低行贴着窗口边缘，说明棋子可能有一部分在窗口外，不可信
+        half_width = self.config.piece_body_width * self.scale / 2
+        if piece_y_max >= y1 - 2 or not (x0 + half_width <= piece_x < x1 - half_width):
+            return None
+        return piece_x, piece_y_max
+
+    def _find_piece_and_board_loop(self, img: Image.Image) -> tuple:
+        """逐像素循环版本 - wangshub 原版逻辑，作为向量化引擎的对照基准"""
+        w, h = img.size
+        self.calculate_scale(w, h)
+        im_pixel = img.load()
+
+        points = []
+        piece_y_max = 0
+        board_x = 0
+        board_y = 0
+
+        # wangshub: 扫描棋子时的左右边界
+        scan_x_border = int(w / 8)
+        scan_start_y = 0
+
+        # wangshub: 以50px步长，尝试探测scan_start_y
+        for i in range(int(h / 3), int(h * 2 / 3), 50):
+            last_pixel = im_pixel[0, i]
+            for j in range(1, w):
+                pixel = im_pixel[j, i]
+                if pixel != last_pixel:
+                    scan_start_y = i - 50
+                    break
+            if scan_start_y:
+                break
+
+        # wangshub: 从scan_start_y开始往下扫描，棋子应位于屏幕上半部分
+        for i in range(scan_start_y, int(h * 2 / 3)):
+            for j in range(scan_x_border, w - scan_x_border):
+                pixel = im_pixel[j, i]
+                # wangshub: 根据棋子的最低行的颜色判断（严格的RGB范围）
+                if (50 < pixel[0] < 60) and (53 < pixel[1] < 63) and (95 < pixel[2] < 110):
+                    points.append((j, i))
+                    piece_y_max = max(i, piece_y_max)
+
+        if not points:
+            return 0, 0, 0, 0, 0
+
+        # wangshub: 所有最底层的点的横坐标
+        bottom_x = [x for x, y in points if y == piece_y_max]
+        if not bottom_x:
+            return 0, 0, 0, 0, 0
+
+        piece_x = int(sum(bottom_x) / len(bottom_x))
+        piece_y = piece_y_max - self.config.piece_base_height_1_2
+
+        # wangshub: 限制棋盘扫描的横坐标，避免音符bug
+        if piece_x < w / 2:
+            board_x_start = piece_x
+            board_x_end = w
+        else:
+            board_x_start = 0
+            board_x_end = piece_x
+
+        # wangshub: 扫描平台中心
+        for i in range(int(h / 3), int(h * 2 / 3)):
+            last_pixel = im_pixel[0, i]
+            if board_x or board_y:
+                break
+            board_x_sum = 0
+            board_x_c = 0
+
+            for j in range(int(board_x_start), int(board_x_end)):
+                pixel = im_pixel[j, i]
+                # wangshub: 修掉脑袋比下一个小格子还高的情况的bug
+                if abs(j - piece_x) < self.config.piece_body_width:
+                    continue
+
+                # wangshub: 检查Y轴下面5个像素，和背景色相同，那么是干扰
+                ver_pixel = im_pixel[j, i + 5]
+                if abs(pixel[0] - last_pixel[0]) + abs(pixel[1] - last_pixel[1]) + abs(pixel[2] - last_pixel[2]) > 10 \
+                        and abs(ver_pixel[0] - last_pixel[0]) + abs(ver_pixel[1] - last_pixel[1]) + abs(ver_pixel[2] - last_pixel[2]) > 10:
+                    board_x_sum += j
+                    board_x_c += 1
+            if board_x_sum:
+                board_x = board_x_sum / board_x_c
+        last_pixel = im_pixel[board_x, i]
+
+        # wangshub: 计算对称中心，用于获取delta_piece_y
+        center_x = w / 2 + (24 / 1080) * w
+        center_y = h / 2 + (17 / 1920) * h
+
+        if piece_x > center_x:
+            board_y = round((25.5 / 43.5) * (board_x - center_x) + center_y)
+            delta_piece_y = piece_y - round((25.5 / 43.5) * (piece_x - center_x) + center_y)
+        else:
+            board_y = round(-(25.5 / 43.5) * (board_x - center_x) + center_y)
+            delta_piece_y = piece_y - round(-(25.5 / 43.5) * (piece_x - center_x) + center_y)
+
+        if not all((board_x, board_y)):
+            return 0, 0, 0, 0, 0
+
+        return piece_x, piece_y, board_x, board_y, delta_piece_y
+
+    def _find_symmetry_center(self, w: int, h: int) -> tuple:
+        """计算游戏对称中心 - wangshub方法"""
+        # 游戏中心偏移量（基于 1080x1920 屏幕）
+        center_x = w / 2 + (24 / 1080) * w
+        center_y = h / 2 + (17 / 1920) * h
+        return center_x, center_y
+
+    def _calculate_delta_piece_y(self, piece_x: float, piece_y: float, center_x: float, center_y: float) -> float:
+        """计算棋子Y轴偏移（相对于对称中心）- wangshub方法"""
+        if piece_x > center_x:
+            # 棋子在中心右侧
+            expected_piece_y = round((25.5 / 43.5) * (piece_x - center_x) + center_y)
+        else:
+            # 棋子在中心左侧
+            expected_piece_y = round(-(25.5 / 43.5) * (piece_x - center_x) + center_y)
+        delta_piece_y = piece_y - expected_piece_y
+        return delta_piece_y
+
+    def calculate_jump_time(self, distance: float, delta_piece_y: float = 0) -> int:
+        """计算跳跃按压时间 - wangshub 二次曲线算法
+
+        完整移植自: https://github.com/wangshub/wechat_jump_game
+
+        核心公式:
+            scale = 0.945 * 2 / head_diameter
+            actual_distance = distance * scale * math.sqrt(6) / 2
+            press_time = (-945 + math.sqrt(945**2 + 4 * 105 * 36 * actual_distance)) / (2 * 105) * 1000
+            press_time *= press_coefficient
+            press_time += delta_piece_y
+            press_time = max(press_time, 200)
+        """
+        # 限制距离范围
+        distance = max(self.config.min_valid_distance,
+                      min(distance, self.config.max_valid_distance))
+
+        # wangshub 二次曲线算法
+        # 计算程序长度与截图测得的距离的比例
+        scale = 0.945 * 2 / (self.config.head_diameter * self.scale)
+        actual_distance = distance * scale * (math.sqrt(6) / 2)
+        press_time = (-945 + math.sqrt(945 ** 2 + 4 * 105 *
+                                       36 * actual_distance)) / (2 * 105) * 1000
+        press_time *= self.config.press_coefficient
+        press_time = max(press_time, 200)
+        press_time = int(press_time)
+
+        return press_time
+
+    def calculate_distance(self, piece_x: float, piece_y: float, board_x: float, board_y: float) -> float:
+        """计算两点之间的欧几里得距离"""
+        return math.sqrt((board_x - piece_x) ** 2 + (board_y - piece_y) ** 2)
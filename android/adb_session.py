@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+常驻 adb 会话 - 不依赖 kivy，供 main.py 的 ADBController 使用
+
+每次 subprocess.run(['adb', ...]) 都要重新启动 adb 客户端并与 server 握手。
+这里只启动一个长期运行的 `adb shell`，命令逐行写入它的标准输入，
+每条命令后追加 `echo <标记> $?`，由读取线程根据标记确认完成并取得退出码。
+写入后可以不等待（流水线），调用方随后用 wait / wait_idle 确认。
+截图走 `adb exec-out screencap`，原始帧直接从标准输出读入内存
+"""
+import re
+import subprocess
+import threading
+from collections import deque
+
+from screencap import raw_screenshot
+
+MARKER = "__jump_done__"
+# 标记在行尾匹配：命令输出不以换行结尾时，标记会接在输出最后一行后面
+MARKER_RE = re.compile(rf"^(.*){MARKER} (\d+) (-?\d+)$")
+
+
+class AdbSessionError(RuntimeError):
+    """adb shell 会话不可用"""
+
+
+class AdbSession:
+    """常驻 adb shell 会话
+
+    adb 为 adb 可执行文件的命令前缀（测试时可换成假 adb 脚本），serial 指定设备
+    """
+
+    def __init__(self, adb=("adb",), serial: str = None):
+        self.adb = [adb] if isinstance(adb, str) else list(adb)
+        if serial:
+            self.adb += ["-s", serial]
+        self.process = None
+        self.reader = None
+        self.next_id = 0
+        self.pending = deque()    # 已写入、尚未完成的命令编号（shell 按顺序执行）
+        self.results = {}         # 命令编号 -> (退出码, 输出行)
+        self.untracked = set()    # 没人等待结果的命令编号，完成后不保存结果
+        self.lines = []           # 当前命令已输出的行
+        self.cond = threading.Condition()
+
+    # ---------- 会话管理 ----------
+    def start(self):
+        """启动 adb shell（已在运行时不重复启动）"""
+        if self.alive():
+            return
+        try:
+            self.process = subprocess.Popen(self.adb + ["shell"], stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise AdbSessionError(f"无法启动 adb shell: {e}") from e
+        with self.cond:
+            self.pending.clear()
+            self.results.clear()
+            self.untracked.clear()
+            self.lines = []
+        self.reader = threading.Thread(target=self._read_loop, args=(self.process,), daemon=True)
+        self.reader.start()
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        """结束会话"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.write(b"exit\n")
+            process.stdin.close()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+        with self.cond:
+            self.cond.notify_all()
+
+    def _read_loop(self, process):
+        """读取线程：按标记把输出分配给对应命令"""
+        for raw in process.stdout:
+            line = raw.decode(errors="ignore").rstrip("\r\n")
+            match = MARKER_RE.match(line)
+            with self.cond:
+                if match and self.pending and int(match.group(2)) == self.pending[0]:
+                    if match.group(1):
+                        self.lines.append(match.group(1))
+                    cmd_id = self.pending.popleft()
+                    if cmd_id in self.untracked:
+                        self.untracked.discard(cmd_id)
+                    else:
+                        self.results[cmd_id] = (int(match.group(3)), self.lines)
+                    self.lines = []
+                    self.cond.notify_all()
+                    continue
+                self.lines.append(line)
+        # 输出结束说明 shell 正在退出，等它退出后再唤醒等待者，alive() 才能反映出来
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        with self.cond:
+            self.cond.notify_all()
+
+    # ---------- 命令 ----------
+    def send(self, command: str, track: bool = True) -> int:
+        """写入一条命令后立即返回命令编号，不等待执行
+
+        track=False 表示不会有人 wait 这条命令，完成后不保存结果（只能用 wait_idle 确认）
+        """
+        self.start()
+        with self.cond:
+            cmd_id = self.next_id
+            self.next_id += 1
+            self.pending.append(cmd_id)
+            if not track:
+                self.untracked.add(cmd_id)
+        try:
+            self.process.stdin.write(f"{command}; echo {MARKER} {cmd_id} $?\n".encode())
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            with self.cond:
+                self.pending.remove(cmd_id)
+                self.untracked.discard(cmd_id)
+            self.close()
+            raise AdbSessionError(f"adb shell 已断开: {e}") from e
+        return cmd_id
+
+    def wait(self, cmd_id: int, timeout: float = 10.0) -> tuple:
+        """等待命令完成，返回 (退出码, 输出行)"""
+        with self.cond:
+            done = self.cond.wait_for(
+                lambda: cmd_id in self.results or not self.alive(), timeout)
+            if cmd_id in self.results:
+                return self.results.pop(cmd_id)
+        if not done:
+            raise AdbSessionError(f"adb 命令超时: #{cmd_id}")
+        raise AdbSessionError("adb shell 已退出")
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """等待所有已写入的命令执行完，返回是否在超时前完成"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending or not self.alive(), timeout)
+
+    def run(self, command: str, timeout: float = 10.0) -> tuple:
+        """执行一条命令并等待完成，返回 (退出码, 输出行)"""
+        return self.wait(self.send(command), timeout)
+
+    # ---------- 截图 / 按压 ----------
+    def screencap(self, timeout: float = 10.0):
+        """exec-out screencap 读取原始帧，返回 RGB 图像，失败返回 None"""
+        return raw_screenshot(self.adb + ["exec-out", "screencap"], timeout)
+
+    def swipe(self, x: int, y: int, duration_ms: int, track: bool = True) -> int:
+        """在原地 swipe 实现长按，立即返回命令编号；track 同 send"""
+        return self.send(f"input swipe {x} {y} {x} {y} {duration_ms}", track)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+假 adb - 测试时代替真实设备
+
+  python fake_adb.py devices
+  python fake_adb.py exec-out screencap   输出 FAKE_ADB_FRAME 文件中的原始帧
+  python fake_adb.py shell                逐行读取命令的简易 shell
+  python fake_adb.py shell <命令...>      执行一条命令
+
+每次启动和每条执行的命令都追加到 FAKE_ADB_LOG 文件：
+  spawn <参数>
+  <开始时间> <结束时间> <命令>
+input swipe 按其时长 sleep，模拟按住
+"""
+import os
+import sys
+import time
+
+LOG = os.environ.get("FAKE_ADB_LOG")
+
+
+def log(line):
+    if LOG:
+        with open(LOG, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def execute(command):
+    """执行一条命令，返回 (退出码, 输出)"""
+    args = command.split()
+    if not args:
+        return 0, ""
+    start = time.time()
+    code, output = 0, ""
+    if args[0] == "echo":
+        output = " ".join(args[1:]) + "\n"
+    elif args[0] == "printf":
+        # 输出不以换行结尾
+        output = " ".join(args[1:])
+    elif args[:2] == ["input", "swipe"] and len(args) == 7:
+        time.sleep(int(args[6]) / 1000)
+    elif args[:2] == ["input", "tap"]:
+        pass
+    else:
+        code = 127
+    if args[0] not in ("echo", "printf"):
+        log(f"{start:.6f} {time.time():.6f} {command}")
+    return code, output
+
+
+def shell():
+    """简易 shell：命令以 ; 分隔，$? 为上一条命令的退出码"""
+    last = 0
+    for line in sys.stdin:
+        for command in line.split(";"):
+            command = command.replace("$?", str(last)).strip()
+            if command == "exit":
+                return
+            last, output = execute(command)
+            sys.stdout.write(output)
+        sys.stdout.flush()
+
+
+def main(argv):
+    log("spawn " + " ".join(argv))
+    if argv[:1] == ["-s"]:
+        argv = argv[2:]
+    if argv == ["devices"]:
+        print("List of devices attached\nfake0\tdevice")
+    elif argv == ["exec-out", "screencap"]:
+        frame = os.environ.get("FAKE_ADB_FRAME")
+        if not frame or not os.path.exists(frame):
+            return 1
+        with open(frame, "rb") as f:
+            sys.stdout.buffer.write(f.read())
+    elif argv == ["shell"]:
+        shell()
+    elif argv[:1] == ["shell"]:
+        return execute(" ".join(argv[1:]))[0]
+    else:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+跳跃引擎 - 在工作线程中运行截图、识别、按压、等待落地，不依赖 kivy
+
+界面线程只通过命令队列发送 start / stop / coefficient，
+引擎通过 post 回调发回状态文字（应用里用 Clock.schedule_once 转回界面线程）。
+每轮的间隔由实际的截图、识别和落地时间决定，没有固定定时器；
+等待落地时同时监听命令队列，停止命令立即生效
+"""
+import math
+import queue
+import threading
+import time
+import traceback
+
+
+class JumpEngine:
+    """跳跃工作线程
+
+    capture() 返回截图（图像或文件路径），失败返回 None；
+    algorithm 提供 find_piece_and_board / calculate_press_time 和 config；
+    tap(x, y, press_ms) 执行按压；post(text) 发送状态
+    """
+
+    def __init__(self, capture, algorithm, tap, post=print,
+                 landing_delay: float = 1.2, retry_delay: float = 0.5, clock=time.monotonic):
+        self.capture = capture
+        self.algorithm = algorithm
+        self.tap = tap
+        self.post = post
+        self.landing_delay = landing_delay
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.commands = queue.Queue()
+        self.running = False
+        self.jump_count = 0
+        self.thread = None
+
+    # ---------- 界面线程调用 ----------
+    def start(self):
+        self._send("start")
+
+    def stop(self):
+        self._send("stop")
+
+    def set_coefficient(self, value: float):
+        self._send("coefficient", value)
+
+    def shutdown(self, timeout: float = 5.0):
+        """结束工作线程"""
+        if self.thread is not None:
+            self.commands.put(("quit", None))
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _send(self, command, value=None):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="jump-engine", daemon=True)
+            self.thread.start()
+        self.commands.put((command, value))
+
+    # ---------- 工作线程 ----------
+    def _handle(self, command, value) -> bool:
+        """处理一条命令，返回 False 表示退出线程"""
+        if command == "start":
+            if not self.running:
+                self.running = True
+                self.jump_count = 0
+                self.post("运行中...")
+        elif command == "stop":
+            if self.running:
+                self.running = False
+                self.post("已停止")
+        elif command == "coefficient":
+            self.algorithm.config.press_coefficient = value
+        elif command == "quit":
+            self.running = False
+            return False
+        return True
+
+    def _wait(self, seconds: float) -> bool:
+        """等待 seconds 秒，期间处理命令；返回 False 表示退出线程
+
+        停止后一直阻塞在命令队列上，直到重新开始或退出
+        """
+        deadline = self.clock() + seconds
+        while True:
+            remaining = deadline - self.clock() if self.running else None
+            if remaining is not None and remaining <= 0:
+                return True
+            try:
+                command, value = self.commands.get(timeout=remaining)
+            except queue.Empty:
+                return True
+            if not self._handle(command, value):
+                return False
+            if command == "start":
+                # 重新开始后不再等待上一轮剩下的时间
+                deadline = self.clock()
+
+    def _run(self):
+        delay = 0.0
+        while self._wait(delay):
+            if self.running:
+                delay = self.step()
+
+    def step(self) -> float:
+        """执行一轮跳跃，返回到下一轮开始前需要等待的秒数"""
+        try:
+            self.post("截屏中...")
+            screenshot = self.capture()
+            if screenshot is None:
+                self.post("截图失败")
+                return self.retry_delay
+
+            self.post("分析中...")
+            result = self.algorithm.find_piece_and_board(screenshot)
+            if result is None:
+                self.post("检测失败")
+                return self.retry_delay
+
+            piece_x, piece_y, board_x, board_y, delta_piece_y = result
+            distance = math.sqrt((board_x - piece_x) ** 2 + (board_y - piece_y) ** 2)
+            press_time = self.algorithm.calculate_press_time(distance, delta_piece_y)
+
+            pressed = self.clock()
+            self.tap(board_x, board_y, press_time)
+            self.jump_count += 1
+            self.post(f"距离: {distance:.0f}px | 按压: {press_time}ms | 第{self.jump_count}次")
+
+            # tap 可能立即返回（流水线）也可能阻塞到松开，统一从按下时刻算起
+            release = pressed + press_time / 1000
+            return max(0.0, release - self.clock()) + self.landing_delay
+        except Exception as e:
+            self.post(f"错误: {e}")
+            print(f"跳跃循环错误: {e}")
+            traceback.print_exc()
+            return self.retry_delay
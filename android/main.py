@@ -20,6 +20,9 @@ from kivy.graphics import Color, Rectangle
 from PIL import Image
 import cv2
 
+from adb_session import AdbSession, AdbSessionError
+from jump_engine import JumpEngine
+
 # Android 特定导入
 try:
     from jnius import autoclass
@@ -67,11 +70,12 @@ class JumpAlgorithm:
     def __init__(self, config: JumpConfig):
         self.config = config
 
-    def find_piece_and_board(self, screenshot_path):
+    def find_piece_and_board(self, screenshot):
         """
         寻找关键坐标 - 移植自 wangshub wechat_jump_auto.py 第103-197行
+        screenshot 为内存中的图像或截图文件路径
         """
-        im = Image.open(screenshot_path)
+        im = screenshot if isinstance(screenshot, Image.Image) else Image.open(screenshot)
         w, h = im.size
         im_pixel = im.load()
 
@@ -187,15 +191,20 @@ class JumpAlgorithm:
 
 # ==================== ADB 操作类 ====================
 class ADBController:
-    """ADB 控制器"""
+    """ADB 控制器
 
-    def __init__(self):
+    命令走常驻的 adb shell 会话，截图用 exec-out screencap 直接读原始帧；
+    会话不可用时退回每次启动 adb 进程、PNG 经设备存储中转的旧方式
+    """
+
+    def __init__(self, adb=("adb",)):
+        self.session = AdbSession(adb)
         self.test_connection()
 
     def test_connection(self):
         """测试 ADB 连接"""
         try:
-            result = subprocess.run(['adb', 'devices'], capture_output=True, text=True)
+            result = subprocess.run(self.session.adb + ['devices'], capture_output=True, text=True)
             if 'device' in result.stdout:
                 print("ADB 连接成功")
                 return True
@@ -207,18 +216,40 @@ class ADBController:
             return False
 
     def screenshot(self, output_path):
-        """截屏"""
-        subprocess.run(['adb', 'shell', 'screencap', '-p', '/sdcard/screenshot.png'],
+        """截屏，返回内存中的图像，原始帧不可用时返回截图文件路径"""
+        # 上一次按压还在执行时先等它结束，避免截到跳跃途中的画面
+        self.session.wait_idle(timeout=5)
+        image = self.session.screencap()
+        if image is not None:
+            return image
+        subprocess.run(self.session.adb + ['shell', 'screencap', '-p', '/sdcard/screenshot.png'],
                        capture_output=True)
-        subprocess.run(['adb', 'pull', '/sdcard/screenshot.png', output_path],
+        subprocess.run(self.session.adb + ['pull', '/sdcard/screenshot.png', output_path],
                        capture_output=True)
+        return output_path
 
-    def tap(self, x, y, duration_ms):
-        """模拟按压"""
+    def tap(self, x, y, duration_ms, wait=False):
+        """模拟按压
+
+        写入常驻 shell 后立即返回，不等 swipe 执行完；wait=True 时等待完成
+        """
         # 将屏幕坐标转换为实际设备坐标
         # 使用 swipe 实现长按效果
-        subprocess.run(['adb', 'shell', 'input', 'swipe', str(x), str(y), str(x), str(y),
-                        str(duration_ms)], capture_output=True)
+        try:
+            # 不等待的按压不保存结果，否则每跳留下一条没人取的结果
+            cmd_id = self.session.swipe(int(x), int(y), int(duration_ms), track=wait)
+        except AdbSessionError as e:
+            print(f"adb shell 会话不可用，改用单次命令: {e}")
+            x, y = str(int(x)), str(int(y))
+            subprocess.run(self.session.adb + ['shell', 'input', 'swipe', x, y, x, y, str(int(duration_ms))],
+                           capture_output=True)
+            return
+        if wait:
+            self.session.wait(cmd_id, timeout=duration_ms / 1000 + 5)
+
+    def close(self):
+        """结束常驻会话"""
+        self.session.close()
 
 
 # ==================== Kivy 界面 ====================
@@ -455,6 +486,10 @@ class JumpApp(App):
         self.adb = ADBController()
         self.screenshot_path = "/sdcard/jump_screenshot.png"
         self.local_screenshot = "screenshot.png"
+        self.floating = None
+        # 截图、识别、按压都在引擎的工作线程里执行，界面线程只收发消息
+        self.engine = JumpEngine(lambda: self.adb.screenshot(self.local_screenshot),
+                                 self.algorithm, self.adb.tap, post=self.post_status)
 
     def build(self):
         """构建界面"""
@@ -472,7 +507,7 @@ class JumpApp(App):
     def set_coefficient(self, value):
         """设置按压系数"""
         self.current_coefficient = value
-        self.config.press_coefficient = value
+        self.engine.set_coefficient(value)
 
     def show_floating(self):
         """显示悬浮界面"""
@@ -488,13 +523,13 @@ class JumpApp(App):
         self.root.clear_widgets()
         self.root.add_widget(self.floating)
 
-        # 开始自动跳跃循环
-        Clock.schedule_interval(self.auto_jump_loop, 1.0)
+        # 开始自动跳跃
+        self.engine.start()
 
     def stop_jump(self, instance):
         """停止跳跃"""
         self.is_running = False
-        Clock.unschedule(self.auto_jump_loop)
+        self.engine.stop()
 
         # 恢复主界面
         Window.fullscreen = False
@@ -505,44 +540,19 @@ class JumpApp(App):
         self.root.add_widget(self.main_screen)
         self.main_screen.update_log("已停止")
 
-    def auto_jump_loop(self, dt):
-        """自动跳跃循环"""
-        if not self.is_running:
-            return
-
-        try:
-            # 截图
-            self.adb.screenshot(self.local_screenshot)
-
-            # 识别位置
-            result = self.algorithm.find_piece_and_board(self.local_screenshot)
-
-            if result is None:
-                self.floating.status_label.text = "检测失败"
-                return
-
-            piece_x, piece_y, board_x, board_y, delta_piece_y = result
-
-            # 计算距离
-            distance = math.sqrt((board_x - piece_x) ** 2 + (board_y - piece_y) ** 2)
-
-            # 计算按压时间
-            press_time = self.algorithm.calculate_press_time(distance, delta_piece_y)
-
-            # 执行跳跃
-            self.adb.tap(int(board_x), int(board_y), press_time)
-
-            # 更新状态
-            self.floating.status_label.text = f"距离: {distance:.0f}px | 按压: {press_time}ms"
+    def post_status(self, text):
+        """引擎线程发来的状态，转到界面线程显示"""
+        Clock.schedule_once(lambda dt: self.show_status(text))
 
-            # 等待落地
-            time.sleep(1.2)
+    def show_status(self, text):
+        """显示状态（界面线程）"""
+        if self.is_running and self.floating is not None:
+            self.floating.status_label.text = text
 
-        except Exception as e:
-            self.floating.status_label.text = f"错误: {str(e)}"
-            print(f"Error: {e}")
-            import traceback
-            traceback.print_exc()
+    def on_stop(self):
+        """应用退出时结束引擎线程和 adb 会话"""
+        self.engine.shutdown()
+        self.adb.close()
 
 
 # ==================== 启动 ====================
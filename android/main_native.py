@@ -20,6 +20,9 @@ import math
 import threading
 import time
 
+from jump_engine import JumpEngine
+from screencap import raw_screenshot
+
 # Android 特定导入
 try:
     from jnius import autoclass
@@ -59,10 +62,10 @@ class JumpAlgorithm:
     def __init__(self, config):
         self.config = config
 
-    def find_piece_and_board(self, screenshot_path):
-        """识别棋子和平台位置"""
+    def find_piece_and_board(self, screenshot):
+        """识别棋子和平台位置，screenshot 为内存中的图像或截图文件路径"""
         try:
-            im = Image.open(screenshot_path)
+            im = screenshot if isinstance(screenshot, Image.Image) else Image.open(screenshot)
             w, h = im.size
             im_pixel = im.load()
 
@@ -173,8 +176,14 @@ class JumpAlgorithm:
 class AndroidController:
     """Android 原生操作控制器"""
 
+    # 原始帧连续失败这么多次才改用 PNG 文件，偶发失败只影响当前一帧
+    RAW_FAILURE_LIMIT = 3
+
     def __init__(self):
         self.screenshot_path = None
+        # 优先从 screencap 标准输出读取原始帧，连续失败后改用 PNG 文件
+        self.raw_capture = True
+        self.raw_failures = 0
         if Android:
             try:
                 self.storage_path = primary_external_storage_path()
@@ -194,7 +203,22 @@ class AndroidController:
             request_permissions(permissions)
 
     def screenshot(self):
-        """截取屏幕"""
+        """截取屏幕，返回内存中的图像（原始帧）或截图文件路径，失败返回 None"""
+        if self.raw_capture:
+            image = raw_screenshot()
+            if image is not None:
+                self.raw_failures = 0
+                return image
+            self.raw_failures += 1
+            if self.raw_failures >= self.RAW_FAILURE_LIMIT:
+                print(f"原始截图连续失败 {self.raw_failures} 次，改用 PNG 文件")
+                self.raw_capture = False
+            else:
+                print("原始截图失败，本帧改用 PNG 文件")
+        return self.screenshot_path if self.screenshot_file() else None
+
+    def screenshot_file(self):
+        """截取屏幕到 PNG 文件"""
         if not self.screenshot_path:
             return False
 
@@ -433,12 +457,15 @@ class JumpApp(App):
         self.current_resolution = None
         self.current_coefficient = 2.0
         self.is_running = False
-        self.jump_count = 0
+        self.floating = None
 
         # 核心组件
         self.config = JumpConfig()
         self.algorithm = JumpAlgorithm(self.config)
         self.controller = AndroidController()
+        # 截图、识别、按压都在引擎的工作线程里执行，界面线程只收发消息
+        self.engine = JumpEngine(self.controller.screenshot, self.algorithm,
+                                 self.controller.tap, post=self.post_status)
 
     def build(self):
         """构建界面"""
@@ -453,17 +480,16 @@ class JumpApp(App):
     def set_coefficient(self, value):
         """设置按压系数"""
         self.current_coefficient = value
-        self.config.press_coefficient = value
+        self.engine.set_coefficient(value)
         print(f"按压系数设置为: {value}")
 
     def show_floating(self):
         """显示悬浮界面"""
-        if not self.controller.screenshot_path:
+        if not self.controller.screenshot_path and not self.controller.raw_capture:
             self.main_screen.show_popup("权限未授予！\n请在设置中允许存储权限")
             return
 
         self.is_running = True
-        self.jump_count = 0
 
         # 创建悬浮界面
         self.floating = FloatingButton(stop_callback=self.stop_jump)
@@ -476,13 +502,13 @@ class JumpApp(App):
         self.root.clear_widgets()
         self.root.add_widget(self.floating)
 
-        # 开始自动跳跃循环
-        Clock.schedule_interval(self.auto_jump_loop, 1.5)
+        # 开始自动跳跃
+        self.engine.start()
 
     def stop_jump(self, instance):
         """停止跳跃"""
         self.is_running = False
-        Clock.unschedule(self.auto_jump_loop)
+        self.engine.stop()
 
         # 恢复主界面
         from kivy.core.window import Window
@@ -492,49 +518,18 @@ class JumpApp(App):
         self.root.add_widget(self.main_screen)
         self.main_screen.update_log("已停止")
 
-    def auto_jump_loop(self, dt):
-        """自动跳跃循环"""
-        if not self.is_running:
-            return
-
-        try:
-            # 截图
-            self.floating.status_label.text = "截屏中..."
-            success = self.controller.screenshot()
-
-            if not success:
-                self.floating.status_label.text = "截图失败"
-                return
+    def post_status(self, text):
+        """引擎线程发来的状态，转到界面线程显示"""
+        Clock.schedule_once(lambda dt: self.show_status(text))
 
-            # 分析
-            self.floating.status_label.text = "分析中..."
-            result = self.algorithm.find_piece_and_board(self.controller.screenshot_path)
+    def show_status(self, text):
+        """显示状态（界面线程）"""
+        if self.is_running and self.floating is not None:
+            self.floating.status_label.text = text
 
-            if result is None:
-                self.floating.status_label.text = "检测失败"
-                return
-
-            piece_x, piece_y, board_x, board_y, delta_piece_y = result
-
-            # 计算距离和按压时间
-            distance = math.sqrt((board_x - piece_x) ** 2 + (board_y - piece_y) ** 2)
-            press_time = self.algorithm.calculate_press_time(distance, delta_piece_y)
-
-            # 执行按压
-            self.controller.tap(board_x, board_y, press_time)
-
-            # 更新状态
-            self.jump_count += 1
-            self.floating.status_label.text = f"距离: {distance:.0f}px | 按压: {press_time}ms | 第{self.jump_count}次"
-
-            # 等待落地
-            time.sleep(1.2)
-
-        except Exception as e:
-            self.floating.status_label.text = f"错误: {str(e)}"
-            print(f"跳跃循环错误: {e}")
-            import traceback
-            traceback.print_exc()
+    def on_stop(self):
+        """应用退出时结束引擎线程"""
+        self.engine.shutdown()
 
 
 if __name__ == '__main__':
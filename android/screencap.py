@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+screencap 原始帧解析 - 不依赖 kivy，main.py / main_native.py 共用
+
+screencap 不带 -p 时输出未压缩的帧缓冲：
+  宽(uint32) 高(uint32) 格式(uint32) [色彩空间(uint32)，Android 9 起才有] + 像素
+全部为小端。直接包装为 PIL 图像，省去 PNG 编码、写文件、再解码
+"""
+import struct
+import subprocess
+
+from PIL import Image
+
+# screencap 像素格式 -> (每像素字节数, PIL 解码 rawmode)
+RAW_FORMATS = {
+    1: (4, "RGBX"),    # RGBA_8888，透明通道对检测没用，直接丢掉
+    2: (4, "RGBX"),    # RGBX_8888
+    3: (3, "RGB"),     # RGB_888
+    4: (2, "BGR;16"),  # RGB_565
+    5: (4, "BGRX"),    # BGRA_8888
+}
+
+
+def parse_raw_screencap(data: bytes) -> Image.Image:
+    """解析 screencap 原始输出，返回 RGB 图像；格式不对时抛出 ValueError"""
+    if len(data) < 12:
+        raise ValueError(f"screencap 输出过短: {len(data)} bytes")
+    w, h, fmt = struct.unpack_from("<III", data, 0)
+    if fmt not in RAW_FORMATS:
+        raise ValueError(f"不支持的像素格式: {fmt}")
+    bpp, rawmode = RAW_FORMATS[fmt]
+    size = w * h * bpp
+
+    # 新系统头部多一个色彩空间字段，根据剩余长度判断头部是 12 还是 16 字节
+    header = 16 if len(data) - 16 == size else 12
+    if len(data) - header < size:
+        raise ValueError(f"像素数据不完整: {len(data) - header}/{size} bytes")
+    payload = memoryview(data)[header:header + size]
+    img = Image.frombuffer("RGB", (w, h), payload, "raw", rawmode, 0, 1)
+    # RGBX 的 rawmode 会被 PIL 直接映射成 RGBX 图像，这里统一成 RGB
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def raw_screenshot(command=("screencap",), timeout: float = 10) -> Image.Image:
+    """运行 screencap（不带 -p），从标准输出读取原始帧，失败返回 None"""
+    try:
+        result = subprocess.run(list(command), capture_output=True, timeout=timeout)
+        if result.returncode != 0:
+            print(f"screencap 失败: {result.stderr.decode(errors='ignore').strip()}")
+            return None
+        return parse_raw_screencap(result.stdout)
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"原始截图失败: {e}")
+        return None
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+常驻 adb 会话测试 - 用假 adb 脚本代替设备：命令完成标记、按压流水线、exec-out 截图、会话断开
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# 算法模块和测试画面在上一级目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adb_session import AdbSession, AdbSessionError  # noqa: E402
+from test_numpy_engine import make_frame  # noqa: E402
+from test_screencap import encode  # noqa: E402
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+FAKE_ADB = (sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_adb.py"))
+
+
+def fake_device(tmp, frame=None):
+    """设置假 adb 的日志与截图文件，返回日志路径"""
+    log = os.path.join(tmp, "adb.log")
+    os.environ["FAKE_ADB_LOG"] = log
+    os.environ["FAKE_ADB_FRAME"] = os.path.join(tmp, "frame.raw")
+    if frame is not None:
+        with open(os.environ["FAKE_ADB_FRAME"], "wb") as f:
+            f.write(frame)
+    return log
+
+
+def read_log(log):
+    with open(log, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def test_commands_share_one_shell():
+    """多条命令在同一个 shell 进程中执行，按标记取回退出码和输出"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = fake_device(tmp)
+        session = AdbSession(FAKE_ADB, serial="fake0")
+        try:
+            assert session.run("echo hello") == (0, ["hello"])
+            # 输出没有换行时标记接在同一行末尾，仍能识别（识别不了会等到超时报错）
+            assert session.run("printf partial", timeout=5) == (0, ["partial"])
+            assert session.run("unknown-command")[0] == 127
+            for _ in range(3):
+                assert session.run("input tap 1 2")[0] == 0
+        finally:
+            session.close()
+        spawns = [line for line in read_log(log) if line.startswith("spawn")]
+        assert spawns == ["spawn -s fake0 shell"]
+
+
+def test_swipe_pipelined():
+    """swipe 写入后立即返回，不等按住结束；wait_idle 等到执行完"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = fake_device(tmp)
+        session = AdbSession(FAKE_ADB)
+        try:
+            session.start()
+            start = time.perf_counter()
+            cmd_id = session.swipe(540, 1500, 300)
+            # 返回时按压还没执行完
+            assert cmd_id not in session.results
+            assert session.wait_idle(timeout=5)
+            done = time.perf_counter() - start
+            print(f"  执行完 {done * 1000:.0f}ms")
+            assert done >= 0.3
+            assert session.results.pop(cmd_id)[0] == 0
+        finally:
+            session.close()
+        assert read_log(log)[-1].endswith("input swipe 540 1500 540 1500 300")
+
+
+def test_untracked_commands_leave_no_results():
+    """不等待的按压完成后不保存结果，结果表不随跳跃次数增长"""
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_device(tmp)
+        session = AdbSession(FAKE_ADB)
+        try:
+            for _ in range(5):
+                session.swipe(540, 1500, 1, track=False)
+            assert session.wait_idle(timeout=5)
+            assert session.results == {} and session.untracked == set()
+            assert session.run("echo hello") == (0, ["hello"])
+        finally:
+            session.close()
+
+
+def test_exec_out_screencap():
+    """exec-out screencap 的原始帧直接解析为图像，设备没有输出时返回 None"""
+    rgb = np.array(make_frame(90, 160, 30, 100, 60, 60))
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_device(tmp, encode(rgb, 1, 0))
+        session = AdbSession(FAKE_ADB)
+        img = session.screencap()
+        assert img is not None and np.array_equal(np.asarray(img), rgb)
+        os.remove(os.environ["FAKE_ADB_FRAME"])
+        assert session.screencap() is None
+
+
+def test_session_restarts_after_exit():
+    """shell 退出后等待的命令报错，下一条命令重新启动会话"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = fake_device(tmp)
+        session = AdbSession(FAKE_ADB)
+        try:
+            cmd_id = session.send("exit")
+            try:
+                session.wait(cmd_id, timeout=5)
+            except AdbSessionError:
+                pass
+            else:
+                raise AssertionError("shell 退出后应报 AdbSessionError")
+            session.process.wait(timeout=5)
+            assert session.run("echo again") == (0, ["again"])
+        finally:
+            session.close()
+        assert sum(line.startswith("spawn") for line in read_log(log)) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("常驻 adb 会话测试")
+    print("=" * 70)
+    test_commands_share_one_shell()
+    test_swipe_pipelined()
+    test_untracked_commands_leave_no_results()
+    test_exec_out_screencap()
+    test_session_restarts_after_exit()
+    print("\n[OK] 所有测试通过")
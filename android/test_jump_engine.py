@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Android 跳跃引擎测试 - 命令队列、状态回传、节奏由实际耗时决定、停止立即生效
+"""
+import sys
+import threading
+import time
+
+from jump_engine import JumpEngine
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+class FakeConfig:
+    press_coefficient = 2.0
+
+
+class FakeAlgorithm:
+    """每张截图都识别出固定距离，按压时间与系数成正比"""
+
+    def __init__(self):
+        self.config = FakeConfig()
+
+    def find_piece_and_board(self, screenshot):
+        return None if screenshot == "bad" else (100, 500, 400, 100, 0)
+
+    def calculate_press_time(self, distance, delta_piece_y):
+        return int(self.config.press_coefficient * 10)
+
+
+class FakeDevice:
+    def __init__(self, frames=None):
+        self.frames = list(frames or [])
+        self.taps = []
+        self.status = []
+        self.tapped = threading.Event()
+
+    def capture(self):
+        return self.frames.pop(0) if self.frames else "ok"
+
+    def tap(self, x, y, press_ms):
+        self.taps.append((time.monotonic(), press_ms))
+        self.tapped.set()
+
+    def post(self, text):
+        self.status.append(text)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.005)
+
+
+def test_cycle_follows_landing_time():
+    """两次按压的间隔 = 按压时长 + 落地等待，没有额外的固定定时器"""
+    device = FakeDevice(frames=["bad"])
+    engine = JumpEngine(device.capture, FakeAlgorithm(), device.tap, post=device.post,
+                        landing_delay=0.05, retry_delay=0.01)
+    try:
+        engine.start()
+        wait_for(lambda: len(device.taps) >= 3)
+        engine.stop()
+    finally:
+        engine.shutdown()
+    gaps = [b[0] - a[0] for a, b in zip(device.taps, device.taps[1:])]
+    print(f"  按压间隔: {[round(g * 1000) for g in gaps]}ms")
+    assert all(0.07 <= g < 0.2 for g in gaps[:2])
+    assert device.status[:4] == ["运行中...", "截屏中...", "分析中...", "检测失败"]
+    assert "第1次" in device.status[device.status.index("截屏中...", 4) + 2]
+    assert device.status[-1] == "已停止"
+
+
+def test_stop_interrupts_landing_wait():
+    """落地等待期间收到停止命令立即生效，不再按压"""
+    device = FakeDevice()
+    engine = JumpEngine(device.capture, FakeAlgorithm(), device.tap, post=device.post, landing_delay=5.0)
+    try:
+        engine.start()
+        assert device.tapped.wait(2)
+        start = time.monotonic()
+        engine.stop()
+        wait_for(lambda: device.status[-1] == "已停止")
+        assert time.monotonic() - start < 0.5
+        time.sleep(0.05)
+        assert len(device.taps) == 1
+    finally:
+        engine.shutdown()
+    assert not engine.thread
+
+
+def test_coefficient_applied_on_worker():
+    """系数通过命令队列修改，下一次按压使用新系数；停止后可重新开始"""
+    device = FakeDevice()
+    algorithm = FakeAlgorithm()
+    engine = JumpEngine(device.capture, algorithm, device.tap, post=device.post, landing_delay=5.0)
+    try:
+        engine.start()
+        wait_for(lambda: len(device.taps) == 1)
+        engine.stop()
+        engine.set_coefficient(3.0)
+        engine.start()
+        wait_for(lambda: len(device.taps) == 2)
+    finally:
+        engine.shutdown()
+    assert [press for _, press in device.taps] == [20, 30]
+    assert algorithm.config.press_coefficient == 3.0
+
+
+def test_errors_reported_and_retried():
+    """截图抛出异常时发回错误状态并稍后重试，线程不退出"""
+    calls = []
+
+    def capture():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("设备断开")
+        return "ok"
+
+    device = FakeDevice()
+    engine = JumpEngine(capture, FakeAlgorithm(), device.tap, post=device.post,
+                        landing_delay=5.0, retry_delay=0.01)
+    try:
+        engine.start()
+        assert device.tapped.wait(2)
+    finally:
+        engine.shutdown()
+    assert "错误: 设备断开" in device.status
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("Android 跳跃引擎测试")
+    print("=" * 70)
+    test_cycle_follows_landing_time()
+    test_stop_interrupts_landing_wait()
+    test_coefficient_applied_on_worker()
+    test_errors_reported_and_retried()
+    print("\n[OK] 所有测试通过")
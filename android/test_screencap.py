@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+screencap 原始帧解析测试 - 各像素格式、新旧两种头部、截断数据、从子进程标准输出读取
+"""
+import os
+import struct
+import sys
+
+import numpy as np
+
+# 算法模块和测试画面在上一级目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screencap import parse_raw_screencap, raw_screenshot  # noqa: E402
+from algorithm import GameConfig, JumpAlgorithm  # noqa: E402
+from test_numpy_engine import make_frame  # noqa: E402
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def encode(rgb, fmt, colorspace=None):
+    """按 screencap 原始格式编码 RGB 数组"""
+    h, w = rgb.shape[:2]
+    r, g, b = (rgb[..., k].astype(np.uint16) for k in range(3))
+    if fmt in (1, 2):
+        pixels = np.dstack([rgb, np.full((h, w), 255, np.uint8)]).tobytes()
+    elif fmt == 3:
+        pixels = rgb.tobytes()
+    elif fmt == 4:
+        pixels = ((r >> 3) << 11 | (g >> 2) << 5 | (b >> 3)).astype("<u2").tobytes()
+    else:
+        pixels = np.dstack([rgb[..., ::-1], np.full((h, w), 255, np.uint8)]).tobytes()
+    header = struct.pack("<III", w, h, fmt)
+    if colorspace is not None:
+        header += struct.pack("<I", colorspace)
+    return header + pixels
+
+
+def test_formats_and_headers():
+    """所有像素格式、12/16 字节头部都解析为相同的 RGB 图像"""
+    rgb = np.array(make_frame(90, 160, 30, 100, 60, 60))
+    for fmt in (1, 2, 3, 5):
+        for colorspace in (None, 1):
+            img = parse_raw_screencap(encode(rgb, fmt, colorspace))
+            assert img.mode == "RGB" and img.size == (90, 160)
+            assert np.array_equal(np.asarray(img), rgb), (fmt, colorspace)
+
+    # RGB_565 有损，误差不超过量化步长
+    img = parse_raw_screencap(encode(rgb, 4, 0))
+    diff = np.abs(np.asarray(img).astype(int) - (rgb & 0xF8))
+    assert diff[..., 0].max() <= 7 and diff[..., 2].max() <= 7
+
+
+def test_invalid_data():
+    rgb = np.zeros((4, 4, 3), np.uint8)
+    for data in (b"", encode(rgb, 1)[:-5], encode(rgb, 9)):
+        try:
+            parse_raw_screencap(data)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("无效数据应报 ValueError")
+
+
+def test_detection_on_raw_frame():
+    """原始帧与 PNG 截图的检测结果相同"""
+    img = make_frame(360, 640, 100, 380, 260, 240)
+    raw = parse_raw_screencap(encode(np.array(img), 1, 0))
+    config = GameConfig()
+    config.detect_engine = "loop"
+    assert JumpAlgorithm(config).find_piece_and_board(raw) == JumpAlgorithm(config).find_piece_and_board(img)
+
+
+def test_raw_screenshot_from_stdout():
+    """从子进程标准输出读取原始帧，命令失败返回 None"""
+    rgb = np.array(make_frame(90, 160, 30, 100, 60, 60))
+    data = encode(rgb, 1, 0)
+    script = f"import sys; sys.stdout.buffer.write(bytes.fromhex('{data.hex()}'))"
+    img = raw_screenshot((sys.executable, "-c", script))
+    assert img is not None and np.array_equal(np.asarray(img), rgb)
+    assert raw_screenshot((sys.executable, "-c", "import sys; sys.exit(1)")) is None
+    assert raw_screenshot(("no-such-screencap-binary",)) is None
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("screencap 原始帧解析测试")
+    print("=" * 70)
+    test_formats_and_headers()
+    test_invalid_data()
+    test_detection_on_raw_frame()
+    test_raw_screenshot_from_stdout()
+    print("\n[OK] 所有测试通过")
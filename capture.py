@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+"""
+截图后端 - capture_game_screenshot 的可替换实现
+
+所有后端的 grab(region) 都返回 HxWx3 的 RGB uint8 数组，region 为 (x, y, 宽, 高)，None 表示全屏。
+返回的数组是后端内部缓冲的视图（不拷贝），下一次 grab 会覆盖，需要保留时调用方自行 copy()：
+  XShmBackend       X11 共享内存截图（MIT-SHM 不可用时退回 XGetImage），Linux/Xvfb
+  PyAutoGuiBackend  pyautogui.screenshot，所有平台可用的兜底方案
+  FileBackend       读取图片文件/目录循环回放，离线调试与测试用
+choose_backend 启动时对可用后端各截几帧，选最快的一个
+"""
+
+import ctypes
+import ctypes.util
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+
+class CaptureError(RuntimeError):
+    """截图后端不可用或截图失败"""
+
+
+class FrameBuffer:
+    """可复用的帧缓冲 - 按区域大小预分配，区域尺寸变化时才重新分配
+
+    array 为 HxWx3 的 RGB 数组，检测器直接读取（rgb 是同一个数组）；
+    只能产出 PIL 图像的后端用 paste 把截图 np.copyto 进来，不再每帧新建数组。
+    需要 PIL 图像时才调用 image()，用 Image.fromarray 按需生成
+    """
+
+    def __init__(self):
+        self.array = None
+        self.rgb = None
+        self.allocations = 0
+
+    def ensure(self, w: int, h: int) -> np.ndarray:
+        """保证缓冲大小为 w x h，返回 rgb 视图"""
+        if self.array is None or self.array.shape[:2] != (h, w):
+            self.array = np.zeros((h, w, 3), dtype=np.uint8)
+            self.rgb = self.array
+            self.allocations += 1
+        return self.rgb
+
+    def paste(self, img: Image.Image) -> np.ndarray:
+        """把 PIL 截图写入缓冲，返回 rgb 视图"""
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        np.copyto(self.ensure(*img.size), np.asarray(img))
+        return self.rgb
+
+    def image(self) -> Image.Image:
+        """缓冲当前内容的 PIL 图像"""
+        return Image.fromarray(self.rgb)
+
+
+def region_size(region: tuple, screen_size: tuple) -> tuple:
+    if region:
+        return int(region[2]), int(region[3])
+    return screen_size
+
+
+class CaptureBackend:
+    """截图后端接口"""
+
+    name = ""
+
+    def prepare(self, region: tuple = None):
+        """按区域预先分配缓冲，第一次截图不再临时分配"""
+
+    def grab(self, region: tuple = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(CaptureBackend):
+    """pyautogui 截图 - 每次新建 PIL 图像，速度一般但各平台都能用
+
+    每个线程一个帧缓冲：落地检测在执行线程上截图，不会覆盖流水线截图线程交出去的帧
+    """
+
+    name = "pyautogui"
+
+    def __init__(self):
+        try:
+            import pyautogui
+        except Exception as e:
+            # 没有图形环境时 pyautogui 导入即失败（例如 Linux 缺少 DISPLAY）
+            raise CaptureError(f"pyautogui 不可用: {e!r}")
+        self._pyautogui = pyautogui
+        self._local = threading.local()
+
+    @property
+    def buffer(self) -> FrameBuffer:
+        """当前线程的帧缓冲"""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = FrameBuffer()
+        return buffer
+
+    def prepare(self, region: tuple = None):
+        self.buffer.ensure(*region_size(region, tuple(self._pyautogui.size())))
+
+    def grab(self, region: tuple = None) -> np.ndarray:
+        if region:
+            img = self._pyautogui.screenshot(region=tuple(region))
+        else:
+            img = self._pyautogui.screenshot()
+        return self.buffer.paste(img)
+
+
+class FileBackend(CaptureBackend):
+    """图片回放 - path 为单个图片、图片目录或路径列表，按顺序循环返回
+
+    region 超出图片范围的部分被裁掉；图片在构造时全部解码缓存
+    """
+
+    name = "file"
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path, loop: bool = True):
+        if isinstance(path, (list, tuple)):
+            paths = list(path)
+        elif os.path.isdir(path):
+            paths = sorted(os.path.join(path, f) for f in os.listdir(path)
+                           if f.lower().endswith(self.EXTENSIONS))
+        else:
+            paths = [path]
+        if not paths:
+            raise CaptureError(f"没有可回放的图片: {path}")
+
+        self.frames = []
+        for p in paths:
+            try:
+                with Image.open(p) as img:
+                    self.frames.append(np.asarray(img.convert("RGB")))
+            except OSError as e:
+                raise CaptureError(f"无法读取 {p}: {e}")
+        self.loop = loop
+        self.index = 0
+
+    def grab(self, region: tuple = None) -> np.ndarray:
+        if self.index >= len(self.frames):
+            if not self.loop:
+                raise CaptureError("回放结束")
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        if region:
+            x, y, w, h = region
+            frame = frame[y:y + h, x:x + w]
+        return frame
+
+
+class _XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+_ZPIXMAP = 2
+_ALL_PLANES = ctypes.c_ulong(0xFFFFFFFF)
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+_SHMAT_FAILED = ctypes.c_void_p(-1).value
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+
+def _load_library(name: str):
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise CaptureError(f"找不到 lib{name}")
+    return ctypes.CDLL(path)
+
+
+class _XConnection:
+    """一个线程自己的 X 连接、共享内存段和帧缓冲"""
+
+    def __init__(self, display):
+        self.display = display
+        self.root = 0
+        self.visual = None
+        self.depth = 0
+        self.screen_size = (0, 0)
+        self.x_error = False
+        self.use_shm = False
+        self.image = None
+        self.image_size = None
+        self.shminfo = None
+        # 共享内存段上的 RGB 视图，以及 XGetImage 退回路径使用的帧缓冲
+        self.frame = None
+        self.buffer = FrameBuffer()
+
+
+class XShmBackend(CaptureBackend):
+    """X11 共享内存截图
+
+    XShmGetImage 由 X 服务器直接写入共享内存段，不经过套接字传输像素；
+    共享内存段按区域大小创建，区域尺寸变化时重建。MIT-SHM 不可用（远程显示）时退回 XGetImage。
+    流水线的截图线程和落地检测的执行线程都会截图，而 Tk 等库先于这里调用过 Xlib，
+    已经来不及 XInitThreads，所以每个线程各自打开一个 Display，互不共享连接和缓冲
+    """
+
+    name = "xshm"
+
+    def __init__(self, display: str = None):
+        self.x11 = _load_library("X11")
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.x11.XDefaultVisual.restype = ctypes.c_void_p
+        self.x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XGetImage.restype = ctypes.POINTER(_XImage)
+        self.x11.XGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+                                       ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong, ctypes.c_int]
+        self.x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        self.x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+        name = display or os.environ.get("DISPLAY")
+        if not name:
+            raise CaptureError("没有 DISPLAY")
+        self.display_name = name.encode()
+        self.shm_library = self._load_shm_library()
+        self._local = threading.local()
+        self._connections = {}
+        self._lock = threading.Lock()
+
+        # X 错误默认直接结束进程，这里只记录到出错的连接上
+        self._error_handler = _X_ERROR_HANDLER(self._on_x_error)
+        self.x11.XSetErrorHandler(self._error_handler)
+
+        # 在构造线程上先连一次，确认显示可用并读出屏幕尺寸
+        self.screen_size = self._connection().screen_size
+
+    @property
+    def use_shm(self) -> bool:
+        """当前线程的连接是否使用 MIT-SHM"""
+        return self._connection().use_shm
+
+    @use_shm.setter
+    def use_shm(self, value: bool):
+        self._connection().use_shm = value
+
+    def _connection(self) -> _XConnection:
+        """当前线程的 X 连接，第一次使用时打开"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        display = self.x11.XOpenDisplay(self.display_name)
+        if not display:
+            raise CaptureError(f"无法连接 X 显示 {self.display_name.decode()}")
+        conn = _XConnection(display)
+        screen = self.x11.XDefaultScreen(display)
+        conn.root = self.x11.XDefaultRootWindow(display)
+        conn.visual = self.x11.XDefaultVisual(display, screen)
+        conn.depth = self.x11.XDefaultDepth(display, screen)
+        conn.screen_size = (self.x11.XDisplayWidth(display, screen), self.x11.XDisplayHeight(display, screen))
+        with self._lock:
+            self._connections[display] = conn
+        conn.use_shm = self.shm_library and bool(self.xext.XShmQueryExtension(display))
+        self._local.conn = conn
+        return conn
+
+    def _on_x_error(self, display, event):
+        conn = self._connections.get(display)
+        if conn is not None:
+            conn.x_error = True
+        return 0
+
+    def _load_shm_library(self) -> bool:
+        try:
+            self.xext = _load_library("Xext")
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except CaptureError:
+            return False
+        self.xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        self.xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        self.xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                              ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo),
+                                              ctypes.c_uint, ctypes.c_uint]
+        self.xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        self.xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        self.xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                           ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        self.libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        self.libc.shmat.restype = ctypes.c_void_p
+        self.libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self.libc.shmdt.argtypes = [ctypes.c_void_p]
+        self.libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        return True
+
+    def _create_shm_image(self, conn: _XConnection, w: int, h: int):
+        self._release_shm_image(conn)
+        shminfo = _XShmSegmentInfo()
+        image = self.xext.XShmCreateImage(conn.display, conn.visual, conn.depth, _ZPIXMAP,
+                                          None, ctypes.byref(shminfo), w, h)
+        if not image:
+            raise CaptureError("XShmCreateImage 失败")
+        size = image.contents.bytes_per_line * h
+        shminfo.shmid = self.libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if shminfo.shmid < 0:
+            self.x11.XDestroyImage(image)
+            raise CaptureError(f"shmget 失败: errno {ctypes.get_errno()}")
+        shminfo.shmaddr = self.libc.shmat(shminfo.shmid, None, 0)
+        # shmat 失败返回 (void*)-1
+        if shminfo.shmaddr in (None, _SHMAT_FAILED):
+            errno = ctypes.get_errno()
+            self.libc.shmctl(shminfo.shmid, _IPC_RMID, None)
+            self.x11.XDestroyImage(image)
+            raise CaptureError(f"shmat 失败: errno {errno}")
+        image.contents.data = shminfo.shmaddr
+        shminfo.readOnly = 0
+        conn.image, conn.shminfo, conn.image_size = image, shminfo, (w, h)
+        conn.frame = self._rgb_view(image)
+
+        conn.x_error = False
+        self.xext.XShmAttach(conn.display, ctypes.byref(shminfo))
+        self.x11.XSync(conn.display, 0)
+        # 标记删除：进程退出或分离后由内核回收，不会残留共享内存段
+        self.libc.shmctl(shminfo.shmid, _IPC_RMID, None)
+        if conn.x_error:
+            self._release_shm_image(conn)
+            raise CaptureError("XShmAttach 失败")
+
+    def _release_shm_image(self, conn: _XConnection):
+        if conn.image is None:
+            return
+        self.xext.XShmDetach(conn.display, ctypes.byref(conn.shminfo))
+        self.x11.XSync(conn.display, 0)
+        conn.image.contents.data = None
+        self.x11.XDestroyImage(conn.image)
+        self.libc.shmdt(conn.shminfo.shmaddr)
+        conn.image = conn.shminfo = conn.image_size = conn.frame = None
+
+    @staticmethod
+    def _rgb_view(image) -> np.ndarray:
+        """XImage 像素（BGRX）的 RGB 视图：按 bytes_per_line 跨行、通道倒序，不拷贝"""
+        ximage = image.contents
+        if ximage.bits_per_pixel != 32 or ximage.red_mask != 0xFF0000 or ximage.blue_mask != 0xFF:
+            raise CaptureError(f"不支持的像素格式: {ximage.bits_per_pixel}bpp")
+        h, w = ximage.height, ximage.width
+        buf = (ctypes.c_uint8 * (ximage.bytes_per_line * h)).from_address(ximage.data)
+        bgrx = np.frombuffer(buf, dtype=np.uint8).reshape(h, ximage.bytes_per_line // 4, 4)
+        return bgrx[:, :w, 2::-1]
+
+    def prepare(self, region: tuple = None):
+        conn = self._connection()
+        if conn.use_shm:
+            w, h = region_size(region, self.screen_size)
+            if conn.image_size != (w, h):
+                self._create_shm_image(conn, w, h)
+
+    def grab(self, region: tuple = None) -> np.ndarray:
+        if region:
+            x, y, w, h = (int(v) for v in region)
+        else:
+            (w, h), x, y = self.screen_size, 0, 0
+
+        conn = self._connection()
+        if conn.use_shm:
+            try:
+                if conn.image_size != (w, h):
+                    self._create_shm_image(conn, w, h)
+                conn.x_error = False
+                if self.xext.XShmGetImage(conn.display, conn.root, conn.image, x, y, _ALL_PLANES) \
+                        and not conn.x_error:
+                    return conn.frame
+            except CaptureError:
+                conn.use_shm = False
+            if conn.use_shm:
+                raise CaptureError("XShmGetImage 失败")
+
+        conn.x_error = False
+        image = self.x11.XGetImage(conn.display, conn.root, x, y, w, h, _ALL_PLANES, _ZPIXMAP)
+        if not image:
+            raise CaptureError("XGetImage 失败")
+        try:
+            rgb = conn.buffer.ensure(w, h)
+            rgb[...] = self._rgb_view(image)
+            return rgb
+        finally:
+            self.x11.XDestroyImage(image)
+
+    def close(self):
+        """关闭所有线程的连接，调用前其他线程应已停止截图"""
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            self._release_shm_image(conn)
+            self.x11.XCloseDisplay(conn.display)
+        self._local = threading.local()
+
+
+# 自动选择时的候选顺序：越靠前越优先尝试
+BACKENDS = {
+    "xshm": XShmBackend,
+    "pyautogui": PyAutoGuiBackend,
+}
+
+
+def benchmark_backend(backend: CaptureBackend, region: tuple = None, frames: int = 5) -> float:
+    """连续截 frames 帧，返回每帧平均耗时（毫秒）；首帧用于预热（建共享内存段等），不计时"""
+    backend.grab(region)
+    start = time.perf_counter()
+    for _ in range(frames):
+        backend.grab(region)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def choose_backend(region: tuple = None, preferred: str = "auto", replay: str = "",
+                   frames: int = 5, backends: dict = None) -> CaptureBackend:
+    """选择截图后端
+
+    preferred 为 "auto" 时对所有能初始化的后端做一次小基准，保留最快的并关闭其他；
+    指定名称时只用该后端；replay 非空时直接使用 FileBackend 回放
+    """
+    if replay or preferred == "file":
+        return FileBackend(replay)
+
+    backends = BACKENDS if backends is None else backends
+    if preferred != "auto":
+        if preferred not in backends:
+            raise CaptureError(f"未知的截图后端: {preferred}")
+        backend = backends[preferred]()
+        backend.prepare(region)
+        return backend
+
+    best, best_ms = None, None
+    for name, factory in backends.items():
+        backend = None
+        try:
+            backend = factory()
+            elapsed = benchmark_backend(backend, region, frames)
+        except Exception as e:
+            print(f"截图后端 {name} 不可用: {e}")
+            if backend is not None:
+                backend.close()
+            continue
+        print(f"截图后端 {name}: {elapsed:.1f}ms/帧")
+        if best is None or elapsed < best_ms:
+            if best is not None:
+                best.close()
+            best, best_ms = backend, elapsed
+        else:
+            backend.close()
+    if best is None:
+        raise CaptureError("没有可用的截图后端")
+    best.prepare(region)
+    return best
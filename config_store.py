@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+配置存储 - 内存中保存配置，后台线程防抖写盘
+
+update 只修改内存中的数据并记下修改时间，后台线程等到连续 delay 秒没有新修改
+才写一次文件（拖动滑块时的连续修改合并成一次写入），界面线程从不等待磁盘。
+写入先写同目录的临时文件并 fsync，再 os.replace 原子替换，
+中途崩溃只会留下旧文件或临时文件，不会出现写了一半的 config.json
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class ConfigStore:
+    """防抖 + 原子写入的 JSON 配置文件"""
+
+    def __init__(self, path: str, delay: float = 0.5, clock=time.monotonic):
+        self.path = path
+        self.delay = delay
+        self.clock = clock
+        self.data = {}
+        self.dirty = False
+        self.changed_at = 0.0
+        self.writes = 0
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()   # 后台写入与 flush 不会交错，后取的快照一定后写
+        self.closed = False
+        self.thread = None
+
+    def load(self) -> dict:
+        """读取配置文件，不存在或已损坏时返回空字典"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            print(f"配置文件无法读取，使用默认配置: {e}")
+            data = {}
+        with self.cond:
+            self.data = dict(data) if isinstance(data, dict) else {}
+            return dict(self.data)
+
+    def update(self, values: dict):
+        """修改内存中的配置，稍后由后台线程写盘"""
+        with self.cond:
+            changed = {k: v for k, v in values.items() if self.data.get(k, object()) != v}
+            if not changed or self.closed:
+                return
+            self.data.update(changed)
+            self.dirty = True
+            self.changed_at = self.clock()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._write_loop, name="config-writer", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def flush(self):
+        """立即写入未保存的修改"""
+        with self.write_lock:
+            with self.cond:
+                if not self.dirty:
+                    return
+                snapshot = dict(self.data)
+                self.dirty = False
+            self._write(snapshot)
+
+    def close(self):
+        """写入未保存的修改并结束后台线程"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def _write_loop(self):
+        while True:
+            with self.cond:
+                while not self.dirty and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                # 等到连续 delay 秒没有新修改
+                quiet = self.clock() - self.changed_at
+                if quiet < self.delay:
+                    self.cond.wait(self.delay - quiet)
+                    continue
+            self.flush()
+
+    def _write(self, data: dict):
+        """写临时文件后原子替换"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.writes += 1
+        except (OSError, TypeError, ValueError) as e:
+            print(f"保存配置失败: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+飞行记录 - 内存中保留最近的截图、检测结果和按压时间，出问题时导出到磁盘
+
+记录只是把帧复制进环形缓冲（总字节数超过上限时丢弃最旧的帧），不做任何磁盘操作；
+被挤出的帧数组留作下一帧的缓冲，缓冲写满后每次记录只是一次 copyto、不再分配内存。
+导出时把选中的条目交给后台线程，由它压缩成 PNG 并写 index.jsonl，
+截图 / 分析 / 按压线程都不会等待磁盘
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from PIL import Image
+
+
+class FlightRecorder:
+    """最近若干帧的环形记录
+
+    max_bytes 为内存中帧数据的总上限；导出目录为 out_dir/<时间>_<原因>/
+    """
+
+    # 留作复用的被挤出帧数组最多几个
+    MAX_SPARE = 2
+
+    def __init__(self, out_dir: str = "recordings", max_bytes: int = 256 << 20,
+                 compress_level: int = 1, clock=time.time):
+        self.out_dir = out_dir
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.clock = clock
+        self.entries = deque()   # (元数据, 帧)
+        self.bytes = 0
+        self.next_id = 0
+        # 被挤出、可以复用的帧数组；排队导出中的条目（编号 -> 导出次数）挤出后不复用
+        self.spare = []
+        self.exporting = {}
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.writer = None
+        self.stats = {"recorded": 0, "reused": 0, "evicted": 0, "dumps": 0, "frames_written": 0}
+
+    def record(self, image: np.ndarray, detection: dict = None) -> int:
+        """复制一帧及其检测结果进缓冲，返回条目编号"""
+        image = np.asarray(image, dtype=np.uint8)
+        with self.lock:
+            frame = self._take_spare(image.shape)
+        if frame is None:
+            frame = np.empty(image.shape, dtype=np.uint8)
+        np.copyto(frame, image)
+        with self.lock:
+            entry_id = self.next_id
+            self.next_id += 1
+            meta = {"id": entry_id, "time": self.clock(), "shape": list(frame.shape),
+                    "detection": detection, "press_ms": None}
+            self.entries.append((meta, frame))
+            self.bytes += frame.nbytes
+            self.stats["recorded"] += 1
+            while self.bytes > self.max_bytes and len(self.entries) > 1:
+                old_meta, old = self.entries.popleft()
+                self.bytes -= old.nbytes
+                self.stats["evicted"] += 1
+                if old_meta["id"] not in self.exporting:
+                    self.spare.append(old)
+            del self.spare[:-self.MAX_SPARE]
+        return entry_id
+
+    def _take_spare(self, shape: tuple) -> np.ndarray:
+        """取一个同尺寸的空闲帧数组，没有时返回 None；调用方持有 self.lock"""
+        for i, frame in enumerate(self.spare):
+            if frame.shape == shape:
+                self.stats["reused"] += 1
+                return self.spare.pop(i)
+        return None
+
+    def mark_jump(self, entry_id: int, press_ms: float, **extra):
+        """记下按这一帧的决策执行的按压"""
+        with self.lock:
+            for meta, _ in reversed(self.entries):
+                if meta["id"] == entry_id:
+                    meta["press_ms"] = press_ms
+                    meta.update(extra)
+                    return True
+        return False
+
+    def dump(self, reason: str = "manual", jumps: int = 30) -> str:
+        """导出最近 jumps 次跳跃（从其中最早一跳的帧到最新一帧），返回导出目录
+
+        没有跳跃时导出全部缓冲；只排队，由后台线程写盘
+        """
+        with self.lock:
+            entries = [(dict(meta), frame) for meta, frame in self.entries]
+            jumped = [i for i, (meta, _) in enumerate(entries) if meta["press_ms"] is not None]
+            if jumped:
+                entries = entries[jumped[-jumps] if len(jumped) >= jumps else jumped[0]:]
+            # 写盘前这些帧数组不能被复用
+            for meta, _ in entries:
+                self.exporting[meta["id"]] = self.exporting.get(meta["id"], 0) + 1
+        if not entries:
+            return None
+
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.clock()))
+        path = os.path.join(self.out_dir, f"{stamp}_{reason}")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.out_dir, f"{stamp}_{reason}_{suffix}")
+        try:
+            os.makedirs(path)
+        except OSError:
+            self._release(entries)
+            raise
+
+        if self.writer is None or not self.writer.is_alive():
+            self.writer = threading.Thread(target=self._write_loop, name="flight-recorder", daemon=True)
+            self.writer.start()
+        self.jobs.put((path, reason, entries))
+        return path
+
+    def flush(self):
+        """等待已排队的导出全部写完"""
+        self.jobs.join()
+
+    def close(self):
+        """写完已排队的导出并结束后台线程"""
+        if self.writer is not None:
+            self.jobs.put(None)
+            self.writer.join()
+            self.writer = None
+
+    def _write_loop(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                self._write(*job)
+            except Exception as e:
+                print(f"飞行记录导出失败: {e}")
+            finally:
+                if job is not None:
+                    self._release(job[2])
+                self.jobs.task_done()
+
+    def _release(self, entries: list):
+        """导出写完，这些帧数组挤出后可以复用"""
+        with self.lock:
+            for meta, _ in entries:
+                count = self.exporting.pop(meta["id"]) - 1
+                if count:
+                    self.exporting[meta["id"]] = count
+
+    def _write(self, path: str, reason: str, entries: list):
+        with open(os.path.join(path, "index.jsonl"), "w", encoding="utf-8") as index:
+            for meta, frame in entries:
+                name = f"frame_{meta['id']:06d}.png"
+                Image.fromarray(frame).save(os.path.join(path, name), compress_level=self.compress_level)
+                meta["file"] = name
+                index.write(json.dumps(meta, ensure_ascii=False) + "\n")
+                self.stats["frames_written"] += 1
+        self.stats["dumps"] += 1
+        print(f"飞行记录已导出（{reason}）: {path}，{len(entries)} 帧")
@@ -17,435 +17,23 @@ import threading
 import time
 import tkinter as tk
 from tkinter import filedialog, simpledialog
-import json
-import os
-import random
-from PIL import Image
-import math
+
+from algorithm import GameConfig, JumpAlgorithm
+import capture
+import vision
+from settle import SettleDetector
+from pipeline import JumpPipeline, RETRY_NOW
+from actuator import PressActuator
+from status import StatusChannel
+from config_store import ConfigStore
+from telemetry import LatencyRecorder
+from flight_recorder import FlightRecorder
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 pyautogui.FAILSAFE = False
 
 
-class GameConfig:
-    """游戏配置数据类"""
-    base_screen_width: int = 1920
-    base_screen_height: int = 1080
-    piece_base_height_1_2: int = 20
-    piece_body_width: int = 70
-    head_diameter: int = 135
-    press_coefficient: float = 1.5  # wangshub 经典值，可根据实际情况调整
-    min_press_time: int = 200  # 降低最小按压时间
-    max_press_time: int = 2000
-    piece_template: str = ""
-    # 游戏区域 - 预设值覆盖游戏画面 [400, 0, 1000, 1080]
-    game_area: list = [400, 0, 1000, 1080]
-    # 按压区域
-    press_area: list = None
-
-    # 新增：距离限制，防止检测错误
-    max_valid_distance: int = 600  # 最大有效距离
-    min_valid_distance: int = 30   # 最小有效距离
-
-
-class JumpAlgorithm:
-    """跳跃算法核心类 - v4.0 完整移植wangshub核心算法"""
-
-    def __init__(self, config: GameConfig):
-        self.config = config
-        self.scale = 1.0
-
-        # 上一次的检测位置，用于平滑和验证
-        self.last_piece_x = 0
-        self.last_piece_y = 0
-        self.last_board_x = 0
-        self.last_board_y = 0
-
-    def calculate_scale(self, img_width: int, img_height: int):
-        base_width = 1920
-        base_height = 1080
-        self.scale = (img_width / base_width + img_height / base_height) / 2
-        return self.scale
-
-    def find_piece_and_board(self, img: Image.Image) -> tuple:
-        """寻找关键坐标 - 完整移植自wangshub/wechat_jump_game
-
-        核心逻辑：
-        1. 识别棋子：根据棋子颜色检测位置
-        2. 识别平台：根据底色和方块色差检测
-        3. 计算对称中心：用于计算delta_piece_y
-        4. 返回：piece_x, piece_y, board_x, board_y, delta_piece_y
-        """
-        if img is None:
-            return 0, 0, 0, 0, 0
-
-        w, h = img.size
-        self.calculate_scale(w, h)
-        im_pixel = img.load()
-
-        points = []
-        piece_y_max = 0
-        board_x = 0
-        board_y = 0
-
-        # wangshub: 扫描棋子时的左右边界
-        scan_x_border = int(w / 8)
-        scan_start_y = 0
-
-        # wangshub: 以50px步长，尝试探测scan_start_y
-        for i in range(int(h / 3), int(h * 2 / 3), 50):
-            last_pixel = im_pixel[0, i]
-            for j in range(1, w):
-                pixel = im_pixel[j, i]
-                if pixel != last_pixel:
-                    scan_start_y = i - 50
-                    break
-            if scan_start_y:
-                break
-
-        # wangshub: 从scan_start_y开始往下扫描，棋子应位于屏幕上半部分
-        for i in range(scan_start_y, int(h * 2 / 3)):
-            for j in range(scan_x_border, w - scan_x_border):
-                pixel = im_pixel[j, i]
-                # wangshub: 根据棋子的最低行的颜色判断（严格的RGB范围）
-                if (50 < pixel[0] < 60) and (53 < pixel[1] < 63) and (95 < pixel[2] < 110):
-                    points.append((j, i))
-                    piece_y_max = max(i, piece_y_max)
-
-        if not points:
-            return 0, 0, 0, 0, 0
-
-        # wangshub: 所有最底层的点的横坐标
-        bottom_x = [x for x, y in points if y == piece_y_max]
-        if not bottom_x:
-            return 0, 0, 0, 0, 0
-
-        piece_x = int(sum(bottom_x) / len(bottom_x))
-        piece_y = piece_y_max - self.config.piece_base_height_1_2
-
-        # wangshub: 限制棋盘扫描的横坐标，避免音符bug
-        if piece_x < w / 2:
-            board_x_start = piece_x
-            board_x_end = w
-        else:
-            board_x_start = 0
-            board_x_end = piece_x
-
-        # wangshub: 扫描平台中心
-        for i in range(int(h / 3), int(h * 2 / 3)):
-            last_pixel = im_pixel[0, i]
-            if board_x or board_y:
-                break
-            board_x_sum = 0
-            board_x_c = 0
-
-            for j in range(int(board_x_start), int(board_x_end)):
-                pixel = im_pixel[j, i]
-                # wangshub: 修掉脑袋比下一个小格子还高的情况的bug
-                if abs(j - piece_x) < self.config.piece_body_width:
-                    continue
-
-                # wangshub: 检查Y轴下面5个像素，和背景色相同，那么是干扰
-                ver_pixel = im_pixel[j, i + 5]
-                if abs(pixel[0] - last_pixel[0]) + abs(pixel[1] - last_pixel[1]) + abs(pixel[2] - last_pixel[2]) > 10 \
-                        and abs(ver_pixel[0] - last_pixel[0]) + abs(ver_pixel[1] - last_pixel[1]) + abs(ver_pixel[2] - last_pixel[2]) > 10:
-                    board_x_sum += j
-                    board_x_c += 1
-            if board_x_sum:
-                board_x = board_x_sum / board_x_c
-        last_pixel = im_pixel[board_x, i]
-
-        # wangshub: 计算对称中心，用于获取delta_piece_y
-        center_x = w / 2 + (24 / 1080) * w
-        center_y = h / 2 + (17 / 1920) * h
-
-        if piece_x > center_x:
-            board_y = round((25.5 / 43.5) * (board_x - center_x) + center_y)
-            delta_piece_y = piece_y - round((25.5 / 43.5) * (piece_x - center_x) + center_y)
-        else:
-            board_y = round(-(25.5 / 43.5) * (board_x - center_x) + center_y)
-            delta_piece_y = piece_y - round(-(25.5 / 43.5) * (piece_x - center_x) + center_y)
-
-        if not all((board_x, board_y)):
-            return 0, 0, 0, 0, 0
-
-        return piece_x, piece_y, board_x, board_y, delta_piece_y
-
-    def _find_symmetry_center(self, w: int, h: int) -> tuple:
-        """计算游戏对称中心 - wangshub方法"""
-        # 游戏中心偏移量（基于 1080x1920 屏幕）
-        center_x = w / 2 + (24 / 1080) * w
-        center_y = h / 2 + (17 / 1920) * h
-        return center_x, center_y
-
-    def _calculate_delta_piece_y(self, piece_x: float, piece_y: float, center_x: float, center_y: float) -> float:
-        """计算棋子Y轴偏移（相对于对称中心）- wangshub方法"""
-        if piece_x > center_x:
-            # 棋子在中心右侧
-            expected_piece_y = round((25.5 / 43.5) * (piece_x - center_x) + center_y)
-        else:
-            # 棋子在中心左侧
-            expected_piece_y = round(-(25.5 / 43.5) * (piece_x - center_x) + center_y)
-        delta_piece_y = piece_y - expected_piece_y
-        return delta_piece_y
-
-    def _find_piece(self, im_pixel, w: int, h: int) -> tuple:
-        """识别棋子位置 - 改进版，更稳定"""
-        points = []
-        piece_y_max = 0
-
-        # 搜索屏幕中间区域
-        scan_start_x = int(w * 0.2)
-        scan_end_x = int(w * 0.8)
-
-        for i in range(int(h * 0.3), int(h * 0.7)):
-            row_points = []
-            for j in range(scan_start_x, scan_end_x):
-                pixel = im_pixel[j, i]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-
-                # 深紫色棋子检测 - 放宽条件
-                purple = (r < g and g < b and r > 25 and r < 100 and
-                         g > 5 and g < 80 and b > 50 and b < 140)
-
-                if purple:
-                    row_points.append(j)
-                    piece_y_max = max(i, piece_y_max)
-
-            # 如果这一行有多个连续的点，记录中间位置
-            if row_points:
-                mid_x = sum(row_points) // len(row_points)
-                points.append((mid_x, i))
-
-        if len(points) < 5:
-            # 备用方案：暗色检测
-            for i in range(int(h * 0.3), int(h * 0.7)):
-                for j in range(scan_start_x, scan_end_x):
-                    pixel = im_pixel[j, i]
-                    r, g, b = pixel[0], pixel[1], pixel[2]
-                    brightness = r + g + b
-                    if brightness < 450:
-                        points.append((j, i))
-                        piece_y_max = max(i, piece_y_max)
-
-        if not points:
-            return 0, 0
-
-        # 找到棋子底部中心
-        bottom_points = [p for p in points if p[1] >= piece_y_max - 5]
-        if bottom_points:
-            piece_x = int(sum([p[0] for p in bottom_points]) / len(bottom_points))
-        else:
-            piece_x = int(sum([p[0] for p in points]) / len(points))
-
-        piece_y = piece_y_max - int(self.config.piece_base_height_1_2 * self.scale)
-
-        return piece_x, piece_y
-
-    def _find_board_center(self, im_pixel, w: int, h: int, piece_x: float, piece_y: float) -> tuple:
-        """识别目标平台中心 - 双向搜索，找最可能的下一个平台"""
-
-        # 双向搜索：棋子的左侧和右侧都要搜索
-        # 因为不知道下一个平台在哪一边，需要找最亮的平台
-
-        candidates = []  # 候选平台列表
-
-        # 搜索范围：从棋子向两边扩展
-        left_search_end = max(50, int(piece_x - 100 * self.scale))
-        right_search_start = min(w - 50, int(piece_x + 100 * self.scale))
-
-        # 在棋子Y坐标附近搜索
-        search_y_start = max(int(h * 0.2), int(piece_y - 150))
-        search_y_end = min(int(h * 0.8), int(piece_y + 150))
-
-        # 搜索右侧
-        right_candidates = self._search_direction(im_pixel, right_search_start, w - 20,
-                                                   search_y_start, search_y_end, piece_x)
-        candidates.extend(right_candidates)
-
-        # 搜索左侧
-        left_candidates = self._search_direction(im_pixel, 50, left_search_end,
-                                                  search_y_start, search_y_end, piece_x)
-        candidates.extend(left_candidates)
-
-        # 找到最佳候选（最大、最亮的平台）
-        if candidates:
-            # 按亮色像素数量排序，找最大的
-            candidates.sort(key=lambda x: x[2], reverse=True)
-            best = candidates[0]
-            return best[0], best[1]
-
-        # 备用方案：简单检测
-        bright_pixels = []
-        for i in range(search_y_start, search_y_end):
-            for j in range(50, w - 50):
-                if abs(j - piece_x) < int(80 * self.scale):
-                    continue
-                pixel = im_pixel[j, i]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-                brightness = r + g + b
-                if 550 < brightness < 720:
-                    bright_pixels.append((j, i))
-
-        if bright_pixels:
-            avg_x = int(sum([p[0] for p in bright_pixels]) / len(bright_pixels))
-            avg_y = int(sum([p[1] for p in bright_pixels]) / len(bright_pixels))
-            return avg_x, avg_y
-
-        return 0, 0
-
-    def _search_direction(self, im_pixel, start_x, end_x, start_y, end_y, piece_x):
-        """在指定方向搜索平台"""
-        candidates = []
-
-        for i in range(start_y, end_y):
-            bright_pixels = []
-
-            for j in range(start_x, end_x):
-                # 跳过棋子附近（当前平台）- 加大排除半径避免选中当前平台
-                if abs(j - piece_x) < int(150 * self.scale):
-                    continue
-
-                pixel = im_pixel[j, i]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-
-                # 检测平台（亮色）
-                brightness = r + g + b
-                if brightness > 500 and r > 150 and g > 150 and b > 150:
-                    # 排除纯白色背景
-                    if brightness < 750:
-                        bright_pixels.append(j)
-
-            # 找到连续的亮色区域
-            if len(bright_pixels) >= 10:
-                # 分组检测平台
-                groups = []
-                current_group = [bright_pixels[0]]
-
-                for k in range(1, len(bright_pixels)):
-                    if bright_pixels[k] - bright_pixels[k-1] <= 5:
-                        current_group.append(bright_pixels[k])
-                    else:
-                        groups.append(current_group)
-                        current_group = [bright_pixels[k]]
-                groups.append(current_group)
-
-                # 找最大的组
-                for group in groups:
-                    if len(group) >= 10:
-                        center_x = (group[0] + group[-1]) // 2
-                        # 计算到棋子的距离
-                        distance = abs(center_x - piece_x)
-                        # 记录候选：[center_x, center_y, pixel_count]
-                        candidates.append((center_x, i, len(group), distance))
-
-        return candidates
-
-        # 在棋子Y坐标附近搜索
-        search_y_start = max(int(h * 0.2), int(piece_y - 150))
-        search_y_end = min(int(h * 0.8), int(piece_y + 150))
-
-        best_center_x = 0
-        best_center_y = 0
-        max_bright_count = 0
-
-        # 寻找平台表面（亮色线条）
-        for i in range(search_y_start, search_y_end):
-            bright_pixels = []
-
-            for j in range(search_start, search_end):
-                # 跳过棋子附近（当前平台）- 加大排除半径避免选中当前平台
-                if abs(j - piece_x) < int(150 * self.scale):
-                    continue
-
-                pixel = im_pixel[j, i]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-
-                # 检测平台（亮色）
-                brightness = r + g + b
-                if brightness > 500 and r > 150 and g > 150 and b > 150:
-                    # 排除纯白色背景
-                    if brightness < 750:
-                        bright_pixels.append(j)
-
-            # 找到连续的亮色区域
-            if len(bright_pixels) >= 10:
-                # 分组检测平台
-                groups = []
-                current_group = [bright_pixels[0]]
-
-                for k in range(1, len(bright_pixels)):
-                    if bright_pixels[k] - bright_pixels[k-1] <= 5:
-                        current_group.append(bright_pixels[k])
-                    else:
-                        groups.append(current_group)
-                        current_group = [bright_pixels[k]]
-                groups.append(current_group)
-
-                # 找最大的组（最可能是平台）
-                for group in groups:
-                    if len(group) > max_bright_count:
-                        max_bright_count = len(group)
-                        best_center_x = (group[0] + group[-1]) // 2
-                        best_center_y = i
-
-        if best_center_x > 0 and max_bright_count >= 10:
-            return best_center_x, best_center_y
-
-        # 备用方案：简单检测
-        bright_pixels = []
-        for i in range(search_y_start, search_y_end):
-            for j in range(search_start, search_end):
-                if abs(j - piece_x) < int(80 * self.scale):
-                    continue
-                pixel = im_pixel[j, i]
-                r, g, b = pixel[0], pixel[1], pixel[2]
-                brightness = r + g + b
-                if 550 < brightness < 720:
-                    bright_pixels.append((j, i))
-
-        if bright_pixels:
-            avg_x = int(sum([p[0] for p in bright_pixels]) / len(bright_pixels))
-            avg_y = int(sum([p[1] for p in bright_pixels]) / len(bright_pixels))
-            return avg_x, avg_y
-
-        return 0, 0
-
-    def calculate_jump_time(self, distance: float, delta_piece_y: float = 0) -> int:
-        """计算跳跃按压时间 - wangshub 二次曲线算法
-
-        完整移植自: https://github.com/wangshub/wechat_jump_game
-
-        核心公式:
-            scale = 0.945 * 2 / head_diameter
-            actual_distance = distance * scale * math.sqrt(6) / 2
-            press_time = (-945 + math.sqrt(945**2 + 4 * 105 * 36 * actual_distance)) / (2 * 105) * 1000
-            press_time *= press_coefficient
-            press_time += delta_piece_y
-            press_time = max(press_time, 200)
-        """
-        # 限制距离范围
-        distance = max(self.config.min_valid_distance,
-                      min(distance, self.config.max_valid_distance))
-
-        # wangshub 二次曲线算法
-        # 计算程序长度与截图测得的距离的比例
-        scale = 0.945 * 2 / (self.config.head_diameter * self.scale)
-        actual_distance = distance * scale * (math.sqrt(6) / 2)
-        press_time = (-945 + math.sqrt(945 ** 2 + 4 * 105 *
-                                       36 * actual_distance)) / (2 * 105) * 1000
-        press_time *= self.config.press_coefficient
-        press_time = max(press_time, 200)
-        press_time = int(press_time)
-
-        return press_time
-
-    def calculate_distance(self, piece_x: float, piece_y: float, board_x: float, board_y: float) -> float:
-        """计算两点之间的欧几里得距离"""
-        return math.sqrt((board_x - piece_x) ** 2 + (board_y - piece_y) ** 2)
-
-
 class JumpJumpAuto(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -460,7 +48,20 @@ class JumpJumpAuto(ctk.CTk):
 
         self.config = GameConfig()
         self.algorithm = JumpAlgorithm(self.config)
+        self.capture_backend = None
+        # pyautogui 默认每次调用后暂停 PAUSE 秒，按下后的暂停会直接加到按住时长上，这里关闭
+        self.actuator = PressActuator(
+            mouse_down=lambda: pyautogui.mouseDown(button='left', _pause=False),
+            mouse_up=lambda: pyautogui.mouseUp(button='left', _pause=False),
+            move_to=lambda x, y: pyautogui.moveTo(x, y, _pause=False))
         self.config_file = "config.json"
+        # 每轮各阶段耗时的滚动分位数
+        self.latency = LatencyRecorder()
+        # 飞行记录：第一次开始时按配置创建，跨多次开始/停止保留
+        self.flight = None
+        self.misses = 0
+        # 配置先改内存，后台线程在停止修改一段时间后原子写盘
+        self.config_store = ConfigStore(self.config_file)
 
         # UI组件
         self.status_label = None
@@ -472,9 +73,12 @@ class JumpJumpAuto(ctk.CTk):
         self.template_entry = None
         self.press_entry = None
 
+        # 工作线程发布状态，界面线程只在有更新时刷新变化的标签
+        self.ui_status = StatusChannel(lambda callback: self.after(0, callback), self._apply_ui)
+
         self._init_ui()
         self._load_config()
-        self._start_ui_updater()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _init_ui(self):
         # 标题
@@ -545,8 +149,10 @@ class JumpJumpAuto(ctk.CTk):
         self.status_label.pack(pady=5)
         self.count_label = ctk.CTkLabel(status_frame, text="跳跃次数: 0", font=ctk.CTkFont(size=12), text_color="#888888")
         self.count_label.pack(pady=2)
-        self.detail_label = ctk.CTkLabel(status_frame, text="", font=ctk.CTkFont(size=11), text_color="#aaaaaa")
+        self.detail_label = ctk.CTkLabel(status_frame, text="", font=ctk.CTkFont(size=11), text_color="#aaaaaa", wraplength=620)
         self.detail_label.pack(pady=2)
+        ctk.CTkButton(status_frame, text=f"导出最近{self.config.recorder_dump_jumps}跳", width=120,
+                      command=self._cmd_dump_flight).pack(pady=4)
 
         # 按钮
         button_frame = ctk.CTkFrame(self)
@@ -557,39 +163,22 @@ class JumpJumpAuto(ctk.CTk):
         self.stop_btn.pack(side="right", padx=60)
         self.stop_btn.configure(state="disabled")
 
-    def _start_ui_updater(self):
-        try:
-            if self.status_label:
-                self._safe_update_ui()
-        except:
-            pass
-        self.after(100, self._start_ui_updater)
-
-    def _safe_update_ui(self):
-        try:
-            if hasattr(self, '_ui_status'):
-                self.status_label.configure(text=self._ui_status)
-        except:
-            pass
-        try:
-            if hasattr(self, '_ui_count'):
-                self.count_label.configure(text=self._ui_count)
-        except:
-            pass
-        try:
-            if hasattr(self, '_ui_detail'):
-                self.detail_label.configure(text=self._ui_detail)
-        except:
-            pass
+    def _apply_ui(self, changes):
+        labels = {"status": self.status_label, "count": self.count_label, "detail": self.detail_label}
+        for field, text in changes.items():
+            try:
+                labels[field].configure(text=text)
+            except:
+                pass
 
     def _set_status(self, text):
-        self._ui_status = text
+        self.ui_status.publish(status=text)
 
     def _set_count(self, text):
-        self._ui_count = text
+        self.ui_status.publish(count=text)
 
     def _set_detail(self, text):
-        self._ui_detail = text
+        self.ui_status.publish(detail=text)
 
     def _set_res(self, w, h):
         self.config.base_screen_width = w
@@ -713,6 +302,12 @@ class JumpJumpAuto(ctk.CTk):
                 temp_file = tempfile.gettempdir() + "/jump_piece_template.png"
                 screenshot.save(temp_file)
                 self.config.piece_template = temp_file
+                # 纯函数计算，不改动检测线程正在使用的 algorithm.scale
+                if self.config.game_area:
+                    self.config.piece_template_scale = vision.frame_scale(
+                        self.config.game_area[2], self.config.game_area[3])
+                else:
+                    self.config.piece_template_scale = vision.frame_scale(*pyautogui.size())
                 self.template_entry.delete(0, tk.END)
                 self.template_entry.insert(0, temp_file)
                 self._set_status(f"状态: 已截取 {width}x{height}")
@@ -725,6 +320,7 @@ class JumpJumpAuto(ctk.CTk):
         file_path = filedialog.askopenfilename(title="选择棋子截图", filetypes=[("图片", "*.png *.jpg *.jpeg *.bmp")])
         if file_path:
             self.config.piece_template = file_path
+            self.config.piece_template_scale = 0.0
             self.template_entry.delete(0, tk.END)
             self.template_entry.insert(0, file_path)
             self._set_status("状态: 模板已加载")
@@ -737,59 +333,65 @@ class JumpJumpAuto(ctk.CTk):
                 'screen_width': self.config.base_screen_width,
                 'screen_height': self.config.base_screen_height,
                 'piece_template': self.config.piece_template,
+                'piece_template_scale': self.config.piece_template_scale,
+                'capture_backend': self.config.capture_backend,
+                'capture_replay': self.config.capture_replay,
                 'game_area': self.config.game_area,
                 'press_area': self.config.press_area,
             }
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=2)
+            self.config_store.update(config_data)
         except:
             pass
 
     def _load_config(self):
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    config_data = json.load(f)
-                    self.config.press_coefficient = config_data.get("press_coefficient", 1.5)
-                    self.config.base_screen_width = config_data.get("screen_width", 1920)
-                    self.config.base_screen_height = config_data.get("screen_height", 1080)
-                    self.config.piece_template = config_data.get("piece_template", "")
-                    self.config.game_area = config_data.get("game_area", [400, 0, 1000, 1080])
-                    self.config.press_area = config_data.get("press_area", None)
-
-                    self.coeff_scale.set(1.5)  # 使用wangshub经典值
-                    self.coeff_label.configure(text=f"{self.config.press_coefficient:.2f}")
-                    self.res_label.configure(text=f"{self.config.base_screen_width}x{self.config.base_screen_height}")
-
-                    if self.config.game_area:
-                        self.area_entry.delete(0, tk.END)
-                        self.area_entry.insert(0, f"{self.config.game_area[0]},{self.config.game_area[1]},{self.config.game_area[2]},{self.config.game_area[3]}")
-                    else:
-                        self.area_entry.delete(0, tk.END)
-                        self.area_entry.insert(0, "全屏")
-
-                    if self.config.press_area:
-                        self.press_entry.delete(0, tk.END)
-                        self.press_entry.insert(0, f"{self.config.press_area[0]}, {self.config.press_area[1]}")
-                    else:
-                        self.press_entry.delete(0, tk.END)
-                        self.press_entry.insert(0, "自动中心")
-
-                    if self.config.piece_template:
-                        self.template_entry.delete(0, tk.END)
-                        self.template_entry.insert(0, self.config.piece_template)
+            config_data = self.config_store.load()
+            if config_data:
+                self.config.press_coefficient = config_data.get("press_coefficient", 1.5)
+                self.config.base_screen_width = config_data.get("screen_width", 1920)
+                self.config.base_screen_height = config_data.get("screen_height", 1080)
+                self.config.piece_template = config_data.get("piece_template", "")
+                self.config.piece_template_scale = config_data.get("piece_template_scale", 0.0)
+                self.config.capture_backend = config_data.get("capture_backend", "auto")
+                self.config.capture_replay = config_data.get("capture_replay", "")
+                self.config.game_area = config_data.get("game_area", [400, 0, 1000, 1080])
+                self.config.press_area = config_data.get("press_area", None)
+
+                self.coeff_scale.set(1.5)  # 使用wangshub经典值
+                self.coeff_label.configure(text=f"{self.config.press_coefficient:.2f}")
+                self.res_label.configure(text=f"{self.config.base_screen_width}x{self.config.base_screen_height}")
+
+                if self.config.game_area:
+                    self.area_entry.delete(0, tk.END)
+                    self.area_entry.insert(0, f"{self.config.game_area[0]},{self.config.game_area[1]},{self.config.game_area[2]},{self.config.game_area[3]}")
+                else:
+                    self.area_entry.delete(0, tk.END)
+                    self.area_entry.insert(0, "全屏")
+
+                if self.config.press_area:
+                    self.press_entry.delete(0, tk.END)
+                    self.press_entry.insert(0, f"{self.config.press_area[0]}, {self.config.press_area[1]}")
+                else:
+                    self.press_entry.delete(0, tk.END)
+                    self.press_entry.insert(0, "自动中心")
+
+                if self.config.piece_template:
+                    self.template_entry.delete(0, tk.END)
+                    self.template_entry.insert(0, self.config.piece_template)
         except:
             pass
 
-    def capture_game_screenshot(self) -> Image.Image:
-        """截取游戏区域截图"""
+    def capture_game_screenshot(self):
+        """截取游戏区域截图，返回 RGB 数组；后端在第一次截图时按基准测试选定"""
+        region = tuple(self.config.game_area) if self.config.game_area else None
         try:
-            if self.config.game_area:
-                screenshot = pyautogui.screenshot(region=tuple(self.config.game_area))
-            else:
-                screenshot = pyautogui.screenshot()
-            return screenshot
-        except:
+            if self.capture_backend is None:
+                self.capture_backend = capture.choose_backend(
+                    region, self.config.capture_backend, self.config.capture_replay)
+                print(f"截图后端: {self.capture_backend.name}")
+            return self.capture_backend.grab(region)
+        except Exception as e:
+            print(f"截图失败: {e}")
             return None
 
     def do_jump(self, press_time_ms: int):
@@ -805,73 +407,154 @@ class JumpJumpAuto(ctk.CTk):
                 jump_x = screen_width // 2
                 jump_y = screen_height // 2 + 100
 
-            pyautogui.moveTo(jump_x, jump_y, duration=0.05)
-            pyautogui.mouseDown(button='left')
-            time.sleep(press_time_ms / 1000.0)
-            pyautogui.mouseUp(button='left')
-            print(f"跳跃完成：按压时间 {press_time}ms, 位置({jump_x}, {jump_y})")
+            # 按压点不变时只在会话开始定位一次
+            self.actuator.set_point(jump_x, jump_y)
+            with self.latency.span("press"):
+                requested, actual = self.actuator.press(press_time_ms)
+            print(f"跳跃完成：按压时间 {requested:.0f}ms（实际 {actual:.2f}ms）, 位置({jump_x}, {jump_y})")
         except Exception as e:
             print(f"跳跃执行失败: {e}")
 
-    def auto_jump_loop(self):
-        """自动跳跃循环"""
-        print("=== 自动跳跃开始 ===")
-        self.stop_event.clear()
-        self.jump_count = 0
-        test_times = []
+    def wait_for_landing(self):
+        """等待棋子落地、镜头停止移动；关闭稳定检测时沿用固定等待"""
+        with self.latency.span("settle"):
+            self._wait_for_landing()
+
+    def _wait_for_landing(self):
+        if self.config.settle_detect:
+            detector = SettleDetector(
+                self.capture_game_screenshot,
+                threshold=self.config.settle_threshold,
+                stable_samples=self.config.settle_samples,
+                interval=self.config.settle_interval_ms / 1000,
+                timeout=self.config.settle_timeout_ms / 1000)
+            status, elapsed = detector.wait(self.stop_event)
+            print(f"落地检测: {status}, {elapsed:.0f}ms")
+            if status != "error":
+                return
+
+        time.sleep(1.0)
+        for _ in range(10):
+            if self.stop_event.is_set():
+                break
+            time.sleep(0.1)
 
-        try:
-            while self.running and not self.stop_event.is_set():
-                screenshot = self.capture_game_screenshot()
-                if screenshot is None:
-                    self._set_status("状态: 截图失败")
-                    time.sleep(0.5)
-                    continue
+    def analyze_frame(self, screenshot):
+        """分析一帧，返回 (press_time, distance, (截图, 检测结果))；需要重试时返回 None 或 RETRY_NOW
+
+        决策帧的飞行记录在决策交给按压线程之后再写（"decision" 回调），复制整帧不计入决策延迟
+        """
+        deadline = 0.0
+        if self.config.detect_deadline_ms:
+            deadline = time.perf_counter() + self.config.detect_deadline_ms / 1000
+        result = self.algorithm.detect(screenshot, deadline)
+        piece_x, piece_y, board_x, board_y, delta_y = result
+        # 检测内部已按阶段计时，直接计入
+        for stage, key in (("piece", "piece"), ("board", "board"), ("detect", "total")):
+            if key in result.timings:
+                self.latency.record(stage, result.timings[key])
+
+        print(f"检测: 棋子({piece_x}, {piece_y}), 平台({board_x}, {board_y}), DeltaY: {delta_y:.1f}"
+              f" | {result.detector} 置信度 {result.confidence:.2f} 耗时 {result.elapsed_ms:.1f}ms")
+
+        if result.status != "ok":
+            self._record_flight(screenshot, result)
+        if result.status == "timeout":
+            # 分析超时：放弃本帧，立即重新截图
+            self._set_status("状态: 分析超时，重新截图")
+            return RETRY_NOW
+
+        if result.status == "no_piece":
+            self.misses += 1
+            # 跳过之后连续找不到棋子：结算画面，导出最近的跳跃
+            if self.jump_count and self.misses == self.config.game_over_misses:
+                path = self._dump_flight("game_over")
+                self._set_status("状态: 游戏结束" + ("，已导出记录" if path else ""))
+                return None
+            self._set_status("状态: 未检测到棋子")
+            return None
+        self.misses = 0
 
-                piece_x, piece_y, board_x, board_y, delta_y = self.algorithm.find_piece_and_board(screenshot)
+        if result.status == "no_board":
+            self._set_status("状态: 未检测到平台")
+            return None
 
-                print(f"检测: 棋子({piece_x}, {piece_y}), 平台({board_x}, {board_y}), DeltaY: {delta_y:.1f}")
+        distance = self.algorithm.calculate_distance(piece_x, piece_y, board_x, board_y)
 
-                if piece_x == 0 and piece_y == 0:
-                    self._set_status("状态: 未检测到棋子")
-                    time.sleep(0.3)
-                    continue
+        # 距离验证
+        if distance > self.config.max_valid_distance:
+            print(f"警告: 距离过大 {distance:.1f}px，限制为 {self.config.max_valid_distance}px")
+            distance = self.config.max_valid_distance
 
-                if board_x == 0 and board_y == 0:
-                    self._set_status("状态: 未检测到平台")
-                    time.sleep(0.3)
-                    continue
+        press_time = self.algorithm.calculate_jump_time(distance, delta_y)
+        return press_time, distance, (screenshot, result)
 
-                distance = self.algorithm.calculate_distance(piece_x, piece_y, board_x, board_y)
+    def _record_flight(self, screenshot, result, press_time=None, distance=None):
+        """把一帧及其检测结果记入飞行记录，决策帧同时记下按压时间"""
+        if self.flight is None:
+            return
+        entry = self.flight.record(screenshot, result.as_dict())
+        if press_time is not None:
+            self.flight.mark_jump(entry, press_time, distance=float(distance))
 
-                # 距离验证
-                if distance > self.config.max_valid_distance:
-                    print(f"警告: 距离过大 {distance:.1f}px，限制为 {self.config.max_valid_distance}px")
-                    distance = self.config.max_valid_distance
+    def auto_jump_loop(self):
+        """自动跳跃循环 - 截图、分析、按压分别在流水线线程上运行，本线程等待停止"""
+        print("=== 自动跳跃开始 ===")
+        self.stop_event.clear()
+        self.jump_count = 0
+        self.algorithm.reset_tracking()
+        self.actuator.reset()
+        self.latency.reset()
+        self.misses = 0
+        if self.config.recorder_enabled and self.flight is None:
+            self.flight = FlightRecorder(self.config.recorder_dir, int(self.config.recorder_max_mb * (1 << 20)))
+        test_times = []
+        last_jump = [0]
 
-                press_time = self.algorithm.calculate_jump_time(distance, delta_y)
+        def timed_capture():
+            with self.latency.span("capture"):
+                return self.capture_game_screenshot()
 
+        def report(kind, seq, payload):
+            if kind == "capture_error":
+                self._set_status("状态: 截图失败")
+            elif kind == "decision":
+                press_time, distance, (screenshot, result) = payload
+                self._record_flight(screenshot, result, press_time, distance)
                 test_times.append(press_time)
                 if len(test_times) > 10:
                     test_times.pop(0)
-
+                print(f"决策 #{seq}: 距离={distance:.1f}px, 按压={press_time}ms")
+            elif kind == "jump":
+                press_time, distance = payload[:2]
                 self.jump_count += 1
-                self._set_count(f"跳跃次数: {self.jump_count}")
-                self._set_detail(f"距离: {int(distance)}px | 按压: {press_time}ms")
-                self._set_status("状态: 运行中...")
-
+                now = time.perf_counter_ns()
+                if last_jump[0]:
+                    self.latency.record("cycle", (now - last_jump[0]) / 1e6)
+                last_jump[0] = now
+                self.ui_status.publish(status="状态: 运行中...",
+                                       count=f"跳跃次数: {self.jump_count}",
+                                       detail=f"距离: {int(distance)}px | 按压: {press_time}ms\n"
+                                              f"p50/p95/p99 ms: {self.latency.compact()}")
                 print(f"跳跃 #{self.jump_count}: 距离={distance:.1f}px, 按压={press_time}ms")
+            elif kind in ("drop_frame", "drop_decision"):
+                print(f"丢弃过期{'帧' if kind == 'drop_frame' else '决策'} #{seq}")
 
-                self.do_jump(press_time)
-                time.sleep(1.0)
+        pipeline = JumpPipeline(
+            capture=timed_capture,
+            analyze=self.analyze_frame,
+            actuate=lambda payload: self.do_jump(payload[0]),
+            settle=self.wait_for_landing,
+            report=report,
+            stop_event=self.stop_event)
 
-                for _ in range(10):
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(0.1)
-
-                if self.stop_event.is_set():
-                    break
+        try:
+            pipeline.run()
+            print(f"流水线统计: {pipeline.stats}")
+            print(f"各阶段耗时:\n{self.latency.dump()}")
+            press = self.actuator.summary()
+            if press["count"]:
+                print(f"按压误差: 平均 {press['mean_error']:+.3f}ms, 最大 {press['max_error']:.3f}ms")
 
             if test_times:
                 avg_time = sum(test_times) / len(test_times)
@@ -919,9 +602,29 @@ class JumpJumpAuto(ctk.CTk):
         self.running = False
         self.start_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
-        self._set_status("状态: 已停止")
-        self._set_count(f"跳跃次数: {self.jump_count}")
-        self._set_detail("")
+        self.ui_status.publish(status="状态: 已停止", count=f"跳跃次数: {self.jump_count}", detail="")
+
+    def _dump_flight(self, reason):
+        """导出最近若干跳的飞行记录（后台写盘），返回导出目录"""
+        if self.flight is None:
+            return None
+        try:
+            return self.flight.dump(reason, self.config.recorder_dump_jumps)
+        except OSError as e:
+            print(f"飞行记录导出失败: {e}")
+            return None
+
+    def _cmd_dump_flight(self):
+        path = self._dump_flight("manual")
+        self._set_status(f"状态: 记录导出到 {path}" if path else "状态: 没有可导出的记录")
+
+    def _on_close(self):
+        """关闭窗口：停止跳跃，写入未保存的配置和正在导出的记录"""
+        self.stop_event.set()
+        self.config_store.close()
+        if self.flight is not None:
+            self.flight.close()
+        self.destroy()
 
     def on_stop_complete(self):
         if not self.running:
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+自动跳跃流水线 - 截图、分析、按压三个线程，之间用容量为 1 的队列连接
+
+每帧带递增序号 seq 和跳跃轮次 epoch：每按压一次 epoch 加一，
+之前截的帧和算出的决策都已过期，分析线程和按压线程直接丢弃；
+队列满时丢弃旧的、保留最新的，任何阶段都不会处理积压的旧画面。
+分析线程先把决策放进队列再做日志、界面更新等收尾工作，按压线程只等待决策。
+
+每一跳内部仍是串行的：截图闸门一次只放行一帧，未检测到目标或落地稳定后才打开，
+第 N+1 帧的截图不与第 N 帧的分析重叠——按压前截的帧在按压后都会过期，提前截也用不上。
+分线程的收益在于收尾工作和界面更新不阻塞按压、截图不等待界面线程。
+
+截图缓冲的视图不复制、直接交给分析线程：上一帧的分析和分析线程上的收尾回调都返回之后
+截图线程才会截下一帧，这段时间里缓冲不会被覆盖（落地检测在按压线程上截图，
+截图后端为每个线程各备一块缓冲，不会写到这一块）
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+# analyze 返回此值表示本帧作废、不等待重试间隔立即重新截图（例如分析超时）
+RETRY_NOW = object()
+
+
+class Frame:
+    __slots__ = ("seq", "epoch", "image", "captured_at")
+
+    def __init__(self, seq: int, epoch: int, image: np.ndarray, captured_at: float):
+        self.seq = seq
+        self.epoch = epoch
+        self.image = image
+        self.captured_at = captured_at
+
+
+class Decision:
+    __slots__ = ("seq", "epoch", "payload", "decided_at")
+
+    def __init__(self, seq: int, epoch: int, payload, decided_at: float):
+        self.seq = seq
+        self.epoch = epoch
+        self.payload = payload
+        self.decided_at = decided_at
+
+
+def put_latest(q: queue.Queue, item) -> int:
+    """放入队列，队列满时先丢弃旧元素，返回丢弃的个数"""
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+class JumpPipeline:
+    """截图 -> 分析 -> 按压 流水线
+
+    capture()          返回 RGB 数组（可以是下一次截图会覆盖的缓冲视图），失败返回 None
+    analyze(image)     返回决策（例如按压时间），无法决策返回 None（间隔 retry_delay 后重试）
+                       或 RETRY_NOW（立即重试）；image 在 analyze 和分析线程上的回调
+                       （"decision" / "miss" / "drop_frame"）返回前有效，其他地方要用需自行复制
+    actuate(payload)   执行按压，阻塞到松开
+    settle()           按压后等待画面稳定，阻塞
+    report(kind, seq, payload)  收尾回调（日志、界面），在分析/按压线程上调用：
+        "decision" / "miss" / "jump" / "capture_error" / "drop_frame" / "drop_decision"
+    """
+
+    def __init__(self, capture, analyze, actuate, settle=None, report=None,
+                 stop_event: threading.Event = None, retry_delay: float = 0.3,
+                 capture_error_delay: float = 0.5):
+        self.capture = capture
+        self.analyze = analyze
+        self.actuate = actuate
+        self.settle = settle
+        self.report = report
+        self.stop_event = stop_event or threading.Event()
+        self.retry_delay = retry_delay
+        self.capture_error_delay = capture_error_delay
+
+        self.frames = queue.Queue(maxsize=1)
+        self.decisions = queue.Queue(maxsize=1)
+        self.lock = threading.Lock()
+        self.epoch = 0
+        self.seq = 0
+        # 截图闸门：打开时截一帧；not_before 为下一次截图的最早时间（未检测到目标时的重试间隔）
+        self.capture_gate = threading.Event()
+        self.not_before = 0.0
+        # 分析线程用完上一帧（含收尾回调）时置位，截图线程等它置位才覆盖截图缓冲
+        self.frame_done = threading.Event()
+        self.frame_done.set()
+        self.stats = {"captured": 0, "analyzed": 0, "decisions": 0, "jumps": 0,
+                      "dropped_frames": 0, "dropped_decisions": 0}
+        self.threads = []
+        # 任一阶段抛出的异常：记录后停止整条流水线，由 run() 重新抛出
+        self.error = None
+
+    def _report(self, kind: str, seq: int, payload=None):
+        if self.report is not None:
+            self.report(kind, seq, payload)
+
+    def _count(self, key: str, n: int = 1):
+        """stats 由三个线程更新，加锁避免丢失计数"""
+        with self.lock:
+            self.stats[key] += n
+
+    def request_capture(self, delay: float = 0.0):
+        with self.lock:
+            self.not_before = time.perf_counter() + delay
+        self.capture_gate.set()
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            if not self.capture_gate.wait(0.05):
+                continue
+            with self.lock:
+                wait = self.not_before - time.perf_counter()
+            if wait > 0:
+                self.stop_event.wait(wait)
+                continue
+            if not self.frame_done.wait(0.05):
+                continue
+            self.capture_gate.clear()
+
+            with self.lock:
+                epoch = self.epoch
+            image = self.capture()
+            if image is None:
+                self._report("capture_error", self.seq)
+                self.request_capture(self.capture_error_delay)
+                continue
+            self.seq += 1
+            self._count("captured")
+            frame = Frame(self.seq, epoch, image, time.perf_counter())
+            self.frame_done.clear()
+            dropped = put_latest(self.frames, frame)
+            if dropped:
+                self._count("dropped_frames", dropped)
+                self._report("drop_frame", frame.seq)
+
+    def _analyze_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                frame = self.frames.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            try:
+                self._analyze_frame(frame)
+            finally:
+                self.frame_done.set()
+
+    def _analyze_frame(self, frame: Frame):
+        with self.lock:
+            stale = frame.epoch != self.epoch
+        if stale:
+            self._count("dropped_frames")
+            self._report("drop_frame", frame.seq)
+            return
+
+        self._count("analyzed")
+        payload = self.analyze(frame.image)
+        if payload is None or payload is RETRY_NOW:
+            self.request_capture(0.0 if payload is RETRY_NOW else self.retry_delay)
+            self._report("miss", frame.seq)
+            return
+
+        decision = Decision(frame.seq, frame.epoch, payload, time.perf_counter())
+        self._count("decisions")
+        dropped = put_latest(self.decisions, decision)
+        self._count("dropped_decisions", dropped)
+        # 决策已交给按压线程，收尾工作不再阻塞按压
+        self._report("decision", frame.seq, payload)
+
+    def _actuate_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                decision = self.decisions.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            with self.lock:
+                stale = decision.epoch != self.epoch
+            if stale:
+                self._count("dropped_decisions")
+                self._report("drop_decision", decision.seq, decision.payload)
+                continue
+
+            self.actuate(decision.payload)
+            with self.lock:
+                # 按压之后画面将要变化，之前截的帧和决策全部作废
+                self.epoch += 1
+            self._count("jumps")
+            self._report("jump", decision.seq, decision.payload)
+            if self.settle is not None:
+                self.settle()
+            self.request_capture()
+
+    def _guard(self, target):
+        try:
+            target()
+        except BaseException as e:
+            self.error = e
+            self.stop_event.set()
+
+    def start(self):
+        self.request_capture()
+        for target, name in ((self._capture_loop, "capture"),
+                             (self._analyze_loop, "analyze"),
+                             (self._actuate_loop, "actuate")):
+            thread = threading.Thread(target=self._guard, args=(target,), name=f"jump-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def join(self, timeout: float = None):
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def run(self):
+        """启动各阶段并阻塞到 stop_event 被置位；某个阶段出错时重新抛出该异常"""
+        self.start()
+        while not self.stop_event.wait(0.1):
+            pass
+        self.join()
+        if self.error is not None:
+            raise self.error
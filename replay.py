@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+离线回放 - 无界面地把录制的帧交给 JumpAlgorithm，检查检测器改动是否更快、更准
+
+  python replay.py <图片目录 | 飞行记录目录 | 会话归档>... [-o 结果.jsonl]
+                   [--reference 上次结果.jsonl] [--workers N] [--set 字段=值]
+
+每帧输出一行 JSON（帧标识、状态、坐标、距离、按压时间、耗时），按输入顺序流式写出；
+结束时在 stderr 打印汇总：检出率、耗时分位数，以及与参考结果的差异。
+每帧独立检测（清除跟踪窗口和背景模型），结果与帧顺序、进程划分无关
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+from PIL import Image
+
+import vision
+from algorithm import GameConfig, JumpAlgorithm
+from session_archive import ArchiveReader
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# 工作进程内的状态：算法实例和已打开的归档
+_algorithm = None
+_archives = {}
+
+
+# ==================== 输入 ====================
+def collect_frames(sources) -> list:
+    """展开输入为帧任务列表 [(帧标识, 文件路径或归档路径, 归档内序号或 None)]"""
+    tasks = []
+    for source in sources:
+        if os.path.exists(source + ".index"):
+            with ArchiveReader(source) as reader:
+                count = len(reader)
+            tasks += [(f"{source}#{i}", source, i) for i in range(count)]
+        elif os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.lower().endswith(IMAGE_EXTS):
+                    path = os.path.join(source, name)
+                    tasks.append((path, path, None))
+        elif os.path.isfile(source):
+            tasks.append((source, source, None))
+        else:
+            raise FileNotFoundError(f"找不到回放输入: {source}")
+    return tasks
+
+
+def load_frame(path: str, number):
+    """读取一帧：归档直接取内存映射视图，图片文件解码为 RGB 数组"""
+    if number is not None:
+        reader = _archives.get(path)
+        if reader is None:
+            reader = _archives[path] = ArchiveReader(path)
+        return reader.frame(number)
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def parse_overrides(pairs) -> dict:
+    """--set 字段=值，按 GameConfig 中的默认值类型转换"""
+    overrides = {}
+    for pair in pairs or ():
+        key, _, value = pair.partition("=")
+        if not hasattr(GameConfig, key):
+            raise ValueError(f"GameConfig 没有字段: {key}")
+        default = getattr(GameConfig, key)
+        if isinstance(default, bool):
+            overrides[key] = value.lower() in ("1", "true", "yes", "on")
+        elif isinstance(default, (int, float)):
+            overrides[key] = int(float(value)) if isinstance(default, int) else float(value)
+        elif isinstance(default, list) or default is None:
+            overrides[key] = json.loads(value)
+        else:
+            overrides[key] = value
+    return overrides
+
+
+# ==================== 工作进程 ====================
+def init_worker(overrides: dict):
+    global _algorithm
+    config = GameConfig()
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    _algorithm = JumpAlgorithm(config)
+
+
+def replay_frame(task) -> dict:
+    """检测一帧并计算按压时间，返回结果记录"""
+    frame_id, path, number = task
+    record = {"frame": frame_id}
+    try:
+        frame = load_frame(path, number)
+    except (OSError, ValueError, IndexError) as e:
+        record.update(status="error", error=str(e))
+        return record
+
+    algorithm = _algorithm
+    algorithm.reset_tracking()
+    algorithm.background = vision.BackgroundModel()
+    start = time.perf_counter()
+    try:
+        result = algorithm.detect(frame)
+        press_ms = None
+        distance = None
+        if result.found:
+            distance = algorithm.calculate_distance(result.piece_x, result.piece_y,
+                                                    result.board_x, result.board_y)
+            press_ms = algorithm.calculate_jump_time(min(distance, algorithm.config.max_valid_distance),
+                                                     result.delta_piece_y)
+    except Exception as e:
+        # 一帧出错不影响整批回放
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+        return record
+    latency = (time.perf_counter() - start) * 1000
+
+    record.update(result.as_dict())
+    record.update(distance=distance, press_ms=press_ms, latency_ms=latency)
+    return record
+
+
+# ==================== 对比与汇总 ====================
+def load_reference(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return {r["frame"]: r for r in (json.loads(line) for line in f if line.strip())}
+
+
+def compare(record: dict, ref: dict) -> dict:
+    """与参考结果的差异：状态变化、坐标偏移（像素）、按压时间差、耗时比"""
+    delta = {"status": None if record["status"] == ref.get("status") else f"{ref.get('status')}->{record['status']}"}
+    if record["status"] == "ok" and ref.get("status") == "ok":
+        delta["piece_px"] = math.dist(record["piece"], ref["piece"])
+        delta["board_px"] = math.dist(record["board"], ref["board"])
+        delta["press_ms"] = record["press_ms"] - ref["press_ms"]
+    if ref.get("latency_ms") and "latency_ms" in record:
+        delta["latency_ratio"] = record["latency_ms"] / ref["latency_ms"]
+    return delta
+
+
+def percentiles(values) -> str:
+    if not values:
+        return "-"
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return f"p50 {p50:.1f} / p95 {p95:.1f} / p99 {p99:.1f} ms"
+
+
+def summarize(records: list, reference: dict = None) -> dict:
+    found = [r for r in records if r["status"] == "ok"]
+    summary = {
+        "frames": len(records),
+        "found": len(found),
+        "errors": sum(r["status"] == "error" for r in records),
+        "latency": [r["latency_ms"] for r in records if "latency_ms" in r],
+    }
+    if reference:
+        # 读取失败、检测出错的帧也参与对比：参考里检出、这次不是 ok 都算变差
+        matched = [r for r in records if r["frame"] in reference]
+        ref_ok = [r for r in matched if reference[r["frame"]].get("status") == "ok"]
+        summary.update(
+            compared=len(matched),
+            regressions=sum(r["status"] != "ok" for r in ref_ok),
+            fixes=sum(r["status"] == "ok" and reference[r["frame"]].get("status") != "ok" for r in matched),
+            board_delta=[r["delta"]["board_px"] for r in matched if "board_px" in r["delta"]],
+            press_delta=[abs(r["delta"]["press_ms"]) for r in matched if "press_ms" in r["delta"]],
+            ref_latency=[reference[r["frame"]]["latency_ms"] for r in matched
+                         if "latency_ms" in reference[r["frame"]]],
+        )
+    return summary
+
+
+def print_summary(summary: dict, out=sys.stderr):
+    frames = summary["frames"] or 1
+    print(f"帧数 {summary['frames']}，检出 {summary['found']}（{summary['found'] / frames:.1%}），"
+          f"读取失败 {summary['errors']}", file=out)
+    print(f"耗时: {percentiles(summary['latency'])}", file=out)
+    if "compared" in summary:
+        print(f"对比参考 {summary['compared']} 帧: 变差 {summary['regressions']}，变好 {summary['fixes']}", file=out)
+        if summary["board_delta"]:
+            print(f"  平台偏移: 平均 {np.mean(summary['board_delta']):.1f}px，"
+                  f"最大 {np.max(summary['board_delta']):.1f}px", file=out)
+            print(f"  按压差: 平均 {np.mean(summary['press_delta']):.1f}ms，"
+                  f"最大 {np.max(summary['press_delta']):.0f}ms", file=out)
+        print(f"  参考耗时: {percentiles(summary['ref_latency'])}", file=out)
+
+
+# ==================== 入口 ====================
+def run_replay(sources, output=None, reference=None, workers=None, overrides=None,
+               limit=0, chunksize=8) -> dict:
+    """回放 sources 中的全部帧，结果逐行写入 output（文件对象），返回汇总"""
+    tasks = collect_frames(sources)
+    if limit:
+        tasks = tasks[:limit]
+    ref = load_reference(reference) if reference else None
+    overrides = overrides or {}
+    workers = workers or os.cpu_count() or 1
+
+    records = []
+
+    def emit(record):
+        if ref is not None and record["frame"] in ref:
+            record["delta"] = compare(record, ref[record["frame"]])
+        records.append(record)
+        if output is not None:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if workers == 1:
+        init_worker(overrides)
+        for task in tasks:
+            emit(replay_frame(task))
+    else:
+        with Pool(workers, initializer=init_worker, initargs=(overrides,)) as pool:
+            # imap 保持输入顺序，结果边算边写
+            for record in pool.imap(replay_frame, tasks, chunksize):
+                emit(record)
+    return summarize(records, ref)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="离线回放录制的帧，输出检测结果 JSONL")
+    parser.add_argument("sources", nargs="+", help="图片文件/目录、飞行记录目录或会话归档路径")
+    parser.add_argument("-o", "--output", help="结果 JSONL 文件，默认写到标准输出")
+    parser.add_argument("--reference", help="参考结果 JSONL（上一次回放的输出），逐帧对比")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，默认 CPU 核数，1 为单进程")
+    parser.add_argument("--limit", type=int, default=0, help="只回放前 N 帧")
+    parser.add_argument("--set", action="append", metavar="字段=值",
+                        help="覆盖 GameConfig 字段，如 --set board_detector=edge")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        overrides = parse_overrides(args.set)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                summary = run_replay(args.sources, f, args.reference, args.workers, overrides, args.limit)
+        else:
+            summary = run_replay(args.sources, sys.stdout, args.reference, args.workers, overrides, args.limit)
+    except (OSError, ValueError) as e:
+        print(f"回放失败: {e}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    print_summary(summary)
+    print(f"总用时 {elapsed:.1f}s，{summary['frames'] / max(elapsed, 1e-9):.1f} 帧/秒", file=sys.stderr)
+    return 0 if summary.get("regressions", 0) == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
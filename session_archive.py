@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+会话归档 - 只追加的原始帧文件 + 定长记录索引，供离线回放
+
+<名称>.frames  所有帧的原始像素（uint8，行优先）首尾相接
+<名称>.index   16 字节头部（魔数、记录长度）+ 每帧一条定长记录：
+               帧偏移、形状、时间戳、检测结果、按压时间
+
+读取时帧文件整体内存映射，按偏移切出 ndarray 视图，不解码、不复制。
+写入中途崩溃时，不完整的尾部记录（或索引已写、像素未写完的帧）在读取时被忽略
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+from PIL import Image
+
+MAGIC = b"JUMPARC1"
+HEADER = struct.Struct("<8sII")   # 魔数、记录字节数、保留
+
+# 检测状态编码，0 表示没有检测结果
+STATUSES = ("", "ok", "no_image", "no_piece", "no_board", "timeout")
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("height", "<u2"),
+    ("width", "<u2"),
+    ("channels", "<u1"),
+    ("status", "<u1"),
+    ("reserved", "<u2"),
+    ("time", "<f8"),
+    ("piece_x", "<f4"),
+    ("piece_y", "<f4"),
+    ("board_x", "<f4"),
+    ("board_y", "<f4"),
+    ("delta_piece_y", "<f4"),
+    ("confidence", "<f4"),
+    ("press_ms", "<f4"),     # NaN 表示这一帧没有按压
+])
+
+
+def _paths(path: str) -> tuple:
+    return path + ".frames", path + ".index"
+
+
+class ArchiveWriter:
+    """追加写入归档；已存在的归档在末尾继续追加"""
+
+    def __init__(self, path: str):
+        self.path = path
+        frames_path, index_path = _paths(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # 先丢掉上次崩溃留下的不完整尾部，再接着追加
+        count = _valid_count(frames_path, index_path) if os.path.exists(index_path) else 0
+        self.index = open(index_path, "r+b" if os.path.exists(index_path) else "w+b")
+        if count == 0:
+            self.index.truncate(0)
+            self.index.write(HEADER.pack(MAGIC, INDEX_DTYPE.itemsize, 0))
+        self.index.truncate(HEADER.size + count * INDEX_DTYPE.itemsize)
+        self.index.seek(0, os.SEEK_END)
+
+        self.frames = open(frames_path, "r+b" if os.path.exists(frames_path) else "w+b")
+        self.offset = 0
+        if count:
+            last = _read_records(index_path, count)[-1]
+            self.offset = int(last["offset"]) + _frame_bytes(last)
+        self.frames.truncate(self.offset)
+        self.frames.seek(self.offset)
+        self.count = count
+
+    def append(self, frame: np.ndarray, timestamp: float = 0.0, detection=None,
+               press_ms: float = float("nan")) -> int:
+        """追加一帧，detection 为 DetectionResult 或其 as_dict()，返回帧序号"""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        record = np.zeros(1, dtype=INDEX_DTYPE)[0]
+        record["offset"] = self.offset
+        record["height"], record["width"], record["channels"] = frame.shape
+        record["time"] = timestamp
+        record["press_ms"] = press_ms
+        if detection is not None:
+            if not isinstance(detection, dict):
+                detection = detection.as_dict()
+            record["status"] = STATUSES.index(detection.get("status", ""))
+            record["piece_x"], record["piece_y"] = detection.get("piece", (0, 0))
+            record["board_x"], record["board_y"] = detection.get("board", (0, 0))
+            record["delta_piece_y"] = detection.get("delta_piece_y", 0)
+            record["confidence"] = detection.get("confidence", 0)
+
+        # 先写像素再写索引：索引记录存在即说明像素完整
+        self.frames.write(frame.data)
+        self.index.write(record.tobytes())
+        self.offset += frame.nbytes
+        self.count += 1
+        return self.count - 1
+
+    def set_press(self, number: int, press_ms: float):
+        """补记某一帧的按压时间（决策在检测之后才执行）"""
+        position = self.index.tell()
+        field = INDEX_DTYPE.fields["press_ms"][1]
+        self.index.seek(HEADER.size + number * INDEX_DTYPE.itemsize + field)
+        self.index.write(struct.pack("<f", press_ms))
+        self.index.seek(position)
+
+    def flush(self):
+        self.frames.flush()
+        self.index.flush()
+
+    def close(self):
+        if not self.index.closed:
+            self.flush()
+            self.frames.close()
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _frame_bytes(record) -> int:
+    return int(record["height"]) * int(record["width"]) * int(record["channels"])
+
+
+def _read_records(index_path: str, count: int = -1) -> np.ndarray:
+    with open(index_path, "rb") as f:
+        magic, itemsize, _ = HEADER.unpack(f.read(HEADER.size) or b"\0" * HEADER.size)
+        if magic != MAGIC or itemsize != INDEX_DTYPE.itemsize:
+            raise ValueError(f"不是会话归档索引: {index_path}")
+        return np.fromfile(f, dtype=INDEX_DTYPE, count=count)
+
+
+def _valid_count(frames_path: str, index_path: str) -> int:
+    """完整的帧数：索引只算整条记录，且像素必须已全部写入"""
+    if os.path.getsize(index_path) < HEADER.size:
+        return 0
+    records = _read_records(index_path)
+    size = os.path.getsize(frames_path) if os.path.exists(frames_path) else 0
+    ends = records["offset"] + records["height"].astype(np.uint64) * records["width"] * records["channels"]
+    # 偏移递增，像素已写入的帧一定排在前面
+    return int(np.count_nonzero(ends <= size))
+
+
+class ArchiveReader:
+    """只读打开归档，帧为内存映射上的 ndarray 视图"""
+
+    def __init__(self, path: str):
+        self.path = path
+        frames_path, index_path = _paths(path)
+        count = _valid_count(frames_path, index_path)
+        self.records = _read_records(index_path, count)
+        self.data = (np.memmap(frames_path, dtype=np.uint8, mode="r")
+                     if count and os.path.getsize(frames_path) else np.zeros(0, dtype=np.uint8))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def frame(self, number: int) -> np.ndarray:
+        """第 number 帧，(高, 宽, 通道) 的只读视图，不复制"""
+        record = self.records[number]
+        start = int(record["offset"])
+        shape = (int(record["height"]), int(record["width"]), int(record["channels"]))
+        view = self.data[start:start + _frame_bytes(record)].reshape(shape)
+        return view[:, :, 0] if shape[2] == 1 else view
+
+    def detection(self, number: int) -> dict:
+        """第 number 帧的检测结果，格式同 DetectionResult.as_dict()（不含耗时）"""
+        r = self.records[number]
+        return {
+            "status": STATUSES[r["status"]],
+            "piece": [float(r["piece_x"]), float(r["piece_y"])],
+            "board": [float(r["board_x"]), float(r["board_y"])],
+            "delta_piece_y": float(r["delta_piece_y"]),
+            "confidence": float(r["confidence"]),
+        }
+
+    def __iter__(self):
+        """依次产生 (序号, 帧)"""
+        for number in range(len(self.records)):
+            yield number, self.frame(number)
+
+    def close(self):
+        # memmap 随引用释放关闭；Windows 上需要先释放才能删除文件
+        self.data = np.zeros(0, dtype=np.uint8)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def import_recording(dump_dir: str, path: str) -> int:
+    """把飞行记录的导出目录（index.jsonl + PNG）追加到归档，返回追加的帧数"""
+    with open(os.path.join(dump_dir, "index.jsonl"), encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    with ArchiveWriter(path) as writer:
+        for meta in entries:
+            with Image.open(os.path.join(dump_dir, meta["file"])) as img:
+                frame = np.asarray(img)
+            press = meta.get("press_ms")
+            writer.append(frame, meta.get("time", 0.0), meta.get("detection"),
+                          float("nan") if press is None else press)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python session_archive.py <导出目录>... <归档>   把飞行记录导入归档并显示概况
+    if len(sys.argv) < 3:
+        print("用法: python session_archive.py <飞行记录目录>... <归档路径>")
+        sys.exit(1)
+    for dump_dir in sys.argv[1:-1]:
+        print(f"{dump_dir}: 导入 {import_recording(dump_dir, sys.argv[-1])} 帧")
+    with ArchiveReader(sys.argv[-1]) as reader:
+        pressed = int(np.count_nonzero(~np.isnan(reader.records["press_ms"])))
+        print(f"{sys.argv[-1]}: 共 {len(reader)} 帧，其中 {pressed} 帧有按压")
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+落地稳定检测 - 代替跳跃后固定的 2 秒等待
+
+松开按压后以较高频率截图，每帧按步长下采样成很小的灰度图，
+计算与上一帧的平均绝对差（帧差能量）：先等到画面开始变化（棋子起跳），
+之后连续 N 帧能量低于阈值即认为棋子已落地、镜头已停止移动
+"""
+
+import time
+
+import numpy as np
+
+
+class SettleDetector:
+    """帧差能量稳定检测
+
+    grab 为无参截图函数，返回 RGB 数组（可以是会被下一帧覆盖的缓冲视图）；
+    时钟和 sleep 可替换，便于离线回放和测试
+    """
+
+    def __init__(self, grab, factor: int = 8, threshold: float = 1.5, stable_samples: int = 4,
+                 interval: float = 0.03, motion_timeout: float = 0.6, timeout: float = 2.5,
+                 clock=time.perf_counter, sleep=time.sleep):
+        self.grab = grab
+        self.factor = factor
+        self.threshold = threshold
+        self.stable_samples = stable_samples
+        self.interval = interval
+        self.motion_timeout = motion_timeout
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        # 最近一次 wait 的帧差能量序列，便于调阈值
+        self.energies = []
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """步长下采样并把三通道相加，得到小尺寸的 int16 亮度图（新数组，不引用截图缓冲）"""
+        f = self.factor
+        return frame[::f, ::f].sum(axis=2, dtype=np.int16)
+
+    def energy(self, previous: np.ndarray, current: np.ndarray) -> float:
+        """两帧缩略图的平均绝对差，按单通道计"""
+        if previous.shape != current.shape:
+            return float("inf")
+        return float(np.abs(current - previous).mean()) / 3
+
+    def wait(self, stop_event=None) -> tuple:
+        """等待画面稳定，返回 (状态, 耗时毫秒)
+
+        状态: "settled" 落地稳定 / "still" motion_timeout 内画面从未变化 /
+        "timeout" 超过 timeout 仍未稳定 / "stopped" stop_event 被置位 / "error" 截图失败
+        """
+        start = self.clock()
+        self.energies = []
+        previous = None
+        moved = False
+        quiet = 0
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return "stopped", (self.clock() - start) * 1000
+
+            frame = self.grab()
+            if frame is None:
+                return "error", (self.clock() - start) * 1000
+            current = self.thumbnail(frame)
+            now = self.clock()
+            elapsed = now - start
+
+            if previous is not None:
+                energy = self.energy(previous, current)
+                self.energies.append(energy)
+                if energy > self.threshold:
+                    moved = True
+                    quiet = 0
+                elif moved:
+                    quiet += 1
+                    if quiet >= self.stable_samples:
+                        return "settled", elapsed * 1000
+            previous = current
+
+            if not moved and elapsed >= self.motion_timeout:
+                return "still", elapsed * 1000
+            if elapsed >= self.timeout:
+                return "timeout", elapsed * 1000
+            self.sleep(self.interval)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+界面状态通道 - 工作线程发布状态，界面线程只应用有变化的字段
+
+publish 把更新放进队列，并用脏标记合并唤醒：两次刷新之间无论发布多少次，
+只安排一次界面回调（schedule，通常是 widget.after(0, ...)）。
+刷新时取每个字段的最新值，只把和上次显示不同的字段交给 apply。
+没有更新时不占用任何 CPU，不需要定时轮询
+"""
+
+import queue
+import threading
+
+
+class StatusChannel:
+    """线程安全的状态通道
+
+    schedule(callback) 安排 callback 在界面线程执行；
+    apply(changes) 在界面线程中更新控件，changes 为 {字段: 新值}
+    """
+
+    def __init__(self, schedule, apply):
+        self.schedule = schedule
+        self.apply = apply
+        self.updates = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.shown = {}
+        self.flushes = 0
+
+    def publish(self, **fields):
+        """发布一组字段更新，可在任意线程调用"""
+        self.updates.put(fields)
+        with self.lock:
+            if self.dirty:
+                return
+            self.dirty = True
+        try:
+            self.schedule(self.flush)
+        except Exception:
+            # 窗口已销毁（程序退出中），丢弃更新
+            with self.lock:
+                self.dirty = False
+
+    def flush(self):
+        """界面线程：合并队列中的更新，只应用有变化的字段"""
+        with self.lock:
+            # 先清除标记再取队列，取队列期间的新发布会另外安排一次刷新
+            self.dirty = False
+        latest = {}
+        while True:
+            try:
+                latest.update(self.updates.get_nowait())
+            except queue.Empty:
+                break
+        changes = {k: v for k, v in latest.items() if self.shown.get(k) != v}
+        if not changes:
+            return
+        self.flushes += 1
+        self.shown.update(changes)
+        self.apply(changes)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+合成游戏画面 - 任意分辨率渲染跳一跳画面，并给出真实坐标，用于无真实截图时的基准测试
+
+画面按游戏的等轴测几何生成：棋子所在平台中心在经过
+对称中心 (w/2 + 24/1080·w, h/2 + 17/1920·h)、斜率 ±25.5/43.5 的跳跃线上，
+目标平台在线附近随机偏移，按线推算 board_y 的检测器不会天然得到满分。
+包含竖直渐变背景、带明暗侧面的方块 / 圆柱平台、wangshub 扫描所用颜色的紫色棋子，
+以及干扰物：棋子阴影、目标中心白点、身后的上一个平台、顶部分数。
+
+布局（random_layout）只用相对宽度的比例描述，同一个种子在任意分辨率下是同一局面；
+render_frame 返回 RGB 数组和真实坐标：
+  piece_x / piece_bottom   棋子底座中心横坐标、最低行
+  piece_y                  底座椭圆中心（棋子站立点）
+  board_x / board_y        目标平台上表面中心
+  board_top                目标平台最高点所在行
+
+  python synthetic.py [--sizes 720x1280,1080x1920,...] [--frames N] [--out 目录]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+SLOPE = 25.5 / 43.5
+
+# 棋子颜色：底座落在 COLOR_RULES["piece"] 的严格范围内，身体和头部为较亮的紫色
+PIECE_BASE = (55, 58, 102)
+PIECE_BODY = (70, 60, 120)
+PIECE_HEAD = (82, 72, 130)
+
+# 平台上表面颜色，侧面按明暗系数变暗
+PLATFORM_COLORS = [
+    (246, 246, 246), (238, 206, 160), (160, 200, 238), (250, 190, 190),
+    (190, 236, 190), (250, 226, 150), (120, 120, 130), (226, 180, 236),
+]
+BACKGROUNDS = [
+    ((212, 214, 236), (176, 180, 206)),
+    ((236, 224, 214), (204, 190, 176)),
+    ((214, 236, 226), (176, 206, 192)),
+    ((224, 224, 224), (190, 190, 190)),
+]
+
+SIZES = [(720, 1280), (1080, 1920), (1440, 2560), (2160, 3840)]
+
+
+def symmetry_center(w: int, h: int) -> tuple:
+    """与 JumpAlgorithm 相同的对称中心"""
+    return w / 2 + (24 / 1080) * w, h / 2 + (17 / 1920) * h
+
+
+def random_layout(seed: int = 0) -> dict:
+    """随机局面，长度均为相对画面宽度的比例"""
+    rng = np.random.default_rng(seed)
+    return {
+        # +1：棋子在中心右侧、向左上跳；-1：棋子在左侧、向右上跳
+        "direction": int(rng.choice((-1, 1))),
+        "piece_offset": float(rng.uniform(0.06, 0.22)),
+        "target_offset": float(rng.uniform(0.10, 0.28)),
+        "piece_jitter": float(rng.uniform(-0.015, 0.015)),
+        # 目标平台偏离跳跃线：沿线方向和垂直方向的位移
+        "target_along": float(rng.uniform(-0.02, 0.02)),
+        "target_across": float(rng.uniform(-0.025, 0.025)),
+        "current_size": float(rng.uniform(0.09, 0.13)),
+        "target_size": float(rng.uniform(0.08, 0.14)),
+        "current_shape": str(rng.choice(("cube", "cylinder"))),
+        "target_shape": str(rng.choice(("cube", "cylinder"))),
+        "current_color": int(rng.integers(len(PLATFORM_COLORS))),
+        "target_color": int(rng.integers(len(PLATFORM_COLORS))),
+        "previous_color": int(rng.integers(len(PLATFORM_COLORS))),
+        "background": int(rng.integers(len(BACKGROUNDS))),
+        "score": int(rng.integers(0, 1000)),
+    }
+
+
+# ==================== 绘制 ====================
+def _box(arr, x0, x1, y0, y1):
+    """裁剪到画面内的包围盒及其坐标网格"""
+    h, w = arr.shape[:2]
+    x0, x1 = max(0, int(np.floor(x0))), min(w, int(np.ceil(x1)) + 1)
+    y0, y1 = max(0, int(np.floor(y0))), min(h, int(np.ceil(y1)) + 1)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    ys, xs = np.mgrid[y0:y1, x0:x1]
+    return (slice(y0, y1), slice(x0, x1)), xs + 0.5, ys + 0.5
+
+
+def _paint(arr, box, mask, color):
+    if box is not None:
+        region = arr[box[0]]
+        region[mask] = color
+
+
+def _shade(color, factor):
+    return tuple(int(min(255, c * factor)) for c in color)
+
+
+def draw_platform(arr, xc, yc, r, shape, color):
+    """等轴测平台：上表面中心 (xc, yc)、半宽 r，侧面高度约 0.8r"""
+    ry = r * SLOPE
+    depth = 0.8 * r
+    box = _box(arr, xc - r, xc + r, yc - ry, yc + ry + depth)
+    if box is None:
+        return
+    _, xs, ys = box
+    dx = xs - xc
+    if shape == "cube":
+        top = np.abs(dx) / r + np.abs(ys - yc) / ry <= 1
+        edge = yc + ry - np.abs(dx) * SLOPE
+        side = (np.abs(dx) <= r) & (ys > edge) & (ys <= edge + depth)
+        _paint(arr, box, side & (dx < 0), _shade(color, 0.86))
+        _paint(arr, box, side & (dx >= 0), _shade(color, 0.70))
+    else:
+        top = (dx / r) ** 2 + ((ys - yc) / ry) ** 2 <= 1
+        bottom = yc + depth + ry * np.sqrt(np.clip(1 - (dx / r) ** 2, 0, 1))
+        side = (np.abs(dx) <= r) & (ys > yc) & (ys <= bottom)
+        # 圆柱侧面从左到右逐渐变暗
+        for k, factor in enumerate(np.linspace(0.88, 0.68, 6)):
+            lo, hi = -r + 2 * r * k / 6, -r + 2 * r * (k + 1) / 6
+            _paint(arr, box, side & (dx >= lo) & (dx <= hi), _shade(color, factor))
+    _paint(arr, box, top, color)
+
+
+def draw_ellipse(arr, xc, yc, rx, ry, color):
+    box = _box(arr, xc - rx, xc + rx, yc - ry, yc + ry)
+    if box is not None:
+        _, xs, ys = box
+        _paint(arr, box, ((xs - xc) / rx) ** 2 + ((ys - yc) / ry) ** 2 <= 1, color)
+
+
+def draw_piece(arr, x, base_y, u):
+    """棋子：底座椭圆中心 (x, base_y)，u 为 1080 宽画面的像素比例"""
+    base_rx, base_ry = 38 * u, 15 * u
+    neck_y = base_y - 115 * u
+    # 身体：底部宽、顶部窄的梯形
+    box = _box(arr, x - 30 * u, x + 30 * u, neck_y, base_y)
+    if box is not None:
+        _, xs, ys = box
+        t = (base_y - ys) / (base_y - neck_y)
+        _paint(arr, box, np.abs(xs - x) <= 30 * u - 14 * u * t, PIECE_BODY)
+    draw_ellipse(arr, x, neck_y - 30 * u, 31 * u, 31 * u, PIECE_HEAD)
+    # 底座最后画，最低行只有底座颜色
+    draw_ellipse(arr, x, base_y, base_rx, base_ry, PIECE_BASE)
+    return base_y + base_ry
+
+
+def draw_score(arr, score, u):
+    """左上角的分数（深灰色块状数字），在扫描区域之外"""
+    h = arr.shape[0]
+    digit_w, digit_h = 36 * u, 60 * u
+    x = 50 * u
+    y = 0.07 * h
+    for ch in str(score):
+        strokes = {"0": "abcdef", "1": "bc", "2": "abged", "3": "abgcd", "4": "fgbc",
+                   "5": "afgcd", "6": "afgedc", "7": "abc", "8": "abcdefg", "9": "abcdfg"}[ch]
+        t = 7 * u
+        segments = {
+            "a": (x, x + digit_w, y, y + t), "g": (x, x + digit_w, y + digit_h / 2 - t / 2, y + digit_h / 2 + t / 2),
+            "d": (x, x + digit_w, y + digit_h - t, y + digit_h),
+            "f": (x, x + t, y, y + digit_h / 2), "b": (x + digit_w - t, x + digit_w, y, y + digit_h / 2),
+            "e": (x, x + t, y + digit_h / 2, y + digit_h), "c": (x + digit_w - t, x + digit_w, y + digit_h / 2, y + digit_h),
+        }
+        for s in strokes:
+            x0, x1, y0, y1 = segments[s]
+            arr[int(y0):int(y1), int(x0):int(x1)] = (60, 60, 60)
+        x += digit_w + 14 * u
+
+
+def render_frame(w: int, h: int, seed: int = 0, layout: dict = None,
+                 noise: float = 0.0, distractors: bool = True) -> tuple:
+    """渲染一帧，返回 (RGB 数组, 真实坐标字典)
+
+    layout 缺省时由 seed 随机生成；noise 为加性高斯噪声的标准差
+    """
+    layout = random_layout(seed) if layout is None else layout
+    u = w / 1080
+    cx, cy = symmetry_center(w, h)
+    s = layout["direction"]
+
+    # 背景：竖直渐变
+    top, bottom = (np.array(c, dtype=np.float32) for c in BACKGROUNDS[layout["background"]])
+    t = np.linspace(0, 1, h, dtype=np.float32)[:, None]
+    arr = np.empty((h, w, 3), dtype=np.uint8)
+    arr[...] = (top + (bottom - top) * t)[:, None, :].astype(np.uint8)
+
+    def on_line(x):
+        return cy + s * SLOPE * (x - cx)
+
+    # 当前平台在 s 一侧（下方），目标平台在另一侧（上方）
+    cur_x = cx + s * layout["piece_offset"] * w
+    cur_y = on_line(cur_x)
+    cur_r = layout["current_size"] * w
+    tgt_r = layout["target_size"] * w
+    # 目标平台在跳跃线上的位置，再沿线、垂直于线各偏移一段（真实画面中目标并不正好在线上）
+    norm = np.hypot(1, SLOPE)
+    along, across = layout.get("target_along", 0.0) * w, layout.get("target_across", 0.0) * w
+    line_x = cx - s * layout["target_offset"] * w
+    tgt_x = line_x + (along - s * SLOPE * across) / norm
+    tgt_y = on_line(line_x) + (s * SLOPE * along + across) / norm
+    # 目标平台最高点不高于 1/3 屏高（扫描区域从 1/3 开始），超出时沿线往下移
+    overshoot = h / 3 + 2 - (tgt_y - tgt_r * SLOPE)
+    if overshoot > 0:
+        tgt_x += s * overshoot / SLOPE
+        tgt_y += overshoot
+    # 两个平台不重叠：离得太近时缩小目标平台
+    tgt_r = max(0.05 * w, min(tgt_r, abs(tgt_x - cur_x) - cur_r - 0.02 * w))
+
+    if distractors:
+        # 身后的上一个平台，部分可能在画面外
+        prev_x = cur_x + s * (0.32 * w)
+        draw_platform(arr, prev_x, on_line(prev_x), 0.11 * w, "cube",
+                      PLATFORM_COLORS[layout["previous_color"]])
+        draw_score(arr, layout["score"], u)
+
+    draw_platform(arr, tgt_x, tgt_y, tgt_r, layout["target_shape"], PLATFORM_COLORS[layout["target_color"]])
+    if distractors:
+        # 目标中心的白点（连续命中中心后出现）
+        draw_ellipse(arr, tgt_x, tgt_y, 0.12 * tgt_r, 0.12 * tgt_r * SLOPE, (252, 252, 252))
+    cur_color = PLATFORM_COLORS[layout["current_color"]]
+    draw_platform(arr, cur_x, cur_y, cur_r, layout["current_shape"], cur_color)
+
+    piece_x = cur_x + layout["piece_jitter"] * w
+    base_y = on_line(piece_x)
+    if distractors:
+        # 棋子投在平台上表面的阴影
+        draw_ellipse(arr, piece_x + 22 * u, base_y - 6 * u, 40 * u, 16 * u, _shade(cur_color, 0.78))
+    draw_piece(arr, piece_x, base_y, u)
+
+    if noise > 0:
+        rng = np.random.default_rng(seed + 1)
+        noisy = arr.astype(np.float32) + rng.normal(0, noise, arr.shape)
+        arr = np.clip(noisy, 0, 255).astype(np.uint8)
+
+    # 底座最低行：像素中心落在椭圆内的最后一行
+    rows = np.flatnonzero(np.all(arr[:, int(piece_x)] == PIECE_BASE, axis=1)) if noise == 0 else []
+    piece_bottom = int(rows[-1]) if len(rows) else int(base_y + 15 * u)
+    truth = {
+        "width": w, "height": h, "seed": seed,
+        "piece_x": float(piece_x), "piece_y": float(base_y), "piece_bottom": piece_bottom,
+        "board_x": float(tgt_x), "board_y": float(tgt_y),
+        "board_top": float(tgt_y - tgt_r * SLOPE),
+        # 平台中心到跳跃线的竖直距离，按线推算 board_y 的误差下限
+        "line_offset": float(tgt_y - on_line(tgt_x)),
+        "target_shape": layout["target_shape"],
+    }
+    return arr, truth
+
+
+# ==================== 基准测试 ====================
+def detection_error(result, truth: dict) -> dict:
+    """检测结果与真实坐标的误差（像素）"""
+    return {
+        "piece_dx": abs(result.piece_x - truth["piece_x"]),
+        "board_dx": abs(result.board_x - truth["board_x"]),
+        "board_dy": abs(result.board_y - truth["board_y"]),
+    }
+
+
+def benchmark(sizes=SIZES, frames: int = 20, configs=None, noise: float = 0.0) -> list:
+    """在各分辨率的合成画面上测试检测器，返回每个 (配置, 分辨率) 的检出率、误差和耗时"""
+    from algorithm import GameConfig, JumpAlgorithm
+
+    configs = configs or {"default": {}}
+    rows = []
+    for name, overrides in configs.items():
+        for w, h in sizes:
+            config = GameConfig()
+            for key, value in overrides.items():
+                setattr(config, key, value)
+            algorithm = JumpAlgorithm(config)
+            found, errors, latency = 0, [], []
+            for seed in range(frames):
+                arr, truth = render_frame(w, h, seed, noise=noise)
+                algorithm.reset_tracking()
+                start = time.perf_counter()
+                result = algorithm.detect(arr)
+                latency.append((time.perf_counter() - start) * 1000)
+                if result.found:
+                    found += 1
+                    errors.append(detection_error(result, truth))
+            tolerance = 0.02 * w
+            rows.append({
+                "config": name, "size": f"{w}x{h}", "frames": frames, "found": found,
+                "accurate": sum(e["board_dx"] <= tolerance and e["board_dy"] <= tolerance
+                                and e["piece_dx"] <= tolerance for e in errors),
+                "board_err": float(np.median([max(e["board_dx"], e["board_dy"]) for e in errors])) if errors else None,
+                "p50_ms": float(np.percentile(latency, 50)),
+                "p95_ms": float(np.percentile(latency, 95)),
+            })
+    return rows
+
+
+def write_corpus(out_dir: str, sizes=SIZES, frames: int = 20, noise: float = 0.0) -> int:
+    """把合成画面写成 PNG 和 truth.jsonl，可直接交给 replay.py 回放"""
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    with open(os.path.join(out_dir, "truth.jsonl"), "w", encoding="utf-8") as f:
+        for w, h in sizes:
+            for seed in range(frames):
+                arr, truth = render_frame(w, h, seed, noise=noise)
+                name = f"{w}x{h}_{seed:04d}.png"
+                Image.fromarray(arr).save(os.path.join(out_dir, name), compress_level=1)
+                truth["file"] = name
+                f.write(json.dumps(truth) + "\n")
+                count += 1
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="合成跳一跳画面，测试检测器在各分辨率下的精度与耗时")
+    parser.add_argument("--sizes", default=",".join(f"{w}x{h}" for w, h in SIZES),
+                        help="分辨率列表，如 720x1280,1080x1920")
+    parser.add_argument("--frames", type=int, default=20, help="每个分辨率的帧数（种子 0..N-1）")
+    parser.add_argument("--noise", type=float, default=0.0, help="高斯噪声标准差")
+    parser.add_argument("--out", help="只生成画面：写 PNG 与 truth.jsonl 到该目录")
+    args = parser.parse_args(argv)
+    sizes = [tuple(int(v) for v in size.split("x")) for size in args.sizes.split(",")]
+
+    if args.out:
+        count = write_corpus(args.out, sizes, args.frames, args.noise)
+        print(f"已生成 {count} 帧到 {args.out}")
+        return 0
+
+    configs = {
+        "component": {},
+        "edge": {"board_detector": "edge"},
+        "no-pyramid": {"pyramid": False},
+    }
+    print(f"{'配置':<12}{'分辨率':<12}{'检出':>6}{'准确':>6}{'平台误差':>10}{'p50':>9}{'p95':>9}")
+    for row in benchmark(sizes, args.frames, configs, args.noise):
+        err = "-" if row["board_err"] is None else f"{row['board_err']:.1f}px"
+        print(f"{row['config']:<12}{row['size']:<12}{row['found']:>6}{row['accurate']:>6}"
+              f"{err:>10}{row['p50_ms']:>7.1f}ms{row['p95_ms']:>7.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
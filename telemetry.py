@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+延迟统计 - 各阶段耗时的滚动分位数
+
+每个阶段保存最近 size 个样本（固定大小的环形缓冲，内存不随运行时间增长），
+需要显示时才排序求 p50 / p95 / p99。记录一次只是一次加锁写数组，
+相对每轮约一秒的跳跃周期可以忽略
+"""
+
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+# 阶段显示名，按一轮跳跃的先后顺序
+STAGE_NAMES = {
+    "capture": "截图",
+    "piece": "棋子",
+    "board": "平台",
+    "detect": "检测",
+    "press": "按压",
+    "settle": "落地",
+    "cycle": "周期",
+}
+
+
+class RollingHistogram:
+    """最近 size 个样本（毫秒）的环形缓冲"""
+
+    def __init__(self, size: int = 256):
+        self.samples = array('d', [0.0]) * size
+        self.size = size
+        self.count = 0
+
+    def add(self, value: float):
+        self.samples[self.count % self.size] = value
+        self.count += 1
+
+    def percentiles(self, qs=(50, 95, 99)) -> tuple:
+        """最近样本的分位数（最近邻法），没有样本时返回全 0"""
+        n = min(self.count, self.size)
+        if not n:
+            return tuple(0.0 for _ in qs)
+        ordered = sorted(self.samples[:n])
+        return tuple(ordered[min(n - 1, int(q / 100 * n))] for q in qs)
+
+
+class LatencyRecorder:
+    """按阶段记录耗时，可在多个线程中同时记录"""
+
+    def __init__(self, size: int = 256, clock=time.perf_counter_ns):
+        self.size = size
+        self.clock = clock
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, ms: float):
+        with self.lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = RollingHistogram(self.size)
+            hist.add(ms)
+
+    @contextmanager
+    def span(self, stage: str):
+        """with recorder.span("capture"): ... 记录代码块耗时"""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(stage, (self.clock() - start) / 1e6)
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+
+    def snapshot(self) -> dict:
+        """{阶段: (样本数, p50, p95, p99)}，按 STAGE_NAMES 的顺序"""
+        with self.lock:
+            items = [(name, hist.count, hist.percentiles()) for name, hist in self.stages.items()]
+        order = list(STAGE_NAMES)
+        items.sort(key=lambda item: order.index(item[0]) if item[0] in order else len(order))
+        return {name: (count,) + p for name, count, p in items}
+
+    def compact(self, stages=None) -> str:
+        """紧凑的一行：阶段 p50/p95/p99（毫秒）"""
+        parts = []
+        for name, (count, p50, p95, p99) in self.snapshot().items():
+            if stages is None or name in stages:
+                parts.append(f"{STAGE_NAMES.get(name, name)} {p50:.0f}/{p95:.0f}/{p99:.0f}")
+        return " | ".join(parts)
+
+    def dump(self) -> str:
+        """多行表格，停止时打印"""
+        lines = [f"{'阶段':<8}{'样本':>6}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)"]
+        for name, (count, p50, p95, p99) in self.snapshot().items():
+            lines.append(f"{STAGE_NAMES.get(name, name):<8}{count:>6}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+按压执行器测试 - 光标只定位一次、按住时长精度、请求/实际时长记录
+"""
+import sys
+import time
+
+from actuator import PressActuator, precise_hold
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+class FakeMouse:
+    def __init__(self):
+        self.events = []
+
+    def down(self):
+        self.events.append(("down", time.perf_counter_ns()))
+
+    def up(self):
+        self.events.append(("up", time.perf_counter_ns()))
+
+    def move(self, x, y):
+        self.events.append(("move", (x, y)))
+
+
+def test_cursor_positioned_once():
+    """按压点不变时只移动一次光标，reset 后的新会话重新定位"""
+    mouse = FakeMouse()
+    actuator = PressActuator(mouse.down, mouse.up, mouse.move)
+    for _ in range(3):
+        actuator.set_point(700, 540)
+        actuator.press(1)
+    actuator.set_point(710, 540)
+    actuator.reset()
+    actuator.set_point(710, 540)
+    moves = [e for e in mouse.events if e[0] == "move"]
+    assert moves == [("move", (700, 540)), ("move", (710, 540)), ("move", (710, 540))]
+
+
+def test_hold_precision():
+    """实际按住时长与请求时长的误差远小于 sleep 的调度误差"""
+    mouse = FakeMouse()
+    actuator = PressActuator(mouse.down, mouse.up)
+    for press_ms in (25, 50, 120):
+        requested, actual = actuator.press(press_ms)
+        measured = (mouse.events[-1][1] - mouse.events[-2][1]) / 1e6
+        print(f"  请求 {requested:.0f}ms，实际 {actual:.3f}ms，按下到松开 {measured:.3f}ms")
+        assert requested <= actual < requested + 5
+        assert measured >= requested
+    summary = actuator.summary()
+    print(f"  {summary}")
+    assert summary["count"] == 3 and summary["max_error"] < 5
+
+
+def test_precise_hold_spins_last_stretch():
+    """虚拟时钟下：只 sleep 到目标前 spin_ns，剩余部分忙等，不会超过目标"""
+    now = [0]
+    sleeps = []
+
+    def clock():
+        now[0] += 1000
+        return now[0]
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += int(seconds * 1e9)
+
+    elapsed = precise_hold(10_000_000, 0, spin_ns=2_000_000, clock=clock, sleep=sleep)
+    assert len(sleeps) == 1 and abs(sleeps[0] - 0.008) < 1e-5
+    assert 10_000_000 <= elapsed <= 10_002_000
+
+
+def test_mouse_released_on_error():
+    """按住期间出错也一定会松开鼠标"""
+    mouse = FakeMouse()
+
+    def broken_sleep(seconds):
+        raise KeyboardInterrupt
+
+    actuator = PressActuator(mouse.down, mouse.up, sleep=broken_sleep)
+    try:
+        actuator.press(100)
+    except KeyboardInterrupt:
+        pass
+    assert [e[0] for e in mouse.events] == ["down", "up"]
+    assert actuator.summary()["count"] == 0
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("按压执行器测试")
+    print("=" * 70)
+    test_cursor_positioned_once()
+    test_hold_precision()
+    test_precise_hold_spins_last_stretch()
+    test_mouse_released_on_error()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+背景模型测试 - 每行背景色拟合、跨帧缓存、换主题重新拟合
+"""
+import sys
+
+import numpy as np
+
+import vision
+from algorithm import GameConfig, JumpAlgorithm
+from test_components import background, draw_cube, draw_piece
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def frame_with_left_decoration():
+    """最左侧有一条装饰物挡住背景的画面"""
+    arr = background(1000, 1080)
+    draw_cube(arr, 300, 640, 90, 60)
+    draw_cube(arr, 700, 470, 110, 70)
+    draw_piece(arr, 300, 640)
+    arr[380:560, 0:12] = (90, 140, 90)
+    return arr
+
+
+def test_model_matches_gradient_under_occlusion():
+    """被平台和装饰物遮挡的行由上下插值，拟合结果与真实渐变一致"""
+    arr = frame_with_left_decoration()
+    rows = vision.BackgroundModel().fit(arr)
+    truth = background(1000, 1080)[:, 500].astype(np.int16)
+    assert np.abs(rows - truth).sum(axis=1).max() <= 3
+
+
+def test_left_edge_decoration_does_not_fool_detector():
+    """wangshub 取最左侧像素作背景会被装饰物干扰，背景模型不会"""
+    arr = frame_with_left_decoration()
+    results = {}
+    for use_model in (False, True):
+        config = GameConfig()
+        config.track_roi = False
+        config.board_detector = "edge"
+        config.background_model = use_model
+        results[use_model] = JumpAlgorithm(config).find_piece_and_board(arr)
+    print(f"  最左侧像素: {results[False]}  背景模型: {results[True]}")
+    assert abs(results[True][2] - 700) <= 2
+    assert abs(results[False][2] - 700) > 2
+
+
+def test_model_cached_and_refit_on_theme_change():
+    """同一主题下跨帧复用，背景整体变色后重新拟合"""
+    model = vision.BackgroundModel()
+    arr = frame_with_left_decoration()
+    model.update(arr)
+    model.update(arr)
+    model.update(arr)
+    assert model.refits == 1
+
+    shifted = arr.astype(np.int16)
+    shifted[..., 0] -= 30
+    model.update(np.clip(shifted, 0, 255).astype(np.uint8))
+    assert model.refits == 2
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("背景模型测试")
+    print("=" * 70)
+    test_model_matches_gradient_under_occlusion()
+    test_left_edge_decoration_does_not_fool_detector()
+    test_model_cached_and_refit_on_theme_change()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+自下而上棋子扫描测试 - 与逐行扫描结果一致，垃圾帧在预算内失败
+"""
+import sys
+import time
+
+import numpy as np
+
+import vision
+from algorithm import GameConfig, JumpAlgorithm
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def detect(img, search, **overrides):
+    config = GameConfig()
+    config.piece_search = search
+    config.pyramid = False
+    config.track_roi = False
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return JumpAlgorithm(config).find_piece_and_board(img)
+
+
+def test_matches_top_down():
+    """干净画面上自下而上与逐行扫描得到同一个棋子底座"""
+    layouts = [
+        (360, 640, 100, 380, 260, 240),
+        (360, 640, 260, 390, 90, 250),
+        (1000, 1080, 300, 640, 720, 420),
+    ]
+    for layout in layouts:
+        img = make_frame(*layout)
+        bottom_up = detect(img, "bottomup")
+        top_down = detect(img, "topdown")
+        print(f"  {layout[:2]}: bottomup={bottom_up} topdown={top_down}")
+        assert bottom_up == top_down
+        assert bottom_up[0] != 0
+
+
+def test_stride_never_skips_base():
+    """任何步长下，底座高度不小于步长时都能找到真正的最低行"""
+    arr = np.array(make_frame(1000, 1080, 300, 640, 720, 420))
+    for stride in (1, 2, 3, 5):
+        piece_x, piece_y_max, _ = vision.find_piece_bottom_up(arr, 125, 875, 0, 720, stride, 4)
+        assert (piece_x, piece_y_max) == (300, 640), (stride, piece_x, piece_y_max)
+
+
+def test_pixel_budget():
+    """像素预算耗尽即返回未找到，扫描量不超过预算"""
+    rng = np.random.default_rng(5)
+    arr = rng.integers(0, 256, (1080, 1000, 3), dtype=np.uint8)
+    budget = 750 * 100
+    piece_x, piece_y_max, scanned = vision.find_piece_bottom_up(arr, 125, 875, 0, 720, 4, 4, budget=budget)
+    print(f"  预算 {budget} 像素，扫描 {scanned} 像素")
+    assert (piece_x, piece_y_max) == (0, 0)
+    assert scanned <= budget
+
+    # 预算足够时同样的棋子仍可找到
+    arr = np.array(make_frame(1000, 1080, 300, 640, 720, 420))
+    piece_x, _, scanned = vision.find_piece_bottom_up(arr, 125, 875, 0, 720, 4, 4, budget=750 * 60)
+    assert piece_x == 300 and scanned <= 750 * 60
+
+
+def test_deadline():
+    """已过期的截止时间立即返回未找到"""
+    arr = np.array(make_frame(1000, 1080, 300, 640, 720, 420))
+    result = vision.find_piece_bottom_up(arr, 125, 875, 0, 720, 4, 4, deadline=time.perf_counter() - 1)
+    assert result == (0, 0, 0)
+
+
+def test_time_budget_reports_timeout():
+    """时间预算用完按超时报告（调用方立即重新截图），像素预算用完才判定无棋子"""
+    img = make_frame(1000, 1080, 300, 640, 720, 420)
+    config = GameConfig()
+    config.pyramid = False
+    config.track_roi = False
+    config.piece_scan_time_ms = 1e-9
+    result = JumpAlgorithm(config).detect(img)
+    assert result.status == "timeout" and not result.found
+
+    config.piece_scan_time_ms = 0
+    config.piece_scan_budget = 750
+    assert JumpAlgorithm(config).detect(img).status == "no_piece"
+
+
+def test_garbage_frame_fails_fast():
+    """噪声帧隔行扫描只覆盖一小部分区域，且不会把零星同色噪点当作底座"""
+    rng = np.random.default_rng(9)
+    arr = rng.integers(0, 256, (1080, 1000, 3), dtype=np.uint8)
+    arr[500, 300] = (55, 58, 100)
+    piece_x, _, scanned = vision.find_piece_bottom_up(arr, 125, 875, 0, 720, 4, 4)
+    print(f"  噪声帧扫描 {scanned} / {750 * 720} 像素")
+    assert piece_x == 0
+    assert scanned <= 750 * 720 // 4 + 750
+
+
+def benchmark():
+    rng = np.random.default_rng(0)
+    garbage = rng.integers(0, 256, (1080, 1000, 3), dtype=np.uint8)
+    frame = np.array(make_frame(1000, 1080, 300, 640, 720, 420))
+    for label, arr in (("正常帧", frame), ("噪声帧", garbage)):
+        for search in ("topdown", "bottomup"):
+            start = time.perf_counter()
+            detect(arr, search, board_detector="edge")
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  {label} {search:8s}: {elapsed:6.1f}ms")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("自下而上棋子扫描测试")
+    print("=" * 70)
+    test_matches_top_down()
+    test_stride_never_skips_base()
+    test_pixel_budget()
+    test_deadline()
+    test_time_budget_reports_timeout()
+    test_garbage_frame_fails_fast()
+    print("\n--- 1000x1080 耗时对比 ---")
+    benchmark()
+    print("\n[OK] 所有测试通过")
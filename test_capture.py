@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+截图后端测试 - 文件回放、基准选择、X11 共享内存（有 DISPLAY 时）
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import capture
+from algorithm import GameConfig, JumpAlgorithm
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def save_frames(directory, layouts):
+    paths = []
+    for k, layout in enumerate(layouts):
+        path = os.path.join(directory, f"frame_{k:03d}.png")
+        make_frame(*layout).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_file_backend_replay():
+    """目录回放按文件名顺序循环，region 裁剪，结果与直接检测 PIL 图像相同"""
+    layouts = [(360, 640, 100, 380, 260, 240), (360, 640, 260, 390, 90, 250)]
+    with tempfile.TemporaryDirectory() as directory:
+        save_frames(directory, layouts)
+        backend = capture.choose_backend(replay=directory)
+        assert backend.name == "file"
+        frames = [backend.grab() for _ in range(3)]
+        assert frames[0].shape == (640, 360, 3) and frames[0].dtype == np.uint8
+        assert np.array_equal(frames[0], frames[2])
+        assert not np.array_equal(frames[0], frames[1])
+        assert backend.grab((10, 20, 100, 50)).shape == (50, 100, 3)
+
+        for layout, frame in zip(layouts, frames):
+            expected = JumpAlgorithm(GameConfig()).find_piece_and_board(make_frame(*layout))
+            assert JumpAlgorithm(GameConfig()).find_piece_and_board(frame) == expected
+
+        once = capture.FileBackend(directory, loop=False)
+        once.grab()
+        once.grab()
+        try:
+            once.grab()
+        except capture.CaptureError:
+            pass
+        else:
+            raise AssertionError("不循环回放结束时应报错")
+
+    try:
+        capture.FileBackend(os.path.join(tempfile.gettempdir(), "no_such_frame.png"))
+    except capture.CaptureError:
+        pass
+    else:
+        raise AssertionError("缺失的文件应报 CaptureError")
+
+
+def test_frame_buffer_reuse():
+    """帧缓冲只在尺寸变化时重新分配，paste 写入的内容与检测用视图是同一块内存"""
+    buffer = capture.FrameBuffer()
+    first = make_frame(360, 640, 100, 380, 260, 240)
+    rgb = buffer.paste(first)
+    assert np.shares_memory(rgb, buffer.array)
+    assert np.array_equal(rgb, np.asarray(first))
+    expected = JumpAlgorithm(GameConfig()).find_piece_and_board(first)
+    assert JumpAlgorithm(GameConfig()).find_piece_and_board(rgb) == expected
+
+    config = GameConfig()
+    config.detect_engine = "loop"
+    assert JumpAlgorithm(config).find_piece_and_board(rgb) == JumpAlgorithm(config).find_piece_and_board(first)
+
+    second = make_frame(360, 640, 260, 390, 90, 250)
+    again = buffer.paste(second)
+    assert again is rgb and buffer.allocations == 1
+    assert np.array_equal(rgb, np.asarray(second))
+
+    img = buffer.image()
+    assert img.size == (360, 640) and np.array_equal(np.asarray(img), rgb)
+
+    buffer.paste(make_frame(400, 600, 120, 360, 300, 230).convert("RGBA"))
+    assert buffer.allocations == 2 and buffer.rgb.shape == (600, 400, 3)
+    buffer.ensure(400, 600)
+    assert buffer.allocations == 2
+
+
+class FakeBackend(capture.CaptureBackend):
+    closed = []
+
+    def __init__(self, name, delay, fail=False):
+        if fail:
+            raise capture.CaptureError("不可用")
+        self.name = name
+        self.delay = delay
+
+    def grab(self, region=None):
+        time.sleep(self.delay)
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def close(self):
+        FakeBackend.closed.append(self.name)
+
+
+def test_choose_fastest_backend():
+    """自动模式跳过不可用后端，保留最快的并关闭其余"""
+    FakeBackend.closed = []
+    backends = {
+        "broken": lambda: FakeBackend("broken", 0, fail=True),
+        "slow": lambda: FakeBackend("slow", 0.01),
+        "fast": lambda: FakeBackend("fast", 0.0),
+    }
+    backend = capture.choose_backend((0, 0, 4, 4), backends=backends, frames=3)
+    assert backend.name == "fast"
+    assert FakeBackend.closed == ["slow"]
+
+    assert capture.choose_backend(preferred="slow", backends=backends).name == "slow"
+    for bad in ({"broken": backends["broken"]}, {}):
+        try:
+            capture.choose_backend(backends=bad, frames=1)
+        except capture.CaptureError:
+            pass
+        else:
+            raise AssertionError("没有可用后端时应报错")
+
+
+def test_falls_back_without_x11():
+    """没有 libX11 时 xshm 初始化报 CaptureError，自动选择退回其他后端（不需要 X 服务器）"""
+    with tempfile.TemporaryDirectory() as directory:
+        save_frames(directory, [(360, 640, 100, 380, 260, 240)])
+        backends = {"xshm": capture.XShmBackend, "file": lambda: capture.FileBackend(directory)}
+        with mock.patch("ctypes.util.find_library", return_value=None):
+            try:
+                capture.XShmBackend(display=":0")
+            except capture.CaptureError as e:
+                assert "X11" in str(e)
+            else:
+                raise AssertionError("没有 libX11 时应报 CaptureError")
+            backend = capture.choose_backend((0, 0, 100, 50), backends=backends, frames=1)
+        assert backend.name == "file"
+        assert backend.grab((0, 0, 100, 50)).shape == (50, 100, 3)
+
+
+def test_xshm_backend():
+    """X11 共享内存截图与 XGetImage 结果一致（需要 DISPLAY，例如 Xvfb）"""
+    try:
+        backend = capture.XShmBackend()
+    except capture.CaptureError as e:
+        pytest.skip(f"XShm 截图不可用: {e}")
+    try:
+        region = (0, 0, min(200, backend.screen_size[0]), min(100, backend.screen_size[1]))
+        shm_frame = backend.grab(region)
+        assert shm_frame.shape == (region[3], region[2], 3)
+        # 共享内存模式下每次返回同一块内存的视图
+        assert not backend.use_shm or np.shares_memory(backend.grab(region), shm_frame)
+        shm_frame = shm_frame.copy()
+        use_shm, backend.use_shm = backend.use_shm, False
+        assert np.array_equal(backend.grab(region), shm_frame)
+        backend.use_shm = use_shm
+        print(f"  MIT-SHM: {use_shm}, {capture.benchmark_backend(backend, region):.2f}ms/帧")
+
+        # 其他线程截图使用自己的 Display 和缓冲，不覆盖本线程的帧
+        frames = []
+        worker = threading.Thread(target=lambda: frames.append(backend.grab(region)))
+        worker.start()
+        worker.join()
+        assert np.array_equal(frames[0], shm_frame)
+        assert not np.shares_memory(frames[0], backend.grab(region))
+        assert len(backend._connections) == 2
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("截图后端测试")
+    print("=" * 70)
+    test_file_backend_replay()
+    test_frame_buffer_reuse()
+    test_choose_fastest_backend()
+    test_falls_back_without_x11()
+    try:
+        test_xshm_backend()
+    except pytest.skip.Exception as e:
+        print(f"  跳过: {e}")
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+查找表颜色分类器测试 - 与原逐像素比较链逐项一致
+"""
+import sys
+import time
+
+import numpy as np
+
+import vision
+from vision import ColorClassifier
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+# 亮度、r < g < b 规则的样例（检测器只用棋子规则，这些只用来验证分类器本身）
+EXTRA_RULES = {
+    "purple": {"r": (25, 100), "g": (5, 80), "b": (50, 140), "ordered": True},
+    "dark": {"sum": (-1, 450)},
+    "platform": {"r": (150, 256), "g": (150, 256), "b": (150, 256), "sum": (500, 750)},
+    "bright": {"sum": (550, 720)},
+}
+
+
+def reference_masks(pixels):
+    """与各规则对应的比较链"""
+    r = pixels[..., 0].astype(int)
+    g = pixels[..., 1].astype(int)
+    b = pixels[..., 2].astype(int)
+    s = r + g + b
+    return {
+        "piece": (50 < r) & (r < 60) & (53 < g) & (g < 63) & (95 < b) & (b < 110),
+        "purple": (r < g) & (g < b) & (25 < r) & (r < 100) & (5 < g) & (g < 80) & (50 < b) & (b < 140),
+        "dark": s < 450,
+        "platform": (s > 500) & (r > 150) & (g > 150) & (b > 150) & (s < 750),
+        "bright": (550 < s) & (s < 720),
+    }
+
+
+def sample_pixels():
+    rng = np.random.default_rng(3)
+    pixels = rng.integers(0, 256, (200, 300, 3), dtype=np.uint8)
+    # 补充落在各规则边界附近的像素
+    near = rng.integers(20, 120, (100, 300, 3), dtype=np.uint8)
+    bright = rng.integers(145, 256, (100, 300, 3), dtype=np.uint8)
+    return np.concatenate([pixels, near, bright])
+
+
+def test_masks_match_reference():
+    """每个类别的整块掩码与比较链完全一致"""
+    pixels = sample_pixels()
+    expected = reference_masks(pixels)
+    assert np.array_equal(vision.piece_mask(pixels), expected["piece"])
+    classifier = ColorClassifier(dict(vision.COLOR_RULES, **EXTRA_RULES))
+    for name, mask in expected.items():
+        got = classifier.mask(pixels, name)
+        print(f"  {name:8s}: {int(mask.sum())} 个像素")
+        assert mask.any()
+        assert np.array_equal(got, mask)
+
+
+def test_label_map():
+    """一次分类得到全部类别位图，与逐个类别的掩码相同"""
+    pixels = sample_pixels()
+    classifier = ColorClassifier(dict(vision.COLOR_RULES, **EXTRA_RULES))
+    labels = classifier.classify(pixels)
+    expected = reference_masks(pixels)
+    for name, mask in expected.items():
+        assert np.array_equal((labels & classifier.bit(name)) != 0, mask)
+
+
+def test_custom_rules():
+    """自定义类别：新增规则只需改规则表"""
+    classifier = ColorClassifier({"red": {"r": (200, 256), "g": (-1, 50), "b": (-1, 50)}})
+    pixels = np.array([[[220, 10, 10], [200, 10, 10], [220, 60, 10]]], dtype=np.uint8)
+    assert classifier.mask(pixels, "red").tolist() == [[True, False, False]]
+    try:
+        ColorClassifier({str(k): {"sum": (0, k)} for k in range(9)})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("超过 8 个类别应报错")
+
+
+def benchmark():
+    pixels = np.random.default_rng(0).integers(0, 256, (720, 1440, 3), dtype=np.uint8)
+    classifier = ColorClassifier(dict(vision.COLOR_RULES, **EXTRA_RULES))
+    for label, func in (("比较链", lambda: reference_masks(pixels)["piece"]),
+                        ("查找表", lambda: vision.piece_mask(pixels)),
+                        ("五个类别", lambda: classifier.classify(pixels))):
+        start = time.perf_counter()
+        for _ in range(5):
+            func()
+        elapsed = (time.perf_counter() - start) * 1000 / 5
+        print(f"  {label}: {elapsed:6.1f}ms")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("颜色分类器测试")
+    print("=" * 70)
+    test_masks_match_reference()
+    test_label_map()
+    test_custom_rules()
+    print("\n--- 1440x720 耗时 ---")
+    benchmark()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+连通域平台分割测试 - 等轴测方块/圆柱平台中心、远侧最近平台选择
+"""
+import sys
+import time
+
+import numpy as np
+
+import vision
+from algorithm import GameConfig, JumpAlgorithm
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+SLOPE = 25.5 / 43.5
+
+
+def background(w, h):
+    arr = np.zeros((h, w, 3), dtype=np.uint8)
+    ys = np.arange(h)
+    arr[..., 0] = (220 - ys * 60 // h)[:, None]
+    arr[..., 1] = (225 - ys * 50 // h)[:, None]
+    arr[..., 2] = (235 - ys * 30 // h)[:, None]
+    return arr
+
+
+def draw_cube(arr, cx, cy, half, depth, top=(245, 245, 245)):
+    """上表面为菱形的方块，(cx, cy) 为上表面中心"""
+    h, w = arr.shape[:2]
+    ys, xs = np.mgrid[0:h, 0:w]
+    dx, dy = np.abs(xs - cx), ys - cy
+    face = dx / half + np.abs(dy) / (half * SLOPE) <= 1
+    side = (dx <= half) & (dy >= 0) & (dy <= half * SLOPE * (1 - dx / half) + depth) & ~face
+    arr[side & (xs < cx)] = (180, 180, 185)
+    arr[side & (xs >= cx)] = (150, 150, 160)
+    arr[face] = top
+
+
+def draw_cylinder(arr, cx, cy, radius, depth, top=(230, 200, 150)):
+    h, w = arr.shape[:2]
+    ys, xs = np.mgrid[0:h, 0:w]
+    dx, dy = xs - cx, ys - cy
+    face = (dx / radius) ** 2 + (dy / (radius * SLOPE)) ** 2 <= 1
+    side = (np.abs(dx) <= radius) & (dy >= 0) & \
+        (dy <= radius * SLOPE * np.sqrt(np.clip(1 - (dx / radius) ** 2, 0, 1)) + depth) & ~face
+    arr[side] = (190, 160, 110)
+    arr[face] = top
+
+
+def draw_piece(arr, piece_x, piece_bottom):
+    arr[piece_bottom - 90:piece_bottom - 4, piece_x - 15:piece_x + 16] = (70, 60, 120)
+    arr[piece_bottom - 4:piece_bottom + 1, piece_x - 18:piece_x + 19] = (55, 58, 100)
+
+
+def detect(arr, detector):
+    config = GameConfig()
+    config.track_roi = False
+    config.board_detector = detector
+    return JumpAlgorithm(config).find_piece_and_board(arr)
+
+
+def test_cube_center():
+    """方块平台：中心误差不超过 2px"""
+    arr = background(1000, 1080)
+    draw_cube(arr, 300, 640, 90, 60)
+    draw_cube(arr, 700, 470, 110, 70)
+    draw_piece(arr, 300, 640)
+    result = detect(arr, "component")
+    print(f"  方块: {result}")
+    assert abs(result[2] - 700) <= 2 and abs(result[3] - 470) <= 2
+
+
+def test_cylinder_center():
+    """圆柱平台（在棋子左侧）：中心误差不超过 2px"""
+    arr = background(1000, 1080)
+    draw_cube(arr, 680, 640, 90, 60)
+    draw_cylinder(arr, 330, 460, 100, 60)
+    draw_piece(arr, 680, 640)
+    result = detect(arr, "component")
+    print(f"  圆柱: {result}")
+    assert abs(result[2] - 330) <= 2 and abs(result[3] - 460) <= 2
+
+
+def test_nearest_far_side_platform():
+    """远侧有多个平台时取最近的一个，近侧的干扰物被忽略"""
+    arr = background(1000, 1080)
+    draw_cube(arr, 300, 640, 90, 60)
+    draw_cube(arr, 620, 520, 80, 50)
+    draw_cube(arr, 850, 380, 70, 50)
+    draw_cylinder(arr, 130, 420, 60, 40)
+    draw_piece(arr, 300, 640)
+    result = detect(arr, "component")
+    print(f"  多平台: {result}")
+    assert abs(result[2] - 620) <= 2 and abs(result[3] - 520) <= 2
+
+
+def test_not_worse_than_edge():
+    """目标在跳跃线上或偏离跳跃线：连通域的误差不超过 edge（edge 的纵坐标按投影推算）"""
+    center_x, center_y = 1000 / 2 + 24 / 1080 * 1000, 1080 / 2 + 17 / 1920 * 1080
+    errors = {"edge": 0.0, "component": 0.0}
+    for board_x, offset, shape in ((700, 0, "cube"), (680, 25, "cylinder"), (700, -15, "cube"),
+                                   (650, 0, "cylinder"), (740, 30, "cube")):
+        board_y = center_y - SLOPE * (board_x - center_x) + offset
+        arr = background(1000, 1080)
+        draw_cube(arr, 300, 640, 90, 60)
+        if shape == "cube":
+            draw_cube(arr, board_x, board_y, 100, 60)
+        else:
+            draw_cylinder(arr, board_x, board_y, 100, 60)
+        draw_piece(arr, 300, 640)
+        for detector in errors:
+            result = detect(arr, detector)
+            errors[detector] += abs(result[2] - board_x) + abs(result[3] - board_y)
+        result = detect(arr, "component")
+        assert abs(result[2] - board_x) <= 2 and abs(result[3] - board_y) <= 2
+    print(f"  累计误差: {errors}")
+    assert errors["component"] <= errors["edge"]
+
+
+def test_falls_back_to_edge_scan():
+    """分割不到目标平台时回退到逐行边缘扫描"""
+    arr = background(1000, 1080)
+    draw_cube(arr, 300, 640, 90, 60)
+    draw_piece(arr, 300, 640)
+    assert detect(arr, "component") == detect(arr, "edge")
+
+
+def benchmark():
+    arr = background(1000, 1080)
+    draw_cube(arr, 300, 640, 90, 60)
+    for i in range(12):
+        draw_cylinder(arr, 450 + (i % 4) * 130, 400 + (i // 4) * 70, 25, 15, top=(200, 120 + i * 5, 120))
+    draw_piece(arr, 300, 640)
+    for detector in ("edge", "component"):
+        start = time.perf_counter()
+        for _ in range(10):
+            result = detect(arr, detector)
+        print(f"  {detector:9s}: {(time.perf_counter() - start) * 100:.1f}ms -> {result}")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("连通域平台分割测试")
+    print("=" * 70)
+    test_cube_center()
+    test_cylinder_center()
+    test_nearest_far_side_platform()
+    test_not_worse_than_edge()
+    test_falls_back_to_edge_scan()
+    print("\n--- 复杂画面耗时 ---")
+    benchmark()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+配置存储测试 - 防抖合并写入、update 不等待磁盘、原子替换、损坏文件、关闭时写入
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from config_store import ConfigStore
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeClock:
+    """手动推进的时钟，防抖判断不依赖真实耗时"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_for(predicate, timeout=5.0):
+    """等后台线程完成某件事；超时只是兜底，不是被测的时间限制"""
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_slider_drag_writes_once():
+    """连续拖动滑块只在停下 delay 秒后写一次；写盘进行中 update 也不会被阻塞"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        clock = FakeClock()
+        store = ConfigStore(path, delay=0.1, clock=clock)
+        for i in range(50):
+            clock.now += 0.002
+            store.update({"press_coefficient": 1.0 + i / 100, "game_area": [400, 0, 1000, 1080]})
+        assert store.writes == 0 and store.dirty
+
+        # 停止拖动 delay 秒后，后台线程写一次
+        clock.now += 0.2
+        with store.cond:
+            store.cond.notify_all()
+        assert wait_for(lambda: store.writes == 1)
+        print(f"  50 次修改，写盘 {store.writes} 次")
+        assert read(path) == {"press_coefficient": 1.49, "game_area": [400, 0, 1000, 1080]}
+
+        # 值未变化时不会再次写盘
+        store.update({"press_coefficient": 1.49})
+        assert not store.dirty
+
+        # 写盘进行中（持有写锁）时 update 立即返回
+        with store.write_lock:
+            worker = threading.Thread(target=store.update, args=({"press_coefficient": 1.6},))
+            worker.start()
+            worker.join(5)
+            assert not worker.is_alive() and store.dirty
+        store.close()
+        assert read(path)["press_coefficient"] == 1.6
+
+
+def test_atomic_replace_leaves_no_temp():
+    """写入通过临时文件替换，目录中不残留临时文件；写入失败时保留旧文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        store = ConfigStore(path)
+        store.update({"a": 1})
+        store.flush()
+        assert read(path) == {"a": 1}
+        store.update({"a": {"bad": object()}})
+        store.flush()
+        assert read(path) == {"a": 1}
+        assert os.listdir(tmp) == ["config.json"]
+        store.close()
+
+
+def test_load_truncated_file():
+    """损坏的配置文件读取为空配置，之后的写入恢复完整文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"press_coefficient": 1.')
+        store = ConfigStore(path)
+        assert store.load() == {}
+        store.update({"press_coefficient": 1.5})
+        store.close()
+        assert read(path) == {"press_coefficient": 1.5}
+        assert ConfigStore(path).load() == {"press_coefficient": 1.5}
+
+
+def test_close_flushes_pending():
+    """关闭时立即写入尚在防抖等待中的修改"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        store = ConfigStore(path, delay=10.0, clock=FakeClock())
+        store.load()
+        store.update({"capture_backend": "xshm"})
+        # 时钟不走，防抖永远不会到期：close 必须不等防抖直接写入
+        closer = threading.Thread(target=store.close)
+        closer.start()
+        closer.join(5)
+        assert not closer.is_alive()
+        assert read(path) == {"capture_backend": "xshm"} and store.writes == 1
+        store.update({"capture_backend": "pyautogui"})
+        assert store.writes == 1
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("配置存储测试")
+    print("=" * 70)
+    test_slider_drag_writes_once()
+    test_atomic_replace_leaves_no_temp()
+    test_load_truncated_file()
+    test_close_flushes_pending()
+    print("\n[OK] 所有测试通过")
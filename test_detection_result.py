@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+DetectionResult 测试 - 状态区分、置信度、检测器、分阶段耗时与截止时间
+"""
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from algorithm import DetectionResult, GameConfig, JumpAlgorithm
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def test_result_unpacks_like_tuple():
+    """检测结果可以像原来的 5 元组一样解包，find_piece_and_board 仍返回元组"""
+    img = make_frame(360, 640, 100, 380, 260, 240)
+    algorithm = JumpAlgorithm(GameConfig())
+    result = algorithm.detect(img)
+    print(f"  {result}")
+    piece_x, piece_y, board_x, board_y, delta_y = result
+    assert (piece_x, piece_y, board_x, board_y, delta_y) == result.as_tuple()
+    assert JumpAlgorithm(GameConfig()).find_piece_and_board(img) == result.as_tuple()
+    assert result.found and result.status == "ok"
+    assert not hasattr(result, "__dict__")
+
+
+def test_status_and_detector():
+    """区分无图、无棋子、无平台；detector 记录棋子来源和平台检测器"""
+    algorithm = JumpAlgorithm(GameConfig())
+    assert algorithm.detect(None).status == "no_image"
+
+    blank = Image.new("RGB", (360, 640), (200, 200, 210))
+    assert algorithm.detect(blank).status == "no_piece"
+
+    # 只有棋子和脚下平台，没有下一个平台
+    arr = np.array(make_frame(360, 640, 180, 380, 260, 240))
+    arr[240:330, 200:320] = arr[240:330, 0:1]
+    result = JumpAlgorithm(GameConfig()).detect(Image.fromarray(arr))
+    print(f"  无平台: {result}")
+    assert result.status == "no_board"
+
+    result = JumpAlgorithm(GameConfig()).detect(make_frame(360, 640, 100, 380, 260, 240))
+    assert result.detector == "scan+component"
+    config = GameConfig()
+    config.board_detector = "edge"
+    assert JumpAlgorithm(config).detect(make_frame(360, 640, 100, 380, 260, 240)).detector == "scan+edge"
+    config = GameConfig()
+    config.detect_engine = "loop"
+    assert JumpAlgorithm(config).detect(make_frame(360, 640, 100, 380, 260, 240)).detector == "loop"
+
+
+def test_confidence_and_timings():
+    """干净画面置信度高，各阶段耗时之和不超过总耗时"""
+    result = JumpAlgorithm(GameConfig()).detect(make_frame(1000, 1080, 300, 640, 720, 420))
+    print(f"  {result}")
+    assert 0.5 < result.confidence <= 1.0
+    for stage in ("background", "piece", "board", "total"):
+        assert stage in result.timings
+    stages = sum(v for k, v in result.timings.items() if k != "total")
+    assert stages <= result.elapsed_ms + 0.5
+
+
+def test_deadline_timeout():
+    """已过截止时间返回 timeout，且不会留下跟踪位置"""
+    algorithm = JumpAlgorithm(GameConfig())
+    result = algorithm.detect(make_frame(1000, 1080, 300, 640, 720, 420), time.perf_counter() - 1)
+    print(f"  {result}")
+    assert result.status == "timeout"
+    assert result.as_tuple() == (0, 0, 0, 0, 0)
+    assert algorithm.last_piece_x == 0
+
+
+def test_empty_result():
+    result = DetectionResult()
+    assert not result.found
+    assert tuple(result) == (0, 0, 0, 0, 0)
+    assert result.elapsed_ms == 0.0
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("DetectionResult 测试")
+    print("=" * 70)
+    test_result_unpacks_like_tuple()
+    test_status_and_detector()
+    test_confidence_and_timings()
+    test_deadline_timeout()
+    test_empty_result()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+飞行记录测试 - 内存上限、帧复制与数组复用、按跳跃选取导出范围、后台压缩写盘不阻塞记录
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+from algorithm import GameConfig, JumpAlgorithm
+from flight_recorder import FlightRecorder
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def read_index(path):
+    with open(os.path.join(path, "index.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_memory_cap_and_copy():
+    """帧被复制（截图缓冲复用不影响记录），总字节数超过上限时丢弃最旧的帧"""
+    buffer = np.zeros((10, 10, 3), dtype=np.uint8)
+    recorder = FlightRecorder(max_bytes=buffer.nbytes * 5)
+    for i in range(12):
+        buffer[...] = i
+        recorder.record(buffer)
+    assert len(recorder.entries) == 5 and recorder.bytes == buffer.nbytes * 5
+    assert [int(frame[0, 0, 0]) for _, frame in recorder.entries] == [7, 8, 9, 10, 11]
+    assert recorder.stats["evicted"] == 7
+
+
+def test_ring_reuses_evicted_frames():
+    """缓冲写满后复用被挤出的帧数组，不再分配新数组"""
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    recorder = FlightRecorder(max_bytes=frame.nbytes * 5)
+    for _ in range(6):
+        recorder.record(frame)
+    arrays = {id(f) for _, f in recorder.entries} | {id(f) for f in recorder.spare}
+    for i in range(20):
+        frame[...] = i
+        recorder.record(frame)
+        assert {id(f) for _, f in recorder.entries} <= arrays
+    assert recorder.stats["reused"] == 20
+    assert [int(f[0, 0, 0]) for _, f in recorder.entries] == [15, 16, 17, 18, 19]
+    # 尺寸变化时重新分配
+    recorder.record(np.zeros((4, 4, 3), dtype=np.uint8))
+    assert recorder.stats["reused"] == 20
+
+
+def test_dump_last_jumps():
+    """导出从最近第 N 跳的帧开始，包括之后未跳跃的帧（如结算画面）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = FlightRecorder(out_dir=tmp)
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        for i in range(10):
+            entry = recorder.record(frame, {"status": "ok" if i < 8 else "no_piece"})
+            if i < 8 and i % 2 == 0:
+                assert recorder.mark_jump(entry, 300 + i, distance=100.0)
+        path = recorder.dump("game_over", jumps=2)
+        recorder.flush()
+        index = read_index(path)
+        assert [e["id"] for e in index] == [4, 5, 6, 7, 8, 9]
+        assert [e["press_ms"] for e in index if e["press_ms"]] == [304, 306]
+        assert index[0]["distance"] == 100.0 and index[-1]["detection"]["status"] == "no_piece"
+        assert path.endswith("_game_over")
+
+        # 第二次导出不覆盖第一次
+        path2 = recorder.dump("game_over", jumps=100)
+        recorder.close()
+        assert path2 != path and len(read_index(path2)) == 10
+
+
+def test_frames_round_trip():
+    """导出的 PNG 与记录的帧逐像素一致，检测结果可以写成 JSON"""
+    img = make_frame(360, 640, 100, 380, 260, 240)
+    arr = np.array(img)
+    result = JumpAlgorithm(GameConfig()).detect(arr)
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = FlightRecorder(out_dir=tmp)
+        entry = recorder.record(arr, result.as_dict())
+        recorder.mark_jump(entry, 512)
+        path = recorder.dump()
+        recorder.close()
+        meta = read_index(path)[0]
+        assert meta["detection"]["status"] == result.status
+        assert meta["detection"]["piece"] == [float(result.piece_x), float(result.piece_y)]
+        saved = np.array(Image.open(os.path.join(path, meta["file"])))
+        assert np.array_equal(saved, arr)
+
+
+class BlockedRecorder(FlightRecorder):
+    """写盘卡住直到 release 被置位，用来确认 dump / record 不等待写盘"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _write(self, path, reason, entries):
+        self.started.set()
+        self.release.wait(5)
+        super()._write(path, reason, entries)
+
+
+def test_record_not_blocked_by_writer():
+    """后台线程写盘卡住时，dump 只排队即返回，记录新帧也不需要等待"""
+    frame = np.zeros((54, 60, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = BlockedRecorder(out_dir=tmp)
+        for _ in range(20):
+            recorder.record(frame)
+        recorder.dump()
+        assert recorder.started.wait(5)
+        for _ in range(10):
+            recorder.record(frame)
+        # 写盘线程仍卡着，主线程的 dump 和 record 都已完成
+        assert not recorder.release.is_set() and recorder.stats["frames_written"] == 0
+        assert recorder.stats["recorded"] == 30
+        recorder.release.set()
+        recorder.close()
+        print(f"  写出 {recorder.stats['frames_written']} 帧")
+        assert recorder.stats["frames_written"] == 20
+
+
+def test_exporting_frames_not_reused():
+    """排队导出中的帧被挤出后不复用，导出内容不会被新帧覆盖"""
+    frame = np.zeros((6, 6, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = BlockedRecorder(out_dir=tmp, max_bytes=frame.nbytes * 3)
+        for i in range(3):
+            frame[...] = i
+            recorder.record(frame)
+        path = recorder.dump()
+        assert recorder.started.wait(5)
+        for i in range(3, 9):
+            frame[...] = i
+            recorder.record(frame)
+        # 0~2 正在导出，挤出后不复用；之后挤出的 3、4 被最后两帧复用
+        assert recorder.stats["reused"] == 2
+        recorder.release.set()
+        recorder.close()
+        saved = [np.array(Image.open(os.path.join(path, e["file"])))[0, 0, 0] for e in read_index(path)]
+        assert saved == [0, 1, 2] and recorder.exporting == {}
+
+
+def test_empty_dump():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert FlightRecorder(out_dir=tmp).dump() is None
+        assert os.listdir(tmp) == []
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("飞行记录测试")
+    print("=" * 70)
+    test_memory_cap_and_copy()
+    test_ring_reuses_evicted_frames()
+    test_dump_last_jumps()
+    test_frames_round_trip()
+    test_record_not_blocked_by_writer()
+    test_exporting_frames_not_reused()
+    test_empty_dump()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+NumPy 向量化引擎与逐像素循环版的一致性测试
+"""
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from algorithm import GameConfig, JumpAlgorithm
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def make_frame(w, h, piece_x, piece_bottom, board_cx, board_top, base=5):
+    """构造简化的游戏画面：竖直渐变背景 + 两个平台 + 棋子"""
+    arr = np.zeros((h, w, 3), dtype=np.uint8)
+    ys = np.arange(h)
+    arr[..., 0] = (220 - ys * 60 // h)[:, None]
+    arr[..., 1] = (225 - ys * 50 // h)[:, None]
+    arr[..., 2] = (235 - ys * 30 // h)[:, None]
+
+    # 目标平台（上表面 + 侧面阴影）
+    arr[board_top:board_top + 40, board_cx - 60:board_cx + 60] = (245, 245, 245)
+    arr[board_top + 40:board_top + 90, board_cx - 60:board_cx + 60] = (190, 190, 190)
+
+    # 棋子所在平台
+    arr[piece_bottom - 10:piece_bottom + 60, piece_x - 50:piece_x + 50] = (120, 160, 200)
+
+    # 棋子：身体 + 最低行底座颜色
+    arr[piece_bottom - 90:piece_bottom - base + 1, piece_x - 15:piece_x + 16] = (70, 60, 120)
+    arr[piece_bottom - base + 1:piece_bottom + 1, piece_x - 18:piece_x + 19] = (55, 58, 100)
+    return Image.fromarray(arr)
+
+
+def detect_both(img):
+    loop_config = GameConfig()
+    loop_config.detect_engine = "loop"
+    np_config = GameConfig()
+    np_config.detect_engine = "numpy"
+    np_config.pyramid = False
+    np_config.board_detector = "edge"
+    np_config.background_model = False
+    np_config.piece_search = "topdown"
+    loop_result = JumpAlgorithm(loop_config).find_piece_and_board(img)
+    np_result = JumpAlgorithm(np_config).find_piece_and_board(img)
+    return loop_result, np_result
+
+
+def test_parity_layouts():
+    """不同布局下两种引擎输出完全相同"""
+    layouts = [
+        (360, 640, 100, 380, 260, 240),
+        (360, 640, 260, 390, 90, 250),
+        (400, 600, 120, 360, 300, 230),
+        (300, 540, 200, 330, 70, 200),
+    ]
+    for layout in layouts:
+        loop_result, np_result = detect_both(make_frame(*layout))
+        print(f"  {layout}: loop={loop_result} numpy={np_result}")
+        assert loop_result == np_result
+        assert loop_result[0] != 0
+
+
+def test_parity_noise_and_blank():
+    """噪声帧、纯色帧（无棋子）下两种引擎同样一致"""
+    rng = np.random.default_rng(7)
+    frames = [Image.fromarray(rng.integers(0, 256, (480, 270, 3), dtype=np.uint8))]
+    frames.append(Image.new("RGB", (270, 480), (200, 200, 210)))
+    for img in frames:
+        loop_result, np_result = detect_both(img)
+        print(f"  loop={loop_result} numpy={np_result}")
+        assert loop_result == np_result
+
+
+def test_rgba_input():
+    """RGBA 截图与 RGB 截图结果相同"""
+    img = make_frame(360, 640, 100, 380, 260, 240)
+    _, rgb_result = detect_both(img)
+    _, rgba_result = detect_both(img.convert("RGBA"))
+    assert rgb_result == rgba_result
+
+
+def test_early_exit_below_piece():
+    """棋子下方隔开一个头部直径以上的同色干扰不会被当作棋子底部（只有向量化引擎提前结束，循环版保持原样）"""
+    img = make_frame(360, 640, 100, 330, 260, 240)
+    arr = np.array(img)
+    arr[415:418, 240:250] = (55, 58, 100)
+    loop_result, np_result = detect_both(Image.fromarray(arr))
+    clean_result, _ = detect_both(img)
+    print(f"  loop={loop_result} numpy={np_result}")
+    assert np_result == clean_result
+    # wangshub 原版取所有命中点的最低行，干扰被当作棋子底部
+    assert loop_result[1] == 417 - GameConfig().piece_base_height_1_2
+
+
+def benchmark():
+    img = make_frame(1000, 1080, 300, 640, 720, 420)
+    for engine in ("loop", "numpy"):
+        config = GameConfig()
+        config.detect_engine = engine
+        algorithm = JumpAlgorithm(config)
+        start = time.perf_counter()
+        result = algorithm.find_piece_and_board(img)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  {engine:6s}: {elapsed:8.1f}ms -> {result}")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("NumPy 引擎一致性测试")
+    print("=" * 70)
+    test_parity_layouts()
+    test_parity_noise_and_blank()
+    test_rgba_input()
+    test_early_exit_below_piece()
+    print("\n--- 1000x1080 耗时对比 ---")
+    benchmark()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+流水线测试 - 序号与轮次、过期帧丢弃、截图等上一帧用完、收尾工作不阻塞按压
+"""
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from pipeline import Frame, JumpPipeline, RETRY_NOW, put_latest
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+class FakeGame:
+    """截图返回同一块缓冲（每次覆盖），内容为截图序号；每三帧有一帧检测失败"""
+
+    def __init__(self, jumps):
+        self.buffer = np.zeros((4, 4, 3), dtype=np.uint8)
+        self.count = 0
+        self.jumps = jumps
+        self.actuated = []
+        self.analyzed = []
+        self.stop = threading.Event()
+
+    def capture(self):
+        self.count += 1
+        self.buffer[...] = self.count
+        return self.buffer
+
+    def analyze(self, image):
+        value = int(image[0, 0, 0])
+        self.analyzed.append(value)
+        if value % 3 == 1:
+            return None
+        if value % 3 == 2 and len(self.analyzed) < 3:
+            return RETRY_NOW
+        return value
+
+    def actuate(self, payload):
+        self.actuated.append(payload)
+        if len(self.actuated) >= self.jumps:
+            self.stop.set()
+
+
+def test_pipeline_runs_jumps():
+    """未检测到目标时重试截图，决策按截图顺序执行，每帧内容与截图时一致"""
+    game = FakeGame(jumps=3)
+    events = []
+    pipeline = JumpPipeline(game.capture, game.analyze, game.actuate,
+                            report=lambda kind, seq, payload: events.append((kind, seq)),
+                            stop_event=game.stop, retry_delay=0.01)
+    pipeline.run()
+    print(f"  统计 {pipeline.stats}，按压 {game.actuated}")
+    assert pipeline.stats["jumps"] == 3
+    assert game.actuated == sorted(game.actuated)
+    # 分析看到的是截图时的内容，而不是之后被覆盖的缓冲
+    assert game.analyzed == list(range(1, len(game.analyzed) + 1))
+    seqs = [seq for kind, seq in events if kind == "decision"]
+    assert seqs == sorted(seqs)
+    assert ("miss", 1) in events
+
+
+def test_stale_frames_dropped():
+    """按压之后，之前截的帧和决策都被丢弃"""
+    analyzed = []
+    stop = threading.Event()
+    pipeline = JumpPipeline(lambda: None, lambda image: analyzed.append(image) or 1,
+                            lambda payload: None, stop_event=stop)
+    pipeline.epoch = 1
+    pipeline.frames.put(Frame(1, 0, np.zeros((2, 2, 3), dtype=np.uint8), 0.0))
+    thread = threading.Thread(target=pipeline._analyze_loop)
+    thread.start()
+    time.sleep(0.15)
+    stop.set()
+    thread.join()
+    assert analyzed == []
+    assert pipeline.stats["dropped_frames"] == 1
+
+
+def test_actuator_not_blocked_by_bookkeeping():
+    """分析线程的日志/界面回调还没返回，按压线程就已经拿到决策并按压"""
+    game = FakeGame(jumps=2)
+    actuated = threading.Event()
+    checked = []
+
+    def actuate(payload):
+        actuated.set()
+        game.actuate(payload)
+
+    def slow_report(kind, seq, payload):
+        if kind == "decision":
+            # 回调阻塞在这里等按压；按压若要等回调返回，这里会超时
+            assert actuated.wait(5)
+            actuated.clear()
+            checked.append(seq)
+
+    pipeline = JumpPipeline(game.capture, lambda image: int(image[0, 0, 0]), actuate,
+                            report=slow_report, stop_event=game.stop)
+    pipeline.run()
+    assert checked == [1, 2] and game.actuated == [1, 2]
+
+
+def test_capture_waits_for_frame():
+    """截图缓冲不复制直接交给分析：分析线程的收尾回调返回之前不会截下一帧覆盖缓冲"""
+    game = FakeGame(jumps=1)
+    grabbed = threading.Event()
+    checked = []
+
+    def capture():
+        grabbed.set()
+        return game.capture()
+
+    def report(kind, seq, payload):
+        if kind in ("miss", "decision"):
+            # 重试截图已请求 / 按压线程已按压并请求截图，截图线程若不等待会在这段时间覆盖缓冲
+            grabbed.clear()
+            assert not grabbed.wait(0.2)
+            assert int(game.buffer[0, 0, 0]) == seq
+            checked.append(kind)
+
+    pipeline = JumpPipeline(capture, game.analyze, game.actuate, report=report,
+                            stop_event=game.stop, retry_delay=0.0)
+    pipeline.run()
+    assert checked == ["miss", "miss", "decision"]
+
+
+def test_put_latest():
+    q = queue.Queue(maxsize=1)
+    assert put_latest(q, 1) == 0
+    assert put_latest(q, 2) == 1
+    assert q.get_nowait() == 2
+
+
+def test_error_propagates():
+    """任一阶段抛出异常时流水线停止并把异常抛给调用方"""
+    def analyze(image):
+        raise ValueError("坏帧")
+
+    pipeline = JumpPipeline(lambda: np.zeros((2, 2, 3), dtype=np.uint8), analyze, lambda p: None)
+    try:
+        pipeline.run()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("异常应传给 run() 的调用方")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("流水线测试")
+    print("=" * 70)
+    test_pipeline_runs_jumps()
+    test_stale_frames_dropped()
+    test_actuator_not_blocked_by_bookkeeping()
+    test_capture_waits_for_frame()
+    test_put_latest()
+    test_error_propagates()
+    print("\n[OK] 所有测试通过")
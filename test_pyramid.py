@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+金字塔检测测试 - 2K/4K 区域下与原图路径的误差和耗时
+"""
+import sys
+import time
+
+from PIL import Image
+
+from algorithm import GameConfig, JumpAlgorithm
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+LAYOUTS = [
+    (2560, 1440, 800, 900, 1900, 560, 16),
+    (2560, 1440, 1700, 880, 600, 520, 16),
+    (3840, 2160, 1200, 1350, 2900, 820, 24),
+    (3840, 2160, 2600, 1300, 900, 780, 24),
+]
+
+
+def detect(img, pyramid):
+    config = GameConfig()
+    config.track_roi = False
+    config.pyramid = pyramid
+    algorithm = JumpAlgorithm(config)
+    start = time.perf_counter()
+    result = algorithm.find_piece_and_board(img)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def test_pyramid_matches_full_resolution():
+    """粗到精结果与原图逐行扫描误差不超过 2px"""
+    for layout in LAYOUTS:
+        img = make_frame(*layout)
+        full, full_ms = detect(img, pyramid=False)
+        coarse, coarse_ms = detect(img, pyramid=True)
+        print(f"  {layout[0]}x{layout[1]}: 原图={full} {full_ms:.1f}ms | 金字塔={coarse} {coarse_ms:.1f}ms")
+        assert full[0] and coarse[0]
+        for a, b in zip(full[:4], coarse[:4]):
+            assert abs(a - b) <= 2
+
+
+def test_pyramid_falls_back_on_blank_frame():
+    """粗定位找不到棋子时回退原图扫描，同样返回全零"""
+    result, _ = detect(Image.new("RGB", (2560, 1440), (200, 200, 210)), pyramid=True)
+    assert result == (0, 0, 0, 0, 0)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("金字塔检测测试")
+    print("=" * 70)
+    test_pyramid_matches_full_resolution()
+    test_pyramid_falls_back_on_blank_frame()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+离线回放测试 - 图片目录与会话归档输入、多进程与单进程结果一致、JSONL 输出、与参考结果对比
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from algorithm import GameConfig, JumpAlgorithm
+from replay import main, parse_overrides, run_replay
+from session_archive import ArchiveWriter
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+LAYOUTS = [(100, 380, 260, 240), (250, 400, 120, 250), (90, 390, 240, 230), (270, 385, 110, 245)]
+
+
+def make_corpus(tmp):
+    """四张 PNG 截图、一张空白图，以及包含同样帧的会话归档"""
+    frames_dir = os.path.join(tmp, "frames")
+    os.makedirs(frames_dir)
+    frames = [make_frame(360, 640, *layout) for layout in LAYOUTS]
+    for i, img in enumerate(frames):
+        img.save(os.path.join(frames_dir, f"{i:03d}.png"))
+    blank = np.full((640, 360, 3), 200, dtype=np.uint8)
+    Image.fromarray(blank).save(os.path.join(frames_dir, "999_blank.png"))
+    archive = os.path.join(tmp, "session")
+    with ArchiveWriter(archive) as writer:
+        for img in frames:
+            writer.append(np.array(img))
+    return frames_dir, archive, frames
+
+
+def strip(record):
+    """去掉与运行环境相关的耗时字段"""
+    return {k: v for k, v in record.items() if k not in ("latency_ms", "timings", "delta")}
+
+
+def test_replay_matches_algorithm():
+    """回放结果与直接调用 JumpAlgorithm 相同；图片目录与归档输入一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_dir, archive, frames = make_corpus(tmp)
+        out = io.StringIO()
+        summary = run_replay([frames_dir, archive], out, workers=1)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert summary["frames"] == 9 and summary["found"] == 8 and summary["errors"] == 0
+        assert records[4]["status"] != "ok" and records[4]["press_ms"] is None
+
+        algorithm = JumpAlgorithm(GameConfig())
+        for img, record in zip(frames, records[:4]):
+            algorithm.reset_tracking()
+            result = algorithm.detect(np.array(img))
+            assert record["piece"] == [float(result.piece_x), float(result.piece_y)]
+            distance = algorithm.calculate_distance(*result.as_tuple()[:4])
+            assert record["press_ms"] == algorithm.calculate_jump_time(distance, result.delta_piece_y)
+        for i, (png, arc) in enumerate(zip(records[:4], records[5:])):
+            assert arc["frame"] == f"{archive}#{i}"
+            assert strip(png) | {"frame": ""} == strip(arc) | {"frame": ""}
+
+
+def test_process_pool_same_results():
+    """多进程回放按输入顺序输出，结果与单进程相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_dir, archive, _ = make_corpus(tmp)
+        single, pooled = io.StringIO(), io.StringIO()
+        run_replay([frames_dir, archive], single, workers=1)
+        run_replay([frames_dir, archive], pooled, workers=2, chunksize=1)
+        a = [strip(json.loads(line)) for line in single.getvalue().splitlines()]
+        b = [strip(json.loads(line)) for line in pooled.getvalue().splitlines()]
+        assert a == b
+
+
+def test_reference_deltas_and_cli():
+    """命令行：输出 JSONL 文件；与参考结果对比，检出变少时退出码非 0"""
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_dir, archive, _ = make_corpus(tmp)
+        ref = os.path.join(tmp, "ref.jsonl")
+        new = os.path.join(tmp, "new.jsonl")
+        assert main([frames_dir, "-o", ref, "--workers", "1"]) == 0
+        assert main([frames_dir, "-o", new, "--workers", "1", "--reference", ref,
+                     "--set", "board_detector=edge"]) == 0
+        with open(new, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert all("delta" in r for r in records)
+        ok = [r for r in records if r["status"] == "ok"]
+        assert all(r["delta"]["status"] is None and "board_px" in r["delta"] for r in ok)
+
+        # 参考结果里检出、这次未检出的帧算作变差
+        with open(ref, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        lines[-1]["status"] = "ok"
+        lines[-1].update(piece=[0, 0], board=[0, 0], press_ms=0)
+        with open(ref, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in lines)
+        summary = run_replay([frames_dir], io.StringIO(), ref, workers=1)
+        assert summary["regressions"] == 1
+        assert main([frames_dir, "-o", new, "--workers", "1", "--reference", ref]) == 1
+
+
+def test_error_counts_as_regression():
+    """参考结果里检出、这次读取出错的帧也算作变差"""
+    with tempfile.TemporaryDirectory() as tmp:
+        frames_dir, _, _ = make_corpus(tmp)
+        ref = os.path.join(tmp, "ref.jsonl")
+        assert main([frames_dir, "-o", ref, "--workers", "1"]) == 0
+        with open(os.path.join(frames_dir, "000.png"), "wb") as f:
+            f.write(b"not a png")
+        out = io.StringIO()
+        summary = run_replay([frames_dir], out, ref, workers=1)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert records[0]["status"] == "error" and records[0]["delta"]["status"] == "ok->error"
+        assert summary["errors"] == 1 and summary["regressions"] == 1
+        assert main([frames_dir, "--workers", "1", "--reference", ref]) == 1
+
+
+def test_parse_overrides():
+    overrides = parse_overrides(["pyramid=false", "head_diameter=120", "press_coefficient=1.8",
+                                 "board_detector=edge", "game_area=[0,0,360,640]"])
+    assert overrides == {"pyramid": False, "head_diameter": 120, "press_coefficient": 1.8,
+                         "board_detector": "edge", "game_area": [0, 0, 360, 640]}
+    try:
+        parse_overrides(["no_such_field=1"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未知字段应报 ValueError")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("离线回放测试")
+    print("=" * 70)
+    test_replay_matches_algorithm()
+    test_process_pool_same_results()
+    test_reference_deltas_and_cli()
+    test_error_counts_as_regression()
+    test_parse_overrides()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+会话归档测试 - 读写往返、零复制读取、续写、崩溃后的不完整尾部、导入飞行记录、遍历速度
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from algorithm import GameConfig, JumpAlgorithm
+from flight_recorder import FlightRecorder
+from session_archive import ArchiveReader, ArchiveWriter, INDEX_DTYPE, import_recording
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def test_round_trip_zero_copy():
+    """帧与检测结果原样读回，帧是内存映射上的只读视图"""
+    arr = np.array(make_frame(360, 640, 100, 380, 260, 240))
+    result = JumpAlgorithm(GameConfig()).detect(arr)
+    gray = np.arange(12 * 7, dtype=np.uint8).reshape(12, 7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session")
+        with ArchiveWriter(path) as writer:
+            assert writer.append(arr, 1.5, result) == 0
+            assert writer.append(gray, 2.0, press_ms=480.0) == 1
+            writer.set_press(0, 512.0)
+            assert writer.append(arr[::2, ::2], 2.5) == 2
+
+        with ArchiveReader(path) as reader:
+            assert len(reader) == 3
+            frame = reader.frame(0)
+            assert np.array_equal(frame, arr) and np.shares_memory(frame, reader.data)
+            assert not frame.flags.writeable
+            assert np.array_equal(reader.frame(1), gray)
+            assert np.array_equal(reader.frame(2), arr[::2, ::2])
+            detection = reader.detection(0)
+            assert detection["status"] == result.status
+            assert detection["piece"] == [float(result.piece_x), float(result.piece_y)]
+            assert list(reader.records["press_ms"][:2]) == [512.0, 480.0]
+            assert math.isnan(reader.records["press_ms"][2])
+            assert list(reader.records["time"]) == [1.5, 2.0, 2.5]
+            assert reader.detection(1)["status"] == ""
+
+
+def test_append_and_torn_tail():
+    """已有归档续写；崩溃留下的半条索引和不完整的像素在读取时忽略，续写时截掉"""
+    frame = np.full((10, 20, 3), 7, dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session")
+        with ArchiveWriter(path) as writer:
+            writer.append(frame)
+        with ArchiveWriter(path) as writer:
+            assert writer.append(frame + 1) == 1
+            writer.append(frame + 2)
+
+        # 模拟崩溃：最后一帧的像素只写了一半，索引末尾还有半条记录
+        with open(path + ".frames", "r+b") as f:
+            f.truncate(frame.nbytes * 2 + 100)
+        with open(path + ".index", "ab") as f:
+            f.write(b"\1" * (INDEX_DTYPE.itemsize // 2))
+        with ArchiveReader(path) as reader:
+            assert len(reader) == 2
+            assert int(reader.frame(1)[0, 0, 0]) == 8
+
+        with ArchiveWriter(path) as writer:
+            assert writer.append(frame + 3) == 2
+        with ArchiveReader(path) as reader:
+            assert [int(f[0, 0, 0]) for _, f in reader] == [7, 8, 10]
+            assert os.path.getsize(path + ".frames") == frame.nbytes * 3
+
+
+def test_import_flight_recording():
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = FlightRecorder(out_dir=tmp)
+        arr = np.array(make_frame(90, 160, 30, 100, 60, 60))
+        for i in range(3):
+            entry = recorder.record(arr, {"status": "ok", "piece": [1, 2], "board": [3, 4]})
+            recorder.mark_jump(entry, 300 + i)
+        dump_dir = recorder.dump()
+        recorder.close()
+        path = os.path.join(tmp, "archive", "session")
+        assert import_recording(dump_dir, path) == 3
+        with ArchiveReader(path) as reader:
+            assert len(reader) == 3 and np.array_equal(reader.frame(2), arr)
+            assert list(reader.records["press_ms"]) == [300, 301, 302]
+            assert reader.detection(1)["board"] == [3.0, 4.0]
+
+
+def test_iteration_zero_copy():
+    """遍历归档不解码、不复制：每帧都是内存映射上的只读视图"""
+    frame = np.zeros((96, 54, 3), dtype=np.uint8)
+    n = 3000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session")
+        with ArchiveWriter(path) as writer:
+            for i in range(n):
+                frame[0, 0, 0] = i % 256
+                writer.append(frame, float(i))
+        start = time.perf_counter()
+        checksum = 0
+        with ArchiveReader(path) as reader:
+            for number, f in reader:
+                assert np.shares_memory(f, reader.data) and not f.flags.writeable
+                checksum += int(f[0, 0, 0])
+            assert number == n - 1
+        elapsed = time.perf_counter() - start
+    print(f"  遍历 {n} 帧用时 {elapsed * 1000:.0f}ms，约 {n / elapsed * 60:,.0f} 帧/分钟")
+    assert checksum == sum(i % 256 for i in range(n))
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("会话归档测试")
+    print("=" * 70)
+    test_round_trip_zero_copy()
+    test_append_and_torn_tail()
+    test_import_flight_recording()
+    test_iteration_zero_copy()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+落地稳定检测测试 - 用合成帧序列和虚拟时钟模拟起跳、落地、镜头移动
+"""
+import sys
+import threading
+
+import numpy as np
+
+from settle import SettleDetector
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+class FakeScreen:
+    """按顺序返回帧，最后一帧重复；虚拟时钟在每次 sleep 时前进"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+        self.now = 0.0
+
+    def grab(self):
+        frame = self.frames[min(self.index, len(self.frames) - 1)]
+        self.index += 1
+        return frame
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def detector_for(screen, **kwargs):
+    return SettleDetector(screen.grab, clock=screen.clock, sleep=screen.sleep, **kwargs)
+
+
+def jump_sequence():
+    """起跳前静止 2 帧，棋子飞行 6 帧，镜头平移 4 帧，之后静止"""
+    w, h = 360, 640
+    still = np.array(make_frame(w, h, 100, 380, 260, 240))
+    frames = [still, still]
+    for k in range(1, 7):
+        frames.append(np.array(make_frame(w, h, 100 + k * 25, 380 - k * 5, 260, 240)))
+    landed = frames[-1]
+    for k in range(1, 5):
+        frames.append(np.roll(landed, (k * 8, -k * 14), axis=(0, 1)))
+    frames.append(frames[-1])
+    return frames
+
+
+def test_settles_after_landing():
+    """画面先变化、再连续静止 stable_samples 帧即判定稳定，远早于固定的 2 秒"""
+    frames = jump_sequence()
+    screen = FakeScreen(frames)
+    detector = detector_for(screen, stable_samples=4, interval=0.03)
+    status, elapsed = detector.wait()
+    print(f"  {status} {elapsed:.0f}ms，能量 {[round(e, 1) for e in detector.energies]}")
+    assert status == "settled"
+    # 运动帧全部看过，之后恰好再取 stable_samples 帧
+    assert screen.index == len(frames) + 3
+    assert elapsed < 1000
+
+
+def test_no_motion_and_timeout():
+    """画面一直不变返回 still；一直在变返回 timeout"""
+    still = np.array(make_frame(360, 640, 100, 380, 260, 240))
+    screen = FakeScreen([still])
+    status, elapsed = detector_for(screen, motion_timeout=0.3).wait()
+    assert status == "still" and 300 <= elapsed < 400
+
+    rng = np.random.default_rng(1)
+    noise = [rng.integers(0, 256, (64, 64, 3), dtype=np.uint8) for _ in range(200)]
+    screen = FakeScreen(noise)
+    status, elapsed = detector_for(screen, factor=1, timeout=1.0).wait()
+    assert status == "timeout" and 1000 <= elapsed < 1100
+
+
+def test_stop_and_error():
+    """stop_event 置位立即返回；截图失败返回 error 交给调用方兜底"""
+    stop = threading.Event()
+    stop.set()
+    screen = FakeScreen([np.zeros((8, 8, 3), dtype=np.uint8)])
+    assert detector_for(screen).wait(stop)[0] == "stopped"
+
+    detector = SettleDetector(lambda: None)
+    assert detector.wait()[0] == "error"
+
+
+def test_buffer_reuse_safe():
+    """截图函数反复返回同一块缓冲（被下一帧覆盖）时仍能正确比较前后两帧"""
+    frames = jump_sequence()
+    buffer = np.zeros_like(frames[0])
+    screen = FakeScreen(frames)
+
+    def grab():
+        buffer[...] = screen.grab()
+        return buffer
+
+    detector = SettleDetector(grab, clock=screen.clock, sleep=screen.sleep)
+    assert detector.wait()[0] == "settled"
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("落地稳定检测测试")
+    print("=" * 70)
+    test_settles_after_landing()
+    test_no_motion_and_timeout()
+    test_stop_and_error()
+    test_buffer_reuse_safe()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+界面状态通道测试 - 合并唤醒、只应用变化字段、跨线程发布、发布到显示的延迟
+"""
+import queue
+import sys
+import threading
+
+from status import StatusChannel
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+class FakeUi:
+    """模拟界面线程：schedule 把回调放进事件队列，run 在当前线程依次执行"""
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.applied = []
+
+    def schedule(self, callback):
+        self.events.put(callback)
+
+    def apply(self, changes):
+        self.applied.append(dict(changes))
+
+    def run_pending(self):
+        while not self.events.empty():
+            self.events.get()()
+
+
+def test_coalesced_wakeups():
+    """两次刷新之间的多次发布只安排一次回调，字段取最新值"""
+    ui = FakeUi()
+    channel = StatusChannel(ui.schedule, ui.apply)
+    for i in range(100):
+        channel.publish(status="状态: 运行中...", count=f"跳跃次数: {i}")
+    assert ui.events.qsize() == 1
+    ui.run_pending()
+    assert ui.applied == [{"status": "状态: 运行中...", "count": "跳跃次数: 99"}]
+
+
+def test_only_changed_fields_applied():
+    """未变化的字段不重新设置，全部未变化时不调用 apply"""
+    ui = FakeUi()
+    channel = StatusChannel(ui.schedule, ui.apply)
+    channel.publish(status="a", count="1", detail="x")
+    ui.run_pending()
+    channel.publish(status="a", count="2", detail="x")
+    ui.run_pending()
+    channel.publish(status="a")
+    ui.run_pending()
+    assert ui.applied == [{"status": "a", "count": "1", "detail": "x"}, {"count": "2"}]
+    assert channel.flushes == 2
+
+
+def test_idle_schedules_nothing():
+    """没有发布时不安排任何回调（没有轮询）"""
+    ui = FakeUi()
+    StatusChannel(ui.schedule, ui.apply)
+    assert ui.events.empty()
+
+
+def test_cross_thread_publish():
+    """工作线程连续发布，界面线程最终显示最后一次的值，且刷新次数远少于发布次数"""
+    ui = FakeUi()
+    channel = StatusChannel(ui.schedule, ui.apply)
+    done = threading.Event()
+
+    def worker():
+        for i in range(2000):
+            channel.publish(count=f"跳跃次数: {i}", detail=f"{i % 7}")
+        done.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    while not done.is_set() or not ui.events.empty():
+        try:
+            ui.events.get(timeout=0.01)()
+        except queue.Empty:
+            pass
+    thread.join()
+    print(f"  发布 2000 次，刷新 {channel.flushes} 次")
+    assert channel.shown == {"count": "跳跃次数: 1999", "detail": str(1999 % 7)}
+    assert channel.flushes <= 2000
+
+
+def test_publish_schedules_immediately():
+    """发布返回时界面回调已经排入队列（不靠定时轮询），界面线程按发布顺序显示每个值"""
+    events = queue.Queue()
+    shown = []
+    channel = StatusChannel(events.put, lambda changes: shown.append(changes["count"]))
+    for i in range(20):
+        channel.publish(count=str(i))
+        callback = events.get_nowait()
+        assert events.empty()
+        callback()
+    assert shown == [str(i) for i in range(20)]
+    assert channel.flushes == 20
+
+
+def test_schedule_failure_ignored():
+    """窗口已销毁时发布不报错，之后恢复正常"""
+    calls = []
+
+    def schedule(callback):
+        calls.append(callback)
+        if len(calls) == 1:
+            raise RuntimeError("main thread is not in main loop")
+
+    channel = StatusChannel(schedule, lambda changes: None)
+    channel.publish(status="a")
+    channel.publish(status="b")
+    assert len(calls) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("界面状态通道测试")
+    print("=" * 70)
+    test_coalesced_wakeups()
+    test_only_changed_fields_applied()
+    test_idle_schedules_nothing()
+    test_cross_thread_publish()
+    test_publish_schedules_immediately()
+    test_schedule_failure_ignored()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+合成画面测试 - 同一种子可复现、跨分辨率几何一致、棋子颜色符合扫描规则、检测结果与真实坐标吻合
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from algorithm import GameConfig, JumpAlgorithm
+from synthetic import PIECE_BASE, SLOPE, benchmark, detection_error, render_frame, symmetry_center, write_corpus
+from vision import COLOR_RULES
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def test_deterministic():
+    a, truth_a = render_frame(360, 640, seed=5)
+    b, truth_b = render_frame(360, 640, seed=5)
+    c, _ = render_frame(360, 640, seed=6)
+    assert a.shape == (640, 360, 3) and a.dtype == np.uint8
+    assert np.array_equal(a, b) and truth_a == truth_b
+    assert not np.array_equal(a, c)
+
+
+def test_geometry_scales():
+    """同一局面在不同分辨率下按宽度等比缩放；棋子在跳跃线上，目标平台偏离跳跃线"""
+    small = render_frame(720, 1280, seed=3)[1]
+    large = render_frame(2160, 3840, seed=3)[1]
+    for key in ("piece_x", "piece_y", "board_x", "board_y", "board_top", "line_offset"):
+        assert abs(small[key] * 3 - large[key]) < 1e-6
+    for truth in (small, large):
+        cx, cy = symmetry_center(truth["width"], truth["height"])
+        slope = (truth["piece_y"] - cy) / (truth["piece_x"] - cx)
+        assert abs(abs(slope) - SLOPE) < 1e-9
+        assert abs(cy + slope * (truth["board_x"] - cx) + truth["line_offset"] - truth["board_y"]) < 1e-6
+        assert truth["board_top"] > truth["height"] / 3
+    offsets = [abs(render_frame(360, 640, seed)[1]["line_offset"]) for seed in range(10)]
+    assert max(offsets) > 5
+
+
+def test_piece_colors():
+    """棋子最低行是底座颜色，落在扫描的棋子颜色范围内"""
+    rule = COLOR_RULES["piece"]
+    assert all(lo < c < hi for c, (lo, hi) in zip(PIECE_BASE, (rule["r"], rule["g"], rule["b"])))
+    arr, truth = render_frame(1080, 1920, seed=1)
+    row = arr[truth["piece_bottom"]]
+    assert np.all(row[int(truth["piece_x"])] == PIECE_BASE)
+    assert not np.any(np.all(arr[truth["piece_bottom"] + 1] == PIECE_BASE, axis=1))
+
+
+def test_detection_accuracy():
+    """720p、1080p 上棋子和平台横坐标误差在 2% 屏宽以内；
+    component 实测纵坐标也在 2% 以内，edge 按投影推算的纵坐标误差随平台偏离跳跃线增大"""
+    for w, h in ((720, 1280), (1080, 1920)):
+        errors = {}
+        for detector in ("edge", "component"):
+            config = GameConfig()
+            config.board_detector = detector
+            algorithm = JumpAlgorithm(config)
+            errors[detector] = []
+            for seed in range(8):
+                arr, truth = render_frame(w, h, seed)
+                algorithm.reset_tracking()
+                result = algorithm.detect(arr)
+                assert result.found, (w, detector, seed, result.status)
+                error = detection_error(result, truth)
+                assert error["piece_dx"] <= 0.02 * w and error["board_dx"] <= 0.02 * w, (w, detector, seed, error)
+                if detector == "edge":
+                    assert abs(error["board_dy"] - abs(truth["line_offset"])) <= 0.005 * w
+                else:
+                    assert error["board_dy"] <= 0.02 * w, (w, seed, error)
+                errors[detector].append(error["board_dx"] + error["board_dy"])
+        print(f"  {w}x{h} 平均平台误差: " + ", ".join(f"{k} {np.mean(v):.1f}px" for k, v in errors.items()))
+        assert np.mean(errors["component"]) <= np.mean(errors["edge"])
+
+
+def test_benchmark_and_corpus():
+    rows = benchmark([(360, 640)], frames=3, configs={"component": {}, "edge": {"board_detector": "edge"}})
+    assert [r["config"] for r in rows] == ["component", "edge"]
+    assert all(r["found"] == 3 and r["p50_ms"] > 0 for r in rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        assert write_corpus(tmp, [(180, 320)], frames=2) == 2
+        assert sorted(os.listdir(tmp)) == ["180x320_0000.png", "180x320_0001.png", "truth.jsonl"]
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("合成画面测试")
+    print("=" * 70)
+    test_deterministic()
+    test_geometry_scales()
+    test_piece_colors()
+    test_detection_accuracy()
+    test_benchmark_and_corpus()
+    print("\n[OK] 所有测试通过")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+延迟统计测试 - 分位数、固定内存滚动窗口、span 计时、输出格式、记录开销固定
+"""
+import sys
+import threading
+
+from telemetry import LatencyRecorder, RollingHistogram
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def test_percentiles():
+    hist = RollingHistogram(size=1000)
+    assert hist.percentiles() == (0.0, 0.0, 0.0)
+    for v in range(1, 1001):
+        hist.add(float(v))
+    p50, p95, p99 = hist.percentiles()
+    assert (p50, p95, p99) == (501.0, 951.0, 991.0)
+
+
+def test_rolling_window_fixed_memory():
+    """只保留最近 size 个样本，旧样本被覆盖"""
+    hist = RollingHistogram(size=100)
+    for _ in range(500):
+        hist.add(1000.0)
+    for _ in range(100):
+        hist.add(5.0)
+    assert hist.percentiles() == (5.0, 5.0, 5.0)
+    assert len(hist.samples) == 100 and hist.count == 600
+
+
+def test_span_and_output():
+    """span 用单调时钟计时；紧凑行与表格按跳跃阶段顺序输出"""
+    now = [0]
+    recorder = LatencyRecorder(clock=lambda: now[0])
+    for ms in (10, 20, 30):
+        with recorder.span("settle"):
+            now[0] += ms * 1_000_000
+    recorder.record("capture", 8.0)
+    snapshot = recorder.snapshot()
+    assert list(snapshot) == ["capture", "settle"]
+    assert snapshot["settle"] == (3, 20.0, 30.0, 30.0)
+    assert recorder.compact() == "截图 8/8/8 | 落地 20/30/30"
+    assert recorder.compact(stages=("settle",)) == "落地 20/30/30"
+    table = recorder.dump()
+    print(table)
+    assert table.splitlines()[2].startswith("落地") and "20.0" in table
+
+    # 出错的代码块也会计时
+    try:
+        with recorder.span("press"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert recorder.snapshot()["press"][0] == 1
+    recorder.reset()
+    assert recorder.snapshot() == {}
+
+
+def test_concurrent_record():
+    recorder = LatencyRecorder(size=64)
+
+    def worker(stage):
+        for i in range(2000):
+            recorder.record(stage, float(i % 10))
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in ("capture", "detect", "capture")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    snapshot = recorder.snapshot()
+    assert snapshot["capture"][0] == 4000 and snapshot["detect"][0] == 2000
+
+
+def test_span_cost_fixed():
+    """每个 span 只读两次时钟、记一个样本，样本数再多内存也不增长（开销与运行时长无关）"""
+    calls = [0]
+
+    def clock():
+        calls[0] += 1
+        return calls[0] * 1000
+
+    recorder = LatencyRecorder(size=64, clock=clock)
+    n = 10000
+    for _ in range(n):
+        with recorder.span("capture"):
+            pass
+    hist = recorder.stages["capture"]
+    assert calls[0] == 2 * n
+    assert hist.count == n and len(hist.samples) == 64
+    assert recorder.compact() == "截图 0/0/0" and calls[0] == 2 * n
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("延迟统计测试")
+    print("=" * 70)
+    test_percentiles()
+    test_rolling_window_fixed_memory()
+    test_span_and_output()
+    test_concurrent_record()
+    test_span_cost_fixed()
+    print("\n[OK] 所有测试通过")
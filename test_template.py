@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+棋子模板匹配测试
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from algorithm import GameConfig, JumpAlgorithm
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def save_template(piece_x=300, piece_bottom=640):
+    """从合成画面中截出棋子作为模板"""
+    img = make_frame(1000, 1080, piece_x, piece_bottom, 720, 420)
+    crop = img.crop((piece_x - 30, piece_bottom - 100, piece_x + 31, piece_bottom + 8))
+    path = os.path.join(tempfile.mkdtemp(), "piece_template.png")
+    crop.save(path)
+    return path
+
+
+def scan_only(img):
+    config = GameConfig()
+    config.track_roi = False
+    return JumpAlgorithm(config).find_piece_and_board(img)
+
+
+def test_template_matches_color_scan():
+    """模板匹配得到的棋子底部中心与颜色扫描一致（亚像素误差 < 1px）"""
+    config = GameConfig()
+    config.piece_template = save_template()
+    config.track_roi = False
+    algorithm = JumpAlgorithm(config)
+
+    for piece_x, piece_bottom, board_cx in [(280, 650, 700), (700, 600, 250), (450, 680, 820)]:
+        img = make_frame(1000, 1080, piece_x, piece_bottom, board_cx, 420)
+        result = algorithm.find_piece_and_board(img)
+        expected = scan_only(img)
+        print(f"  模板={result[:2]} 置信度={algorithm.piece_confidence:.3f} 颜色扫描={expected[:2]}")
+        assert algorithm.piece_source == "template"
+        assert algorithm.piece_confidence >= config.template_threshold
+        assert abs(result[0] - expected[0]) < 1
+        assert abs(result[1] - expected[1]) < 1
+        assert result[2] == expected[2]
+
+
+def test_template_pyramid_cached_by_scale():
+    """同一缩放比例下模板金字塔只生成一次"""
+    config = GameConfig()
+    config.piece_template = save_template()
+    algorithm = JumpAlgorithm(config)
+    img = make_frame(1000, 1080, 300, 640, 720, 420)
+    algorithm.find_piece_and_board(img)
+    levels = algorithm.template_matcher.pyramid(1.0)
+    algorithm.find_piece_and_board(img)
+    assert algorithm.template_matcher.pyramid(1.0) is levels
+    assert len(algorithm.template_matcher._pyramids) == 1
+
+
+def test_low_confidence_falls_back_to_scan():
+    """模板不像棋子时置信度低，回退到颜色扫描"""
+    rng = np.random.default_rng(3)
+    path = os.path.join(tempfile.mkdtemp(), "noise.png")
+    from PIL import Image
+    Image.fromarray(rng.integers(0, 256, (60, 40, 3), dtype=np.uint8)).save(path)
+
+    config = GameConfig()
+    config.piece_template = path
+    config.track_roi = False
+    algorithm = JumpAlgorithm(config)
+    img = make_frame(1000, 1080, 300, 640, 720, 420)
+    result = algorithm.find_piece_and_board(img)
+    assert algorithm.piece_source == "scan"
+    assert result == scan_only(img)
+
+
+def test_missing_template_file():
+    """模板文件不存在时直接使用颜色扫描"""
+    config = GameConfig()
+    config.piece_template = os.path.join(tempfile.gettempdir(), "no_such_template.png")
+    algorithm = JumpAlgorithm(config)
+    img = make_frame(1000, 1080, 300, 640, 720, 420)
+    assert algorithm.find_piece_and_board(img) == scan_only(img)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("棋子模板匹配测试")
+    print("=" * 70)
+    test_template_matches_color_scan()
+    test_template_pyramid_cached_by_scale()
+    test_low_confidence_falls_back_to_scan()
+    test_missing_template_file()
+    print("\n[OK] 所有测试通过")
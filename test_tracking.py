@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+跟踪模式测试 - 预测窗口命中、结果与全屏扫描一致、失败自动回退
+"""
+import sys
+
+from PIL import Image
+
+from algorithm import GameConfig, JumpAlgorithm
+from test_numpy_engine import make_frame
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+
+def full_scan(img):
+    config = GameConfig()
+    config.track_roi = False
+    return JumpAlgorithm(config).find_piece_and_board(img)
+
+
+def test_tracking_hits_predicted_window():
+    """上一跳之后棋子出现在预测位置附近：只扫描窗口，结果与全屏一致"""
+    algorithm = JumpAlgorithm(GameConfig())
+    first = algorithm.find_piece_and_board(make_frame(1000, 1080, 300, 640, 720, 420))
+    assert first[0] and not algorithm.tracked
+    full_pixels = algorithm.piece_scan_pixels
+
+    # 镜头回移半个跳跃向量：棋子落在上一帧棋子与平台的中点附近
+    piece_x = int((first[0] + first[2]) / 2) + 6
+    piece_bottom = int((first[1] + first[3]) / 2) + GameConfig.piece_base_height_1_2 - 4
+    img = make_frame(1000, 1080, piece_x, piece_bottom, 250, 400)
+    second = algorithm.find_piece_and_board(img)
+
+    print(f"  第一帧: {first}, 扫描 {full_pixels}px")
+    print(f"  第二帧: {second}, 扫描 {algorithm.piece_scan_pixels}px, 跟踪={algorithm.tracked}")
+    assert algorithm.tracked
+    assert second == full_scan(img)
+    assert algorithm.piece_scan_pixels * 10 <= full_pixels
+
+
+def test_tracking_falls_back_when_piece_moved():
+    """棋子不在预测窗口内（例如重新开局）时回退到全屏扫描"""
+    algorithm = JumpAlgorithm(GameConfig())
+    algorithm.find_piece_and_board(make_frame(1000, 1080, 300, 640, 720, 420))
+
+    img = make_frame(1000, 1080, 760, 660, 300, 430)
+    result = algorithm.find_piece_and_board(img)
+    assert not algorithm.tracked
+    assert result == full_scan(img)
+
+
+def test_tracking_reset_after_miss():
+    """检测失败后清除历史位置，下一帧不再使用跟踪窗口"""
+    algorithm = JumpAlgorithm(GameConfig())
+    algorithm.find_piece_and_board(make_frame(1000, 1080, 300, 640, 720, 420))
+    assert algorithm.last_piece_x
+
+    algorithm.find_piece_and_board(Image.new("RGB", (1000, 1080), (200, 200, 210)))
+    assert algorithm.last_piece_x == 0
+    assert algorithm.predict_piece_roi(1000, 1080) is None
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("跟踪模式测试")
+    print("=" * 70)
+    test_tracking_hits_predicted_window()
+    test_tracking_falls_back_when_piece_moved()
+    test_tracking_reset_after_miss()
+    print("\n[OK] 所有测试通过")
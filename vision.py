@@ -0,0 +1,758 @@
+# -*- coding: utf-8 -*-
+"""
+图像检测引擎 - NumPy 向量化实现
+
+与 JumpAlgorithm._find_piece_and_board_loop 逻辑逐项对应：
+截图只转换一次 ndarray，scan_start_y 探测、棋子颜色判断、平台边缘判断
+都改为整块掩码运算，返回值保持 (piece_x, piece_y, board_x, board_y, delta_piece_y)。
+循环版保持 wangshub 原样不动；棋子下方空行过多即停止扫描只在这里做
+"""
+
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# 平台扫描每次处理的行数，找到第一行边缘即可停止，不必一次算完整个区域
+BOARD_CHUNK_ROWS = 64
+
+
+def to_array(img) -> np.ndarray:
+    """截图转为 HxWx3 的 uint8 数组，已经是数组时原样返回"""
+    if isinstance(img, np.ndarray):
+        return img
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return np.asarray(img)
+
+
+# 颜色规则：通道/亮度范围均为开区间 (lo, hi)，与原逐像素比较一致；
+# ordered 表示还要求 r < g < b（不能按通道拆分，只对范围命中的像素补判）
+COLOR_RULES = {
+    # wangshub 棋子最低行严格 RGB 范围
+    "piece": {"r": (50, 60), "g": (53, 63), "b": (95, 110)},
+}
+
+
+class ColorClassifier:
+    """按通道查找表的像素分类器 - 每条颜色规则只在构造时编译一次
+
+    每个类别占 label 的一位：三个通道各一张 256 项 uint8 表，
+    表项第 k 位表示该取值落在类别 k 的范围内，查表后按位与即得类别位图；
+    有亮度规则时再查一张 0~765 的三通道和表。新增类别、调整范围不增加扫描开销
+    """
+
+    def __init__(self, rules: dict = None):
+        rules = COLOR_RULES if rules is None else rules
+        if len(rules) > 8:
+            raise ValueError("最多支持 8 个颜色类别")
+        self.bits = {}
+        self.ordered = 0
+        self.luts = np.zeros((3, 256), dtype=np.uint8)
+        self.sum_lut = np.zeros(766, dtype=np.uint8)
+        self.uses_sum = False
+        for k, (name, rule) in enumerate(rules.items()):
+            bit = 1 << k
+            self.bits[name] = bit
+            for c, channel in enumerate("rgb"):
+                lo, hi = rule.get(channel, (-1, 256))
+                self.luts[c, max(lo + 1, 0):min(hi, 256)] |= bit
+            lo, hi = rule.get("sum", (-1, 766))
+            self.sum_lut[max(lo + 1, 0):min(hi, 766)] |= bit
+            self.uses_sum = self.uses_sum or "sum" in rule
+            if rule.get("ordered"):
+                self.ordered |= bit
+
+    def bit(self, name: str) -> int:
+        return self.bits[name]
+
+    def classify(self, pixels: np.ndarray, names=None) -> np.ndarray:
+        """整块像素分类，返回与像素同形状（去掉通道维）的 uint8 类别位图
+
+        names 只计算指定类别，其余位为 0
+        """
+        wanted = 0xFF if names is None else sum(self.bits[name] for name in names)
+        luts = self.luts & wanted
+        labels = np.take(luts[0], pixels[..., 0])
+        labels &= np.take(luts[1], pixels[..., 1])
+        labels &= np.take(luts[2], pixels[..., 2])
+        if self.uses_sum and (self.sum_lut & wanted != wanted).any():
+            total = pixels.sum(axis=-1, dtype=np.uint16)
+            labels &= np.take(self.sum_lut, total)
+        ordered = self.ordered & wanted
+        if ordered:
+            r = pixels[..., 0]
+            g = pixels[..., 1]
+            b = pixels[..., 2]
+            keep = (r < g) & (g < b)
+            labels &= np.where(keep, 0xFF, 0xFF ^ ordered).astype(np.uint8)
+        return labels
+
+    def mask(self, pixels: np.ndarray, name: str) -> np.ndarray:
+        """单个类别的布尔掩码"""
+        bit = self.bits[name]
+        return (self.classify(pixels, (name,)) & bit).astype(bool)
+
+
+CLASSIFIER = ColorClassifier()
+
+
+def piece_mask(pixels: np.ndarray) -> np.ndarray:
+    """棋子最低行颜色判断（wangshub 严格 RGB 范围）"""
+    return CLASSIFIER.mask(pixels, "piece")
+
+
+def row_background(arr: np.ndarray, y0: int, y1: int, bg: np.ndarray = None) -> np.ndarray:
+    """y0~y1 行的背景色，形状 (行数, 1, 3) 的 int16
+
+    有背景模型时直接取模型，否则沿用 wangshub 的做法取每行最左侧像素
+    """
+    if bg is not None:
+        return bg[y0:y1, None, :]
+    return arr[y0:y1, 0:1].astype(np.int16)
+
+
+def foreground_mask(block: np.ndarray, background: np.ndarray, threshold: int = 10) -> np.ndarray:
+    """与背景色三通道差值和大于 threshold 的像素"""
+    return np.abs(block.astype(np.int16) - background).sum(axis=2) > threshold
+
+
+class BackgroundModel:
+    """游戏背景竖直渐变模型 - 每行背景色按会话缓存
+
+    每行背景色取几列采样像素的中位数，采样列不一致的行（被平台、装饰挡住）
+    由上下可信行线性插值；之后每帧只抽查少量行，偏差超过阈值（换主题、渐变滚动）才重新拟合
+    """
+
+    SAMPLE_COLUMNS = (0.02, 0.08, 0.5, 0.92, 0.98)
+    # 采样列之间最大差异（三通道和）超过此值认为该行被遮挡
+    SPREAD_LIMIT = 12
+    # 抽查行与模型的平均偏差（三通道和）超过此值重新拟合
+    DRIFT_LIMIT = 4
+    CHECK_ROWS = 32
+
+    def __init__(self):
+        self.rows = None
+        self.refits = 0
+
+    def _sample(self, arr: np.ndarray, ys) -> tuple:
+        w = arr.shape[1]
+        cols = sorted({min(w - 1, int(w * f)) for f in self.SAMPLE_COLUMNS})
+        samples = arr[ys][:, cols].astype(np.int16)
+        median = np.median(samples, axis=1)
+        spread = (samples.max(axis=1) - samples.min(axis=1)).sum(axis=1)
+        return median, spread <= self.SPREAD_LIMIT
+
+    def fit(self, arr: np.ndarray) -> np.ndarray:
+        """由整帧重新拟合每行背景色"""
+        h = arr.shape[0]
+        ys = np.arange(h)
+        median, valid = self._sample(arr, ys)
+        if valid.any() and not valid.all():
+            for c in range(3):
+                median[:, c] = np.interp(ys, ys[valid], median[valid, c])
+        self.rows = np.rint(median).astype(np.int16)
+        self.refits += 1
+        return self.rows
+
+    def update(self, arr: np.ndarray) -> np.ndarray:
+        """返回当前帧可用的每行背景色 (h, 3)，尺寸变化或检测到漂移时重新拟合"""
+        h = arr.shape[0]
+        if self.rows is None or self.rows.shape[0] != h:
+            return self.fit(arr)
+
+        ys = np.linspace(0, h - 1, self.CHECK_ROWS).astype(int)
+        median, valid = self._sample(arr, ys)
+        if valid.any():
+            drift = np.abs(median[valid] - self.rows[ys[valid]]).sum(axis=1).mean()
+            if drift > self.DRIFT_LIMIT:
+                return self.fit(arr)
+        return self.rows
+
+
+def probe_scan_start_y(arr: np.ndarray, bg: np.ndarray = None) -> int:
+    """以50px步长探测第一行非纯色的行，返回 scan_start_y
+
+    有背景模型时改为探测第一行出现前景的行
+    """
+    h = arr.shape[0]
+    rows = np.arange(int(h / 3), int(h * 2 / 3), 50)
+    if rows.size == 0:
+        return 0
+
+    sampled = arr[rows]
+    if bg is not None:
+        changed = foreground_mask(sampled, bg[rows, None, :]).any(axis=1)
+    else:
+        changed = (sampled[:, 1:] != sampled[:, :1]).any(axis=(1, 2))
+    # 与循环版一致：命中行 i - 50 为 0 时探测不会停止
+    for i in rows[changed]:
+        if i - 50:
+            return int(i - 50)
+    return 0
+
+
+def frame_scale(w: int, h: int) -> float:
+    """与 JumpAlgorithm.calculate_scale 相同的缩放比例"""
+    return (w / 1920 + h / 1080) / 2
+
+
+def piece_clear_rows(config, w: int, h: int) -> int:
+    """棋子最低行之下连续多少行没有命中即停止扫描，取一个头部直径"""
+    return int(config.head_diameter * frame_scale(w, h))
+
+
+def find_piece_in_window(arr: np.ndarray, x0: int, x1: int, y0: int, y1: int,
+                         clear_rows: int = None) -> tuple:
+    """在窗口内扫描棋子最低行，返回 (piece_x, piece_y_max, bottom_count)，未找到返回 (0, 0, 0)
+
+    按 BOARD_CHUNK_ROWS 行分块流式扫描，只保留最近命中行和最低行的横坐标；
+    给出 clear_rows 时，命中后连续超过 clear_rows 行无命中即提前结束
+    """
+    if y1 <= y0 or x1 <= x0:
+        return 0, 0, 0
+
+    bottom_row = -1
+    bottom_x = None
+    for c0 in range(y0, y1, BOARD_CHUNK_ROWS):
+        c1 = min(c0 + BOARD_CHUNK_ROWS, y1)
+        mask = piece_mask(arr[c0:c1, x0:x1])
+        hit_rows = np.flatnonzero(mask.any(axis=1)) + c0
+        if clear_rows is not None and hit_rows.size:
+            first = bottom_row if bottom_row >= 0 else hit_rows[0]
+            prev = np.concatenate(([first], hit_rows[:-1]))
+            gaps = np.flatnonzero(hit_rows - prev - 1 > clear_rows)
+            if gaps.size:
+                hit_rows = hit_rows[:gaps[0]]
+                if hit_rows.size:
+                    bottom_row = int(hit_rows[-1])
+                    bottom_x = np.flatnonzero(mask[bottom_row - c0])
+                break
+        if hit_rows.size:
+            bottom_row = int(hit_rows[-1])
+            bottom_x = np.flatnonzero(mask[bottom_row - c0])
+        if clear_rows is not None and bottom_row >= 0 and c1 - 1 - bottom_row > clear_rows:
+            break
+
+    if bottom_x is None:
+        return 0, 0, 0
+    piece_x = int(int(bottom_x.sum() + x0 * bottom_x.size) / bottom_x.size)
+    return piece_x, bottom_row, int(bottom_x.size)
+
+
+def find_piece(arr: np.ndarray, scan_start_y: int, clear_rows: int = None) -> tuple:
+    """扫描棋子最低行，返回 (piece_x, piece_y_max)，未找到返回 (0, 0)"""
+    h, w = arr.shape[:2]
+    scan_x_border = int(w / 8)
+    piece_x, piece_y_max, _ = find_piece_in_window(
+        arr, scan_x_border, w - scan_x_border, max(scan_start_y, 0), int(h * 2 / 3), clear_rows)
+    return piece_x, piece_y_max
+
+
+def find_piece_bottom_up(arr: np.ndarray, x0: int, x1: int, y0: int, y1: int, stride: int,
+                         min_count: int, budget: int = 0, deadline: float = 0.0) -> tuple:
+    """自下而上隔 stride 行扫描棋子底座，返回 (piece_x, piece_y_max, 已扫描像素数)，未找到 piece_x 为 0
+
+    采样行命中不少于 min_count 个像素才算确认底座，随后只在该行与下一采样行之间
+    逐行细扫求真正的最低行；budget 为像素预算，deadline 为 time.perf_counter() 截止时间，
+    超出任一限制立即返回未找到，垃圾帧不会扫完整个区域
+    """
+    if y1 <= y0 or x1 <= x0:
+        return 0, 0, 0
+
+    width = x1 - x0
+    scanned = 0
+    rows = np.arange(y1 - 1, y0 - 1, -max(stride, 1))
+    for c0 in range(0, rows.size, BOARD_CHUNK_ROWS):
+        chunk = rows[c0:c0 + BOARD_CHUNK_ROWS]
+        if budget:
+            chunk = chunk[:max(budget - scanned, 0) // width]
+            if chunk.size == 0:
+                return 0, 0, scanned
+        if deadline and time.perf_counter() > deadline:
+            return 0, 0, scanned
+        counts = piece_mask(arr[chunk, x0:x1]).sum(axis=1)
+        scanned += chunk.size * width
+        confirmed = np.flatnonzero(counts >= min_count)
+        if confirmed.size == 0:
+            continue
+
+        # 底座在确认行与其下方（已扫过、未命中的）采样行之间
+        row = int(chunk[confirmed[0]])
+        end = min(row + stride, y1)
+        if budget:
+            end = min(end, row + 1 + max(budget - scanned, 0) // width)
+        scanned += (end - row - 1) * width
+        piece_x, piece_y_max, _ = find_piece_in_window(arr, x0, x1, row, end)
+        return piece_x, piece_y_max, scanned
+    return 0, 0, scanned
+
+
+def piece_search_stride(config, w: int, h: int) -> int:
+    """自下而上扫描的行步长，不超过底座可见高度，保证不会跨过底座"""
+    return max(1, int(config.piece_base_height_1_2 * frame_scale(w, h) / 5))
+
+
+def scan_piece(arr: np.ndarray, config, scan_start_y: int, deadline: float = 0.0,
+               stats: dict = None) -> tuple:
+    """按 config.piece_search 选择全屏棋子扫描方式，返回 (piece_x, piece_y_max)
+
+    deadline 为调用方的截止时间，与 config.piece_scan_time_ms 取较早者；
+    因超时没找到棋子时在 stats 中记 timeout（不是画面里没有棋子）
+    """
+    h, w = arr.shape[:2]
+    if config.piece_search != "bottomup":
+        return find_piece(arr, scan_start_y, piece_clear_rows(config, w, h))
+
+    scan_x_border = int(w / 8)
+    if config.piece_scan_time_ms:
+        budget_deadline = time.perf_counter() + config.piece_scan_time_ms / 1000
+        deadline = min(deadline, budget_deadline) if deadline else budget_deadline
+    min_count = max(1, int(config.piece_body_width * frame_scale(w, h) / 4))
+    piece_x, piece_y_max, _ = find_piece_bottom_up(
+        arr, scan_x_border, w - scan_x_border, max(scan_start_y, 0), int(h * 2 / 3),
+        piece_search_stride(config, w, h), min_count, config.piece_scan_budget, deadline)
+    if not piece_x and expired(deadline):
+        _timeout(stats)
+    return piece_x, piece_y_max
+
+
+def find_board_edge(arr: np.ndarray, piece_x: float, piece_body_width: float,
+                    y_end: int = None, y_start: int = None, below: int = 5,
+                    bg: np.ndarray = None) -> tuple:
+    """扫描平台顶点所在行，返回 (该行边缘像素的平均横坐标, 行号)，未找到返回 (0, 0)
+
+    y_start/y_end 为扫描行范围，默认 1/3 到 2/3 屏高；跟踪模式下 y_end 传入棋子底部，只看棋子上方。
+    below 为抗干扰检查向下偏移的行数，缩小图上按比例减小；bg 为背景模型的每行背景色
+    """
+    h, w = arr.shape[:2]
+
+    # wangshub: 限制棋盘扫描的横坐标，避免音符bug
+    if piece_x < w / 2:
+        x_start, x_end = int(piece_x), w
+    else:
+        x_start, x_end = 0, int(piece_x)
+    if x_end <= x_start:
+        return 0, 0
+
+    cols = np.arange(x_start, x_end)
+    # wangshub: 修掉脑袋比下一个小格子还高的情况的bug
+    col_keep = np.abs(cols - piece_x) >= piece_body_width
+
+    y_start = int(h / 3) if y_start is None else max(y_start, int(h / 3))
+    y_end = int(h * 2 / 3) if y_end is None else min(y_end, int(h * 2 / 3))
+    y_end = min(int(y_end), h - below)
+    for y0 in range(y_start, y_end, BOARD_CHUNK_ROWS):
+        y1 = min(y0 + BOARD_CHUNK_ROWS, y_end)
+        background = row_background(arr, y0, y1, bg)
+        under_background = background if bg is None else bg[y0 + below:y1 + below, None, :]
+        # wangshub: 检查Y轴下面5个像素，和背景色相同，那么是干扰
+        edge = foreground_mask(arr[y0:y1, x_start:x_end], background) \
+            & foreground_mask(arr[y0 + below:y1 + below, x_start:x_end], under_background) \
+            & col_keep
+        hit_rows = np.flatnonzero(edge.any(axis=1))
+        if hit_rows.size:
+            xs = cols[edge[hit_rows[0]]]
+            return int(xs.sum()) / xs.size, y0 + int(hit_rows[0])
+    return 0, 0
+
+
+def find_board_x(arr: np.ndarray, piece_x: int, piece_body_width: int, y_end: int = None,
+                 bg: np.ndarray = None) -> float:
+    """扫描平台顶点所在行，返回该行边缘像素的平均横坐标，未找到返回 0"""
+    return find_board_edge(arr, piece_x, piece_body_width, y_end, bg=bg)[0]
+
+
+def board_foreground(arr: np.ndarray, y0: int, y1: int, x0: int, x1: int,
+                     bg: np.ndarray = None) -> np.ndarray:
+    """区域内的前景掩码：与同一行背景色的三通道差值和大于 10"""
+    return foreground_mask(arr[y0:y1, x0:x1], row_background(arr, y0, y1, bg))
+
+
+def component_center(labels: np.ndarray, stats: np.ndarray, label: int) -> tuple:
+    """由连通域的顶点和半宽推出平台上表面中心 (x, y)
+
+    等轴测的方块/圆柱上表面，顶点在中心正上方，半高与半宽之比等于跳跃线斜率 25.5/43.5。
+    不取左右极值点的行：圆柱的极值点附近很平，侧面颜色接近背景时极值列还会缺一段；
+    半宽取顶点到两侧边界中较大的一边，被棋子竖条截掉一侧时仍然准确
+    """
+    x, y, cw, ch = stats[label, :4]
+    top_x = np.flatnonzero(labels[y, x:x + cw] == label).mean() + x
+    half_width = max(top_x - x, x + cw - 1 - top_x) + 0.5
+    return float(top_x), float(y + half_width * (25.5 / 43.5))
+
+
+def find_board_component(arr: np.ndarray, piece_x: float, piece_y_max: float,
+                         piece_body_width: float, min_area: float, bg: np.ndarray = None) -> tuple:
+    """连通域分割找目标平台，返回 (board_x, board_y, 外接框 (x, y, w, h))，未找到返回 (0, 0, None)
+
+    1/3 屏高到棋子底部之间整块做一次前景掩码和一次连通域标记，
+    去掉棋子所在竖条和当前平台后，取棋子远侧距离最近的连通域
+    """
+    h, w = arr.shape[:2]
+    y0, y1 = int(h / 3), min(h, int(piece_y_max) + 1)
+    if cv2 is None or y1 - y0 < 3:
+        return 0, 0, None
+
+    foreground = board_foreground(arr, y0, y1, 0, w, bg)
+    # wangshub: 修掉脑袋比下一个小格子还高的情况的bug，棋子所在竖条不参与分割
+    strip_start = max(0, int(piece_x - piece_body_width) + 1)
+    strip_end = min(w, int(piece_x + piece_body_width))
+    foreground[:, strip_start:strip_end] = False
+
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(
+        foreground.view(np.uint8), connectivity=8)
+
+    # 棋子底部一行、竖条两侧的连通域是当前平台
+    current = {labels[-1, x] for x in (strip_start - 2, strip_end + 1) if 0 <= x < w}
+    far_right = piece_x < w / 2
+    best, best_distance = 0, None
+    for label in range(1, count):
+        x, y, cw, ch, area = stats[label]
+        if area < min_area or label in current:
+            continue
+        center_x = x + cw / 2
+        if (center_x <= piece_x) if far_right else (center_x >= piece_x):
+            continue
+        distance = (center_x - piece_x) ** 2 + (y1 - (y + ch / 2)) ** 2
+        if best_distance is None or distance < best_distance:
+            best, best_distance = label, distance
+    if not best:
+        return 0, 0, None
+
+    board_x, board_y = component_center(labels, stats, best)
+    x, y, cw, ch = (int(v) for v in stats[best, :4])
+    return board_x, board_y + y0, (x, y + y0, cw, ch)
+
+
+def refine_board_component(arr: np.ndarray, bbox: tuple, margin: int,
+                           piece_x: float, piece_body_width: float, bg: np.ndarray = None) -> tuple:
+    """在原图上外接框附近重新分割，取最大连通域的中心，返回 (board_x, board_y)，失败返回 (0, 0)"""
+    h, w = arr.shape[:2]
+    x, y, cw, ch = bbox
+    x0, x1 = max(0, x - margin), min(w, x + cw + margin)
+    y0, y1 = max(int(h / 3), y - margin), min(h, y + ch + margin)
+    if x1 <= x0 or y1 <= y0:
+        return 0, 0
+
+    foreground = board_foreground(arr, y0, y1, x0, x1, bg)
+    strip_start = max(x0, int(piece_x - piece_body_width) + 1)
+    strip_end = min(x1, int(piece_x + piece_body_width))
+    if strip_end > strip_start:
+        foreground[:, strip_start - x0:strip_end - x0] = False
+
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(
+        foreground.view(np.uint8), connectivity=8)
+    if count < 2:
+        return 0, 0
+    label = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    board_x, board_y = component_center(labels, stats, label)
+    return board_x + x0, board_y + y0
+
+
+def _use_components(config) -> bool:
+    return config.board_detector == "component" and cv2 is not None
+
+
+def _finish(w: int, h: int, piece_x: int, piece_y: int, board_x: float, board_y: float = None) -> tuple:
+    """由棋子和平台坐标推出 delta_piece_y（未给出 board_y 时按对称中心推算），组装返回值"""
+    # wangshub: 计算对称中心，用于获取delta_piece_y
+    center_x = w / 2 + (24 / 1080) * w
+    center_y = h / 2 + (17 / 1920) * h
+
+    if piece_x > center_x:
+        projected_y = round((25.5 / 43.5) * (board_x - center_x) + center_y)
+        delta_piece_y = piece_y - round((25.5 / 43.5) * (piece_x - center_x) + center_y)
+    else:
+        projected_y = round(-(25.5 / 43.5) * (board_x - center_x) + center_y)
+        delta_piece_y = piece_y - round(-(25.5 / 43.5) * (piece_x - center_x) + center_y)
+    if board_y is None:
+        board_y = projected_y
+
+    if not all((board_x, board_y)):
+        return 0, 0, 0, 0, 0
+
+    return piece_x, piece_y, board_x, board_y, delta_piece_y
+
+
+def _lap(stats: dict, key: str, start: float) -> float:
+    """把 start 以来的耗时（毫秒）累加到 stats[key]，返回当前时间"""
+    now = time.perf_counter()
+    if stats is not None:
+        stats[key] = stats.get(key, 0.0) + (now - start) * 1000
+    return now
+
+
+def expired(deadline: float) -> bool:
+    """deadline 为 time.perf_counter() 截止时间，0 表示不限时"""
+    return bool(deadline) and time.perf_counter() > deadline
+
+
+def _timeout(stats: dict) -> tuple:
+    if stats is not None:
+        stats["timeout"] = True
+    return 0, 0, 0, 0, 0
+
+
+def find_piece_and_board(arr: np.ndarray, config, piece_hint: tuple = None,
+                         bg: np.ndarray = None, deadline: float = 0.0, stats: dict = None) -> tuple:
+    """向量化版 find_piece_and_board，不用背景模型、平台用 edge 检测、
+    棋子下方没有隔开一个头部直径以上的同色干扰时，返回值与循环版完全一致
+
+    piece_hint 为已经找到的 (piece_x, piece_y_max)，传入时跳过棋子扫描，
+    平台只在棋子底部以上扫描（跟踪模式使用）；bg 为背景模型的每行背景色；
+    deadline 为截止时间，超时返回全 0 并在 stats 中记 timeout；
+    stats 字典记录各阶段耗时 piece_ms / board_ms 以及实际使用的 board_detector
+    """
+    h, w = arr.shape[:2]
+
+    start = time.perf_counter()
+    if piece_hint:
+        piece_x, piece_y_max = piece_hint
+        board_y_end = piece_y_max
+    else:
+        scan_start_y = probe_scan_start_y(arr, bg)
+        piece_x, piece_y_max = scan_piece(arr, config, scan_start_y, deadline, stats)
+        board_y_end = None
+        start = _lap(stats, "piece_ms", start)
+    if expired(deadline) or (stats is not None and stats.get("timeout")):
+        return _timeout(stats)
+    if not piece_x and not piece_y_max:
+        return 0, 0, 0, 0, 0
+
+    piece_y = piece_y_max - config.piece_base_height_1_2
+    if _use_components(config):
+        board_x, board_y, _ = find_board_component(
+            arr, piece_x, piece_y_max, config.piece_body_width, config.piece_body_width ** 2 / 4, bg)
+        if board_x:
+            _lap(stats, "board_ms", start)
+            if stats is not None:
+                stats["board_detector"] = "component"
+            return _finish(w, h, piece_x, piece_y, board_x, board_y)
+
+    board_x = find_board_x(arr, piece_x, config.piece_body_width, board_y_end, bg)
+    _lap(stats, "board_ms", start)
+    if stats is not None:
+        stats["board_detector"] = "edge"
+    return _finish(w, h, piece_x, piece_y, board_x)
+
+
+def pyramid_factor(scale: float) -> int:
+    """按分辨率缩放比例选择金字塔下采样倍数，1 表示不使用金字塔"""
+    if scale >= 1.8:
+        return 8
+    if scale >= 1.2:
+        return 4
+    return 1
+
+
+def find_piece_and_board_pyramid(arr: np.ndarray, config, factor: int, bg: np.ndarray = None,
+                                 deadline: float = 0.0, stats: dict = None) -> tuple:
+    """由粗到精检测：先在 factor 倍下采样图上定位棋子和平台，再只在原图小块上精确定位
+
+    下采样用步长切片（视图，不拷贝、不混色），颜色判断与原图完全相同；
+    粗定位失败时回退到整幅原图扫描，结果不会比原图路径差；deadline / stats 同 find_piece_and_board
+    """
+    start = time.perf_counter()
+    h, w = arr.shape[:2]
+    f = factor
+    small = arr[::f, ::f]
+    small_bg = None if bg is None else bg[::f]
+
+    scan_x_border = int(w / 8)
+    scan_start_y = max(probe_scan_start_y(arr, bg), 0)
+    y_end = int(h * 2 / 3)
+
+    # 粗定位棋子：下采样图第 r 行对应原图第 r * f 行
+    ys0, ys1 = -(-scan_start_y // f), -(-y_end // f)
+    xs0, xs1 = -(-scan_x_border // f), -(-(w - scan_x_border) // f)
+    mask = piece_mask(small[ys0:ys1, xs0:xs1])
+    hit_rows = np.flatnonzero(mask.any(axis=1))
+    gaps = np.flatnonzero(np.diff(hit_rows) - 1 > piece_clear_rows(config, w, h) // f)
+    if gaps.size:
+        hit_rows = hit_rows[:gaps[0] + 1]
+    if hit_rows.size == 0:
+        _lap(stats, "piece_ms", start)
+        return find_piece_and_board(arr, config, bg=bg, deadline=deadline, stats=stats)
+    row = int(hit_rows[-1])
+    cols = np.flatnonzero(mask[max(row - 1, 0):row + 1].any(axis=0)) + xs0
+
+    # 精确定位棋子：最低行必在粗定位行与下一个采样行之间
+    y0 = (row + ys0) * f
+    piece_x, piece_y_max, count = find_piece_in_window(
+        arr,
+        max(scan_x_border, (int(cols[0]) - 2) * f),
+        min(w - scan_x_border, (int(cols[-1]) + 2) * f + 1),
+        y0, min(y_end, y0 + 2 * f))
+    if not count:
+        _lap(stats, "piece_ms", start)
+        return find_piece_and_board(arr, config, bg=bg, deadline=deadline, stats=stats)
+
+    start = _lap(stats, "piece_ms", start)
+    if expired(deadline):
+        return _timeout(stats)
+
+    piece_y = piece_y_max - config.piece_base_height_1_2
+    if _use_components(config):
+        # 缩小图上分割定位平台，再在原图外接框附近重新分割求中心
+        _, _, bbox = find_board_component(small, piece_x / f, piece_y_max / f,
+                                          config.piece_body_width / f,
+                                          config.piece_body_width ** 2 / 4 / (f * f), small_bg)
+        if bbox:
+            x, y, cw, ch = bbox
+            board_x, board_y = refine_board_component(
+                arr, (x * f, y * f, cw * f, ch * f), 2 * f, piece_x, config.piece_body_width, bg)
+            if board_x:
+                _lap(stats, "board_ms", start)
+                if stats is not None:
+                    stats["board_detector"] = "component"
+                return _finish(w, h, piece_x, piece_y, board_x, board_y)
+
+    # 粗定位平台顶点行，再在原图上只扫描该行之前的 f 行
+    _, board_row = find_board_edge(small, piece_x / f, config.piece_body_width / f,
+                                   below=max(1, round(5 / f)), bg=small_bg)
+    board_x = 0
+    if board_row:
+        board_x, _ = find_board_edge(arr, piece_x, config.piece_body_width,
+                                     y_start=(board_row - 1) * f + 1, y_end=board_row * f + 1, bg=bg)
+    if not board_x:
+        board_x = find_board_x(arr, piece_x, config.piece_body_width, bg=bg)
+
+    _lap(stats, "board_ms", start)
+    if stats is not None:
+        stats["board_detector"] = "edge"
+    return _finish(w, h, piece_x, piece_y, board_x)
+
+
+def _parabola_peak(left: float, center: float, right: float) -> float:
+    """三点抛物线拟合峰值相对中心点的偏移，用于亚像素定位"""
+    denom = left - 2 * center + right
+    if denom == 0:
+        return 0.0
+    return float(np.clip((left - right) / (2 * denom), -0.5, 0.5))
+
+
+class PieceTemplateMatcher:
+    """棋子模板匹配 - 模板只加载一次，按缩放比例缓存缩放后的模板金字塔
+
+    匹配先在缩小图上粗定位，再在原图小块上精确定位，
+    粗匹配时模板缩到约 COARSE_TEMPLATE_SIZE 像素，每帧开销与屏幕分辨率基本无关
+    """
+
+    # 模板相对缩放，容忍截模板时与当前画面的少量尺寸差异
+    SCALE_STEPS = (0.9, 1.0, 1.1)
+    COARSE_TEMPLATE_SIZE = 12
+
+    def __init__(self):
+        self.path = None
+        self.template = None
+        # 模板内棋子最低行中心（相对模板左上角）
+        self.bottom_offset = (0.0, 0.0)
+        self._pyramids = {}
+
+    def load(self, path: str) -> bool:
+        """加载模板，同一路径只加载一次"""
+        if path == self.path:
+            return self.template is not None
+
+        self.path = path
+        self.template = None
+        self._pyramids = {}
+        if cv2 is None or not path or not os.path.exists(path):
+            return False
+        try:
+            # 用 PIL 读取，避免 cv2.imread 在 Windows 中文路径下失败
+            template = np.ascontiguousarray(np.asarray(Image.open(path).convert("RGB")))
+        except OSError:
+            return False
+
+        th, tw = template.shape[:2]
+        mask = piece_mask(template)
+        rows = np.flatnonzero(mask.any(axis=1))
+        if rows.size:
+            xs = np.flatnonzero(mask[rows[-1]])
+            self.bottom_offset = (float(xs.mean()), float(rows[-1]))
+        else:
+            self.bottom_offset = ((tw - 1) / 2, float(th - 1))
+        self.template = template
+        return True
+
+    def pyramid(self, relative_scale: float) -> list:
+        """取出（必要时生成）某个缩放比例下的模板金字塔 [(s, 原图模板, 粗模板, 粗缩小倍数)]"""
+        key = round(relative_scale, 3)
+        levels = self._pyramids.get(key)
+        if levels is None:
+            levels = []
+            th, tw = self.template.shape[:2]
+            for step in self.SCALE_STEPS:
+                s = key * step
+                size = (max(3, round(tw * s)), max(3, round(th * s)))
+                full = cv2.resize(self.template, size,
+                                  interpolation=cv2.INTER_AREA if s < 1 else cv2.INTER_LINEAR)
+                k = max(1, min(size) // self.COARSE_TEMPLATE_SIZE)
+                coarse = cv2.resize(full, (max(3, size[0] // k), max(3, size[1] // k)),
+                                    interpolation=cv2.INTER_AREA)
+                levels.append((s, full, coarse, k))
+            self._pyramids[key] = levels
+        return levels
+
+    def template_size(self, relative_scale: float) -> tuple:
+        """当前缩放比例下最大模板的 (宽, 高)"""
+        full = self.pyramid(relative_scale)[-1][1]
+        return full.shape[1], full.shape[0]
+
+    def match(self, arr: np.ndarray, relative_scale: float, window: tuple) -> tuple:
+        """在 window=(x0, x1, y0, y1) 内匹配棋子
+
+        返回 (piece_x, piece_y_max, confidence)，坐标为棋子最低行中心的亚像素位置，
+        未加载模板或窗口太小时返回 (0, 0, 0.0)
+        """
+        if self.template is None:
+            return 0, 0, 0.0
+
+        x0, x1, y0, y1 = window
+        region = arr[y0:y1, x0:x1]
+        rh, rw = region.shape[:2]
+
+        # 各缩放层先在缩小图上粗定位，取得分最高的一层
+        best = None
+        shrunk = {}
+        for s, full, coarse, k in self.pyramid(relative_scale):
+            if rh < full.shape[0] or rw < full.shape[1]:
+                continue
+            if k not in shrunk:
+                shrunk[k] = region if k == 1 else cv2.resize(
+                    region, (rw // k, rh // k), interpolation=cv2.INTER_AREA)
+            small = shrunk[k]
+            if small.shape[0] < coarse.shape[0] or small.shape[1] < coarse.shape[1]:
+                continue
+            _, score, _, loc = cv2.minMaxLoc(cv2.matchTemplate(small, coarse, cv2.TM_CCOEFF_NORMED))
+            if best is None or score > best[0]:
+                best = (score, loc, s, full, k)
+        if best is None:
+            return 0, 0, 0.0
+
+        # 原图上在粗定位点附近精确匹配，缩小取整误差可达数个粗像素，四周各留 4 个粗像素
+        _, (cx, cy), s, full, k = best
+        th, tw = full.shape[:2]
+        px0, py0 = max(0, (cx - 4) * k), max(0, (cy - 4) * k)
+        px1, py1 = min(rw, (cx + 4) * k + tw), min(rh, (cy + 4) * k + th)
+        result = cv2.matchTemplate(region[py0:py1, px0:px1], full, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (mx, my) = cv2.minMaxLoc(result)
+
+        dx = dy = 0.0
+        if 0 < mx < result.shape[1] - 1:
+            dx = _parabola_peak(result[my, mx - 1], result[my, mx], result[my, mx + 1])
+        if 0 < my < result.shape[0] - 1:
+            dy = _parabola_peak(result[my - 1, mx], result[my, mx], result[my + 1, mx])
+
+        bottom_x, bottom_y = self.bottom_offset
+        piece_x = x0 + px0 + mx + dx + bottom_x * s
+        piece_y_max = y0 + py0 + my + dy + bottom_y * s
+        return piece_x, piece_y_max, float(score)